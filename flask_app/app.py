@@ -1,25 +1,221 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, request, stream_with_context
 import redis
 import json
 import os
 from dotenv import load_dotenv
 import pandas as pd
+import numpy as np
 import plotly
 import plotly.express as px
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import threading
 import time
 import logging
+import bisect
+import math
+import queue
+import gzip
+import hashlib
+import functools
+from collections import OrderedDict
 from typing import Dict, List
 
+try:
+    import brotli
+except ImportError:  # brotli est optionnel, gzip est toujours disponible
+    brotli = None
+
+# Modules partagés (PYTHONPATH: /home/crypto_bot/scripts une fois déployé, src/ dans le dépôt)
+from data_collection.market_store import MarketStore
+from data_collection.bar_store import DAY_MS, RESOLUTIONS, aggregate_bars, lttb, merge_bars
+from analysis.rolling_correlation import RollingCorrelationStore, parse_chunk
+from trading.risk_metrics import RiskState
+from utils.file_cache import FileCache
+
 # Charger les variables d'environnement
 load_dotenv('/home/crypto_bot/config/api_keys.env')
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'crypto_bot_secret_key_2024'
 
-# Redis connection
-redis_client = redis.Redis(host='localhost', port=6379, decode_responses=True)
+# Redis connection: pool partagé par les threads du serveur et la tâche de mise à jour
+redis_pool = redis.ConnectionPool(host='localhost', port=6379, decode_responses=True, max_connections=32)
+redis_client = redis.Redis(connection_pool=redis_pool)
+
+# Symboles affichés par défaut
+DEFAULT_SYMBOLS = ['BTC', 'ETH', 'SOL', 'ADA', 'BNB', 'DOT', 'XRP']
+
+# Canal pub/sub des mises à jour du dashboard (seules les clés modifiées y sont publiées)
+UPDATES_CHANNEL = "dashboard_updates"
+
+# Clés du résumé de trading, écrites dans Redis par les workflows
+TRADING_SUMMARY_KEYS = ["daily_report", "scan_summary", "open_positions", "recent_signals"]
+
+# Index temporel des sentiments: événements (sorted set, score = epoch), compteurs
+# par heure (hash sentiment:hour:<heure epoch>) et empreinte de la dernière entrée indexée
+SENTIMENT_EVENTS_KEY = "sentiment:events"
+SENTIMENT_HOUR_PREFIX = "sentiment:hour:"
+SENTIMENT_LAST_ENTRY_KEY = "sentiment:last_entry"
+SENTIMENT_RETENTION_DAYS = 30
+SENTIMENT_DATA_FILE = '/home/crypto_bot/data/emotional_data.json'
+SENTIMENTS = ["positive", "neutral", "negative"]
+
+# Historique (/api/history): nombre de points par défaut et maximal par réponse,
+# et facteur de sur-échantillonnage des barres lues avant le sous-échantillonnage LTTB
+HISTORY_DEFAULT_POINTS = 500
+HISTORY_MAX_POINTS = 2000
+HISTORY_DEFAULT_DAYS = 7
+LTTB_OVERSAMPLING = 10
+
+# Réponses de l'API: corps sérialisés et compressés réutilisés tant que les données
+# n'ont pas changé (recalculés au plus toutes les 5 secondes, 256 URL au plus)
+API_CACHE_TTL = 5
+API_CACHE_MAX_ENTRIES = 256
+COMPRESSION_MIN_SIZE = 1024
+
+# Stockage partitionné des données de marché
+market_store = MarketStore()
+
+# Fichiers de repli: ticks sans stockage de marché, rapports absents de Redis
+MARKET_DATA_FILE = '/home/crypto_bot/data/market_data.json'
+MARKET_REPORTS_FILE = '/home/crypto_bot/data/market_reports.json'
+
+# Séries de corrélation glissante (un fichier par symbole et par jour)
+rolling_correlation_store = RollingCorrelationStore('/home/crypto_bot/data/rolling_correlation')
+
+# Fichiers de repli analysés et indexés une fois, relus quand ils changent
+# (vérification au plus toutes les 5 secondes, 64 fichiers au plus)
+dashboard_cache = FileCache(max_entries=64, ttl=5)
+
+def index_market_records(f) -> Dict:
+    """Analyse market_data.json et indexe le tick le plus récent de chaque symbole"""
+    latest = {}
+    for item in json.load(f):
+        current = latest.get(item['symbol'])
+        if current is None or item['timestamp'] > current['timestamp']:
+            latest[item['symbol']] = item
+    return latest
+
+def build_sentiment_index(records: List[Dict]) -> Dict:
+    """Trie les sentiments par timestamp et cumule les comptes de chaque sentiment (l'ordre du fichier est conservé)"""
+    arrivals = records
+    records = sorted(records, key=lambda item: item.get('timestamp', ''))
+    cumulative = {"positive": [0], "neutral": [0], "negative": [0]}
+    for item in records:
+        sentiment = item.get('sentiment', 'neutral')
+        for key, counts in cumulative.items():
+            counts.append(counts[-1] + (key == sentiment))
+    return {
+        "records": records,
+        "arrivals": arrivals,
+        "timestamps": [item.get('timestamp', '') for item in records],
+        "cumulative": cumulative
+    }
+
+def index_sentiment_records(f) -> Dict:
+    """Analyse emotional_data.json et construit son index par timestamp"""
+    return build_sentiment_index(json.load(f))
+
+def sentiment_digest(item: Dict) -> str:
+    """Empreinte d'une entrée sentimentale (repère de la dernière entrée indexée)"""
+    return hashlib.sha1(json.dumps(item, sort_keys=True).encode('utf-8')).hexdigest()
+
+def sentiment_epoch(timestamp: str) -> float:
+    """Convertit un timestamp ISO en secondes epoch (les dates naïves sont supposées UTC)"""
+    date = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.timestamp()
+
+def index_sentiment_events(pipe, items: List[Dict]):
+    """Ajoute des entrées sentimentales à l'index temporel et aux compteurs horaires (via un pipeline)"""
+    now = time.time()
+    retention = SENTIMENT_RETENTION_DAYS * 86400
+    for item in items:
+        try:
+            epoch = sentiment_epoch(item.get('timestamp', ''))
+        except ValueError:
+            continue
+        if epoch < now - retention:
+            continue
+        pipe.zadd(SENTIMENT_EVENTS_KEY, {json.dumps(item): epoch})
+        
+        hour = int(epoch // 3600)
+        key = f"{SENTIMENT_HOUR_PREFIX}{hour}"
+        sentiment = item.get('sentiment', 'neutral')
+        pipe.hincrby(key, "total", 1)
+        pipe.hincrby(key, sentiment, 1)
+        for symbol in set(item.get('related_crypto') or []):
+            pipe.hincrby(key, f"{symbol}:total", 1)
+            pipe.hincrby(key, f"{symbol}:{sentiment}", 1)
+        pipe.expireat(key, (hour + 1) * 3600 + retention)
+    pipe.zremrangebyscore(SENTIMENT_EVENTS_KEY, "-inf", now - retention)
+
+def index_market_history(f) -> Dict:
+    """Analyse market_data.json et range les ticks de chaque symbole en tableaux triés (epoch ms, prix, volume)"""
+    ticks = {}
+    for item in json.load(f):
+        try:
+            epoch_ms = int(sentiment_epoch(item['timestamp']) * 1000)
+        except (KeyError, ValueError):
+            continue
+        volume = item.get('total_volume')
+        ticks.setdefault(item['symbol'], []).append(
+            (epoch_ms, float(item['price']), float(volume) if volume is not None else np.nan)
+        )
+    history = {}
+    for symbol, rows in ticks.items():
+        rows.sort()
+        times, prices, volumes = (np.array(column) for column in zip(*rows))
+        history[symbol] = (times.astype('int64'), prices, volumes)
+    return history
+
+def parse_epoch_ms(value: str, default: int) -> int:
+    """Convertit un paramètre de date (ISO ou epoch en secondes) en epoch millisecondes"""
+    if not value:
+        return default
+    try:
+        seconds = float(value)
+    except ValueError:
+        return int(sentiment_epoch(value) * 1000)
+    if not math.isfinite(seconds):
+        raise ValueError(f"Date non finie: {value}")
+    return int(seconds * 1000)
+
+def load_history_bars(symbol: str, resolution: str, start_ms: int, end_ms: int) -> Dict:
+    """Charge les barres d'une plage depuis les barres pré-agrégées, ou en les calculant depuis market_data.json"""
+    if market_store.has_data() and market_store.bar_store.has_data(symbol):
+        return market_store.bar_store.read(symbol, resolution, start_ms, end_ms)
+    
+    history = dashboard_cache.get(MARKET_DATA_FILE, index_market_history)
+    times, prices, volumes = history.get(symbol, (np.array([], dtype='int64'), np.array([]), np.array([])))
+    resolution_ms = RESOLUTIONS[resolution][0]
+    # Barres entières: du début de la barre contenant start_ms jusqu'à end_ms
+    lo = np.searchsorted(times, start_ms // resolution_ms * resolution_ms, side='left')
+    hi = np.searchsorted(times, end_ms // resolution_ms * resolution_ms + resolution_ms, side='left')
+    bars = aggregate_bars(times[lo:hi], prices[lo:hi], volumes[lo:hi], resolution_ms)
+    first = bisect.bisect_left(bars['t'], start_ms)
+    return {column: values[first:] for column, values in bars.items()}
+
+def first_report(f) -> Dict:
+    """Analyse market_reports.json et garde le rapport le plus récent"""
+    reports = json.load(f)
+    return reports[0] if reports else None
+
+def encode_changes(source: str, changes: List) -> str:
+    """Construit le message de mise à jour d'une source à partir des valeurs JSON déjà sérialisées"""
+    body = ", ".join(f"{json.dumps(key)}: {payload}" for key, payload in changes)
+    return f'{{"source": {json.dumps(source)}, "changes": {{{body}}}}}'
+
+def load_latest_market_records(symbols: List[str] = None) -> Dict:
+    """Charge le tick le plus récent de chaque symbole depuis l'index du stockage ou market_data.json"""
+    if market_store.has_data():
+        return market_store.latest(symbols)
+    
+    latest = dashboard_cache.get(MARKET_DATA_FILE, index_market_records)
+    if symbols:
+        return {symbol: latest[symbol] for symbol in symbols if symbol in latest}
+    return latest
 
 class DashboardManager:
     """Gestionnaire du dashboard en temps réel"""
@@ -32,20 +228,11 @@ class DashboardManager:
     def get_trading_summary(self) -> Dict:
         """Récupère le résumé de trading"""
         try:
-            # Rapport quotidien
-            report_data = redis_client.get("daily_report")
+            # Rapport quotidien, résumé du scan, positions ouvertes et signaux récents en un aller-retour
+            report_data, scan_data, positions_data, signals_data = redis_client.mget(TRADING_SUMMARY_KEYS)
             report = json.loads(report_data) if report_data else {}
-            
-            # Résumé du scan
-            scan_data = redis_client.get("scan_summary")
             scan = json.loads(scan_data) if scan_data else {}
-            
-            # Positions ouvertes
-            positions_data = redis_client.get("open_positions")
             positions = json.loads(positions_data) if positions_data else []
-            
-            # Signaux récents
-            signals_data = redis_client.get("recent_signals")
             signals = json.loads(signals_data) if signals_data else []
             
             return {
@@ -64,28 +251,26 @@ class DashboardManager:
         try:
             # Si aucun symbole n'est spécifié, utiliser les symboles par défaut
             if not symbols:
-                symbols = ['BTC', 'ETH', 'SOL', 'ADA', 'BNB', 'DOT', 'XRP']
+                symbols = DEFAULT_SYMBOLS
             
             result = {}
+            missing = []
             
-            for symbol in symbols:
-                # Récupérer les données de marché depuis Redis
-                market_data = redis_client.get(f"market_data:{symbol}")
-                
+            # Récupérer les données de marché de tous les symboles depuis Redis en un aller-retour
+            values = redis_client.mget([f"market_data:{symbol}" for symbol in symbols])
+            
+            for symbol, market_data in zip(symbols, values):
                 if market_data:
                     result[symbol] = json.loads(market_data)
                 else:
-                    # Charger depuis le fichier JSON si non disponible dans Redis
-                    try:
-                        with open(f'/home/crypto_bot/data/market_data.json', 'r') as f:
-                            all_data = json.load(f)
-                            symbol_data = [item for item in all_data if item['symbol'] == symbol]
-                            if symbol_data:
-                                # Trier par timestamp décroissant
-                                symbol_data.sort(key=lambda x: x['timestamp'], reverse=True)
-                                result[symbol] = symbol_data[0]  # Prendre la donnée la plus récente
-                    except Exception as e:
-                        self.logger.error(f"Erreur lors de la lecture du fichier market_data.json: {str(e)}")
+                    missing.append(symbol)
+            
+            # Charger depuis le stockage les symboles absents de Redis, en une seule lecture
+            if missing:
+                try:
+                    result.update(load_latest_market_records(missing))
+                except Exception as e:
+                    self.logger.error(f"Erreur lors de la lecture du fichier market_data.json: {str(e)}")
             
             return {
                 "data": result,
@@ -95,41 +280,74 @@ class DashboardManager:
             self.logger.error(f"Erreur lors de la récupération des données de marché: {str(e)}")
             return {"error": str(e)}
     
-    def get_sentiment_data(self, hours_back: int = 24) -> Dict:
-        """Récupère les données sentimentales des dernières heures"""
+    def count_sentiments_redis(self, hours_back: int, symbol: str = None):
+        """Compte les sentiments de la fenêtre depuis les compteurs horaires Redis (None si l'index est absent)"""
+        now = time.time()
+        cutoff = now - hours_back * 3600
+        first_hour = math.ceil(cutoff / 3600)
+        prefix = f"{symbol}:" if symbol else ""
+        fields = [prefix + name for name in SENTIMENTS + ["total"]]
+        
+        # Un seul aller-retour: heures complètes pré-comptées, plus les événements de l'heure entamée
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.exists(SENTIMENT_LAST_ENTRY_KEY)
+        for hour in range(first_hour, int(now // 3600) + 1):
+            pipe.hmget(f"{SENTIMENT_HOUR_PREFIX}{hour}", fields)
+        pipe.zrangebyscore(SENTIMENT_EVENTS_KEY, f"({cutoff}", f"({first_hour * 3600}")
+        results = pipe.execute()
+        
+        if not results[0]:
+            return None
+        
+        totals = [0] * len(fields)
+        for values in results[1:-1]:
+            for i, value in enumerate(values):
+                totals[i] += int(value or 0)
+        counts = dict(zip(SENTIMENTS, totals))
+        total_items = totals[-1]
+        
+        for event in results[-1]:
+            item = json.loads(event)
+            if symbol and symbol not in (item.get('related_crypto') or []):
+                continue
+            total_items += 1
+            if item.get('sentiment', 'neutral') in counts:
+                counts[item.get('sentiment', 'neutral')] += 1
+        
+        return counts, total_items
+    
+    def count_sentiments_file(self, hours_back: int, symbol: str = None):
+        """Compte les sentiments de la fenêtre depuis l'index en cache de emotional_data.json"""
+        cutoff_str = (datetime.now() - timedelta(hours=hours_back)).isoformat()
         try:
-            # Calculer la date limite
-            cutoff_date = datetime.now() - timedelta(hours=hours_back)
-            cutoff_str = cutoff_date.isoformat()
-            
-            # Récupérer les données sentimentales depuis Redis
-            sentiment_data = redis_client.get("sentiment_data")
-            
-            if sentiment_data:
-                data = json.loads(sentiment_data)
-            else:
-                # Charger depuis le fichier JSON si non disponible dans Redis
-                try:
-                    with open('/home/crypto_bot/data/emotional_data.json', 'r') as f:
-                        data = json.load(f)
-                except Exception as e:
-                    self.logger.error(f"Erreur lors de la lecture du fichier emotional_data.json: {str(e)}")
-                    data = []
-            
-            # Filtrer les données par date
-            recent_data = [item for item in data if item.get('timestamp', '') > cutoff_str]
-            
-            # Agréger les sentiments
-            sentiment_counts = {
-                "positive": 0,
-                "neutral": 0,
-                "negative": 0
-            }
-            
-            for item in recent_data:
-                sentiment = item.get('sentiment', 'neutral')
-                if sentiment in sentiment_counts:
-                    sentiment_counts[sentiment] += 1
+            index = dashboard_cache.get(SENTIMENT_DATA_FILE, index_sentiment_records)
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la lecture du fichier emotional_data.json: {str(e)}")
+            index = build_sentiment_index([])
+        
+        # Premier élément postérieur à la date limite (recherche dichotomique)
+        start = bisect.bisect_right(index['timestamps'], cutoff_str)
+        
+        if symbol:
+            items = [item for item in index['records'][start:] if symbol in (item.get('related_crypto') or [])]
+            counts = {name: sum(item.get('sentiment', 'neutral') == name for item in items) for name in SENTIMENTS}
+            return counts, len(items)
+        
+        # Agréger les sentiments par différence des comptes cumulés
+        counts = {name: index['cumulative'][name][-1] - index['cumulative'][name][start] for name in SENTIMENTS}
+        return counts, len(index['timestamps']) - start
+    
+    def get_sentiment_data(self, hours_back: int = 24, symbol: str = None) -> Dict:
+        """Récupère les données sentimentales des dernières heures (éventuellement pour un symbole)"""
+        try:
+            # Compteurs horaires Redis, ou index du fichier JSON si Redis n'est pas indexé
+            result = None
+            try:
+                if hours_back <= SENTIMENT_RETENTION_DAYS * 24:
+                    result = self.count_sentiments_redis(hours_back, symbol)
+            except redis.RedisError as e:
+                self.logger.error(f"Erreur lors de la lecture des compteurs de sentiment: {str(e)}")
+            sentiment_counts, total_items = result or self.count_sentiments_file(hours_back, symbol)
             
             # Calculer les pourcentages
             total = sum(sentiment_counts.values()) or 1  # Éviter division par zéro
@@ -140,8 +358,9 @@ class DashboardManager:
             return {
                 "counts": sentiment_counts,
                 "percentages": sentiment_percentages,
-                "total_items": len(recent_data),
+                "total_items": total_items,
                 "hours_analyzed": hours_back,
+                "symbol": symbol,
                 "timestamp": datetime.now().isoformat()
             }
         except Exception as e:
@@ -157,24 +376,20 @@ class DashboardManager:
             if indicators_data:
                 return json.loads(indicators_data)
             else:
-                # Charger depuis le fichier JSON si non disponible dans Redis
+                # Charger depuis le stockage si non disponible dans Redis
                 try:
-                    with open('/home/crypto_bot/data/market_data.json', 'r') as f:
-                        all_data = json.load(f)
-                        symbol_data = [item for item in all_data if item['symbol'] == symbol]
+                    latest = load_latest_market_records([symbol])
+                    
+                    if symbol in latest:
+                        latest_data = latest[symbol]
                         
-                        if symbol_data:
-                            # Trier par timestamp décroissant
-                            symbol_data.sort(key=lambda x: x['timestamp'], reverse=True)
-                            latest_data = symbol_data[0]
-                            
-                            # Extraire les indicateurs techniques
-                            return {
-                                "symbol": symbol,
-                                "indicators": latest_data.get('technical_indicators', {}),
-                                "signal": latest_data.get('technical_signal', 'NEUTRAL'),
-                                "timestamp": latest_data.get('timestamp', datetime.now().isoformat())
-                            }
+                        # Extraire les indicateurs techniques
+                        return {
+                            "symbol": symbol,
+                            "indicators": latest_data.get('technical_indicators', {}),
+                            "signal": latest_data.get('technical_signal', 'NEUTRAL'),
+                            "timestamp": latest_data.get('timestamp', datetime.now().isoformat())
+                        }
                 except Exception as e:
                     self.logger.error(f"Erreur lors de la lecture du fichier market_data.json: {str(e)}")
             
@@ -200,19 +415,16 @@ class DashboardManager:
             else:
                 # Charger depuis le fichier JSON si non disponible dans Redis
                 try:
-                    with open('/home/crypto_bot/data/market_reports.json', 'r') as f:
-                        reports = json.load(f)
-                        if reports:
-                            latest_report = reports[0]
-                            
-                            # Extraire les recommandations
-                            return {
-                                "report_date": latest_report.get('date', ''),
-                                "market_summary": latest_report.get('market_summary', {}),
-                                "recommendations": latest_report.get('crypto_data', {}),
-                                "market_trends": latest_report.get('market_trends', {}),
-                                "timestamp": datetime.now().isoformat()
-                            }
+                    latest_report = dashboard_cache.get(MARKET_REPORTS_FILE, first_report)
+                    if latest_report:
+                        # Extraire les recommandations
+                        return {
+                            "report_date": latest_report.get('date', ''),
+                            "market_summary": latest_report.get('market_summary', {}),
+                            "recommendations": latest_report.get('crypto_data', {}),
+                            "market_trends": latest_report.get('market_trends', {}),
+                            "timestamp": datetime.now().isoformat()
+                        }
                 except Exception as e:
                     self.logger.error(f"Erreur lors de la lecture du fichier market_reports.json: {str(e)}")
             
@@ -227,10 +439,215 @@ class DashboardManager:
         except Exception as e:
             self.logger.error(f"Erreur lors de la récupération des recommandations: {str(e)}")
             return {"error": str(e)}
+    
+    def get_rolling_correlation(self, symbol: str, lag: str = None, hours_back: int = None) -> Dict:
+        """Récupère la série de corrélation glissante sentiment/prix pré-calculée d'un symbole"""
+        try:
+            if not symbol.isalnum():
+                return {"symbol": symbol, "error": "Symbole invalide"}
+            
+            # Seuls les fichiers journaliers couvrant la période sont lus (et gardés en cache)
+            series = rolling_correlation_store.load(
+                symbol.upper(), hours_back or None, reader=lambda path: dashboard_cache.get(path, parse_chunk)
+            )
+            if series is None:
+                return {"symbol": symbol, "timestamps": [], "values": {}, "error": "Données non disponibles"}
+            
+            timestamps = series['timestamps']
+            values = series['values']
+            
+            # Limiter aux dernières heures demandées
+            if hours_back and timestamps:
+                cutoff = (datetime.fromisoformat(timestamps[-1]) - timedelta(hours=hours_back)).isoformat()
+                start = bisect.bisect_right(timestamps, cutoff)
+                timestamps = timestamps[start:]
+                values = {label: serie[start:] for label, serie in values.items()}
+            
+            if lag:
+                values = {lag: values[lag]} if lag in values else {}
+            
+            return {
+                "symbol": series['symbol'],
+                "timestamps": timestamps,
+                "values": values,
+                "timestamp": datetime.now().isoformat()
+            }
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la récupération de la corrélation glissante: {str(e)}")
+            return {"error": str(e)}
+    
+    def get_history(self, symbol: str, start_ms: int, end_ms: int, resolution: str = 'auto',
+                    points: int = HISTORY_DEFAULT_POINTS) -> Dict:
+        """Récupère l'historique d'un symbole en barres OHLCV ou en points sous-échantillonnés (LTTB)"""
+        try:
+            if not symbol.isalnum():
+                return {"symbol": symbol, "error": "Symbole invalide"}
+            if resolution != 'auto' and resolution != 'lttb' and resolution not in RESOLUTIONS:
+                return {"symbol": symbol, "error": f"Résolution invalide (auto, lttb, {', '.join(RESOLUTIONS)})"}
+            if end_ms < start_ms:
+                return {"symbol": symbol, "error": "Plage invalide"}
+            
+            symbol = symbol.upper()
+            points = max(3, min(points, HISTORY_MAX_POINTS))
+            
+            # Nombre de barres au plus dans la plage, pour chaque résolution (de la plus fine à la plus large)
+            names = list(RESOLUTIONS)
+            counts = {name: (end_ms - start_ms) // RESOLUTIONS[name][0] + 1 for name in names}
+            
+            result = {
+                "symbol": symbol,
+                "from": datetime.fromtimestamp(start_ms / 1000, timezone.utc).isoformat(),
+                "to": datetime.fromtimestamp(end_ms / 1000, timezone.utc).isoformat(),
+                "timestamp": datetime.now().isoformat()
+            }
+            
+            if resolution == 'lttb':
+                # Barres les plus fines dont le volume à lire reste borné, puis LTTB sur les clôtures
+                budget = points * LTTB_OVERSAMPLING
+                source = next((name for name in names if counts[name] <= budget), names[-1])
+                bars = load_history_bars(symbol, source, start_ms, end_ms)
+                selected = lttb(bars['t'], bars['close'], points)
+                result.update({
+                    "resolution": "lttb",
+                    "source_resolution": source,
+                    "points": {
+                        "t": [bars['t'][i] for i in selected],
+                        "price": [bars['close'][i] for i in selected]
+                    }
+                })
+                return result
+            
+            # La résolution demandée est élargie tant qu'elle dépasse le nombre de points demandé
+            start_index = 0 if resolution == 'auto' else names.index(resolution)
+            chosen = next((name for name in names[start_index:] if counts[name] <= points), names[-1])
+            bars = load_history_bars(symbol, chosen, start_ms, end_ms)
+            if len(bars['t']) > points:
+                # Plage plus longue que points jours: barres de plusieurs jours (plus haut,
+                # plus bas et volume de toute la période conservés)
+                days = -(-len(bars['t']) // points)
+                while (bars['t'][-1] // (days * DAY_MS)) - (bars['t'][0] // (days * DAY_MS)) + 1 > points:
+                    days += 1
+                bars = merge_bars(bars, days * DAY_MS)
+                chosen = f"{days}d"
+            
+            result.update({"resolution": chosen, "bars": bars})
+            return result
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la récupération de l'historique: {str(e)}")
+            return {"error": str(e)}
+    
+    def get_risk_metrics(self, symbol: str = None) -> Dict:
+        """Récupère les indicateurs de risque du portefeuille (drawdown, volatilité, Sharpe, Sortino, VaR)"""
+        try:
+            state = RiskState.load('/home/crypto_bot/data/risk_state.json')
+            if state is None:
+                return {"portfolio": {}, "assets": {}, "error": "Données non disponibles"}
+            
+            report = state.report()
+            if symbol:
+                symbol = symbol.upper()
+                report['assets'] = {symbol: report['assets'][symbol]} if symbol in report['assets'] else {}
+            
+            report['timestamp'] = datetime.now().isoformat()
+            return report
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la récupération des indicateurs de risque: {str(e)}")
+            return {"error": str(e)}
 
 # Initialiser le gestionnaire de dashboard
 dashboard_manager = DashboardManager()
 
+class ApiResponseCache:
+    """
+    Réponses de l'API sérialisées, versionnées et compressées une seule fois
+    
+    Une réponse est recalculée au plus toutes les ttl secondes, ou dès que la
+    tâche de mise à jour a publié de nouvelles données. Son ETag est l'empreinte
+    du contenu hors champ "timestamp": une réponse recalculée à l'identique
+    garde son ETag, son corps et ses versions compressées. L'ETag est faible
+    (W/): les corps identity, gzip et br et les horodatages successifs sont
+    équivalents sans être identiques octet par octet.
+    """
+    
+    def __init__(self, ttl: float = API_CACHE_TTL, max_entries: int = API_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key: str, version: int) -> Dict:
+        """Retourne l'entrée d'une URL si elle est encore valide, sinon None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry["version"] != version or time.monotonic() - entry["checked_at"] >= self.ttl:
+                return None
+            self.entries.move_to_end(key)
+            return entry
+    
+    def store(self, key: str, version: int, payload) -> Dict:
+        """Sérialise une réponse et la met en cache (l'entrée existante est conservée si le contenu est identique)"""
+        stamp = None
+        if isinstance(payload, dict) and "timestamp" in payload:
+            payload = dict(payload)
+            stamp = payload.pop("timestamp")
+        body = app.json.dumps(payload, separators=(",", ":"))
+        etag = hashlib.blake2b(body.encode('utf-8'), digest_size=16).hexdigest()
+        
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry["etag"] != etag:
+                if stamp is not None:
+                    body = body[:-1] + ("," if payload else "") + f'"timestamp":{app.json.dumps(stamp)}}}'
+                entry = {"etag": etag, "bodies": {"identity": body.encode('utf-8')}}
+                self.entries[key] = entry
+            entry["version"] = version
+            entry["checked_at"] = time.monotonic()
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+    
+    @staticmethod
+    def body(entry: Dict, encoding: str) -> bytes:
+        """Corps d'une entrée dans un encodage (identity, gzip ou br), compressé au premier usage"""
+        bodies = entry["bodies"]
+        if encoding not in bodies:
+            raw = bodies["identity"]
+            bodies[encoding] = brotli.compress(raw, quality=5) if encoding == 'br' else gzip.compress(raw, 6)
+        return bodies[encoding]
+
+# Cache des réponses de l'API
+api_cache = ApiResponseCache()
+
+def cached_api(view):
+    """Sert une route de l'API depuis le cache des réponses, avec ETag, 304 Not Modified et compression"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.full_path
+        version = cache_refresher.version
+        entry = api_cache.get(key, version)
+        if entry is None:
+            entry = api_cache.store(key, version, view(*args, **kwargs))
+        
+        if request.if_none_match.contains_weak(entry["etag"]):
+            response = Response(status=304)
+        else:
+            encoding = 'identity'
+            if len(entry["bodies"]["identity"]) >= COMPRESSION_MIN_SIZE:
+                if brotli is not None and request.accept_encodings['br']:
+                    encoding = 'br'
+                elif request.accept_encodings['gzip']:
+                    encoding = 'gzip'
+            response = Response(ApiResponseCache.body(entry, encoding), mimetype='application/json')
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        
+        response.set_etag(entry["etag"], weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+    return wrapper
+
 @app.route('/')
 def index():
     """Page d'accueil du dashboard"""
@@ -257,98 +674,365 @@ def settings():
     return render_template('settings/index.html')
 
 @app.route('/api/trading-summary')
+@cached_api
 def api_trading_summary():
     """API pour récupérer le résumé de trading"""
-    return jsonify(dashboard_manager.get_trading_summary())
+    return dashboard_manager.get_trading_summary()
 
 @app.route('/api/market-data')
+@cached_api
 def api_market_data():
     """API pour récupérer les données de marché"""
     symbols = request.args.get('symbols')
     if symbols:
         symbols = symbols.split(',')
-    return jsonify(dashboard_manager.get_market_data(symbols))
+    return dashboard_manager.get_market_data(symbols)
 
 @app.route('/api/sentiment-data')
+@cached_api
 def api_sentiment_data():
     """API pour récupérer les données sentimentales"""
     hours_back = request.args.get('hours', 24, type=int)
-    return jsonify(dashboard_manager.get_sentiment_data(hours_back))
+    symbol = request.args.get('symbol')
+    return dashboard_manager.get_sentiment_data(hours_back, symbol.upper() if symbol else None)
 
 @app.route('/api/technical-indicators/<symbol>')
+@cached_api
 def api_technical_indicators(symbol):
     """API pour récupérer les indicateurs techniques"""
-    return jsonify(dashboard_manager.get_technical_indicators(symbol))
+    return dashboard_manager.get_technical_indicators(symbol)
 
 @app.route('/api/portfolio-recommendations')
+@cached_api
 def api_portfolio_recommendations():
     """API pour récupérer les recommandations de portefeuille"""
-    return jsonify(dashboard_manager.get_portfolio_recommendations())
+    return dashboard_manager.get_portfolio_recommendations()
 
-# Fonction pour mettre à jour périodiquement les données dans Redis
-def update_redis_cache():
-    """Met à jour périodiquement les données dans Redis"""
-    while True:
-        try:
-            # Charger les données de marché
+@app.route('/api/rolling-correlation/<symbol>')
+@cached_api
+def api_rolling_correlation(symbol):
+    """API pour récupérer la corrélation glissante sentiment/prix d'un symbole"""
+    lag = request.args.get('lag')
+    hours_back = request.args.get('hours', type=int)
+    return dashboard_manager.get_rolling_correlation(symbol, lag, hours_back)
+
+@app.route('/api/history/<symbol>')
+@cached_api
+def api_history(symbol):
+    """API pour récupérer l'historique d'un symbole (barres OHLCV ou points LTTB, nombre de points borné)"""
+    try:
+        end_ms = parse_epoch_ms(request.args.get('to'), int(time.time() * 1000))
+        start_ms = parse_epoch_ms(request.args.get('from'), end_ms - HISTORY_DEFAULT_DAYS * 86400 * 1000)
+    except (ValueError, OverflowError):
+        return {"symbol": symbol, "error": "Date invalide (ISO 8601 ou epoch en secondes)"}
+    resolution = request.args.get('resolution', 'auto')
+    points = request.args.get('points', HISTORY_DEFAULT_POINTS, type=int)
+    return dashboard_manager.get_history(symbol, start_ms, end_ms, resolution, points)
+
+@app.route('/api/risk-metrics')
+@cached_api
+def api_risk_metrics():
+    """API pour récupérer les indicateurs de risque du portefeuille et de ses actifs"""
+    return dashboard_manager.get_risk_metrics(request.args.get('symbol'))
+
+class RedisCacheRefresher:
+    """
+    Publie dans Redis les fichiers de données dès qu'ils changent
+    
+    Chaque source est surveillée par sa date de modification et sa taille
+    (un os.stat toutes les poll_interval secondes). Seules les sources
+    modifiées sont relues, et toutes les écritures d'un cycle partent dans un
+    seul pipeline. Une source inchangée est republiée avant l'expiration de ses clés.
+    """
+    
+    def __init__(self, poll_interval: float = 2, republish_interval: float = 1800):
+        self.poll_interval = poll_interval
+        self.republish_interval = republish_interval
+        self.logger = logging.getLogger('redis_cache_refresher')
+        self.sources = [
+            ("market_data", self._market_path, self._build_market),
+            ("sentiment_data", lambda: SENTIMENT_DATA_FILE, self._build_sentiment),
+            ("portfolio_recommendations", lambda: MARKET_REPORTS_FILE, self._build_recommendations)
+        ]
+        self.signatures = {}
+        # Dernière valeur publiée de chaque clé, pour ne diffuser que les changements
+        self.published = {}
+        self.last_sentiment_entry = None
+        self.metrics = {
+            name: {"published_at": None, "source_mtime": None, "refresh_duration_ms": None,
+                   "refresh_count": 0, "keys": 0, "error": None}
+            for name, _, _ in self.sources
+        }
+        self.lock = threading.Lock()
+        # Incrémentée à chaque publication: invalide le cache des réponses de l'API
+        self.version = 0
+    
+    @staticmethod
+    def _market_path() -> str:
+        """Fichier dont la modification signale de nouvelles données de marché"""
+        if market_store.has_data():
+            market_store.latest()  # reconstruit l'index s'il manque
+            return market_store.latest_index_file
+        return MARKET_DATA_FILE
+    
+    @staticmethod
+    def _build_market() -> List:
+        """Dernier tick de chaque symbole (index construit en une passe), expiration de 1 heure"""
+        return [
+            (f"market_data:{symbol}", 3600, json.dumps(latest_data))
+            for symbol, latest_data in load_latest_market_records().items()
+        ]
+    
+    def _build_sentiment(self) -> List:
+        """1000 dernières entrées sentimentales, expiration de 1 heure"""
+        index = dashboard_cache.get(SENTIMENT_DATA_FILE, index_sentiment_records)
+        return [("sentiment_data", 3600, json.dumps(index['records'][-1000:]))]
+    
+    def _sentiment_delta(self) -> List[Dict]:
+        """Entrées sentimentales ajoutées depuis la dernière indexation dans Redis, de la plus ancienne à la plus récente"""
+        if self.last_sentiment_entry is None:
+            self.last_sentiment_entry = redis_client.get(SENTIMENT_LAST_ENTRY_KEY) or ''
+        index = dashboard_cache.get(SENTIMENT_DATA_FILE, index_sentiment_records)
+        # Le workflow ajoute les nouvelles entrées en tête du fichier: elles sont lues jusqu'à
+        # la dernière entrée indexée, quel que soit leur timestamp (les entrées en retard comptent)
+        new_items = []
+        for item in index['arrivals']:
+            if sentiment_digest(item) == self.last_sentiment_entry:
+                break
+            new_items.append(item)
+        return new_items[::-1]
+    
+    @staticmethod
+    def _build_recommendations() -> List:
+        """Rapport de marché le plus récent, expiration de 1 jour"""
+        report = dashboard_cache.get(MARKET_REPORTS_FILE, first_report)
+        return [("portfolio_recommendations", 86400, json.dumps(report))] if report else []
+    
+    def refresh(self, force: bool = False) -> List[str]:
+        """Republie les sources modifiées (ou toutes si force) et retourne leurs noms"""
+        pipe = redis_client.pipeline(transaction=False)
+        pending = []
+        published = {}
+        sentiment_entry = self.last_sentiment_entry
+        
+        for name, path_fn, build in self.sources:
+            metrics = self.metrics[name]
+            start = time.perf_counter()
             try:
-                with open('/home/crypto_bot/data/market_data.json', 'r') as f:
-                    market_data = json.load(f)
-                    
-                    # Organiser par symbole
-                    symbols = set(item['symbol'] for item in market_data)
-                    
-                    for symbol in symbols:
-                        symbol_data = [item for item in market_data if item['symbol'] == symbol]
-                        symbol_data.sort(key=lambda x: x['timestamp'], reverse=True)
-                        
-                        if symbol_data:
-                            # Stocker dans Redis avec expiration de 1 heure
-                            redis_client.setex(
-                                f"market_data:{symbol}", 
-                                3600, 
-                                json.dumps(symbol_data[0])
-                            )
+                path = path_fn()
+                stat = os.stat(path)
+                signature = (path, stat.st_mtime_ns, stat.st_size)
+                
+                expiring = metrics["published_at"] is None or time.time() - metrics["published_at"] >= self.republish_interval
+                if not force and not expiring and signature == self.signatures.get(name):
+                    continue
+                
+                # Le cache des fichiers ne doit pas servir l'ancienne version
+                if signature != self.signatures.get(name):
+                    dashboard_cache.invalidate(path)
+                
+                entries = build()
+                for key, ttl, payload in entries:
+                    pipe.setex(key, ttl, payload)
+                
+                # Diffuser uniquement les clés dont la valeur a changé
+                if name == "sentiment_data":
+                    new_items = self._sentiment_delta()
+                    if new_items:
+                        # Index temporel et compteurs horaires, puis diffusion des nouvelles entrées
+                        index_sentiment_events(pipe, new_items)
+                        sentiment_entry = sentiment_digest(new_items[-1])
+                        pipe.set(SENTIMENT_LAST_ENTRY_KEY, sentiment_entry)
+                        pipe.publish(UPDATES_CHANNEL, json.dumps({"source": name, "items": new_items[-1000:]}))
+                else:
+                    changes = [(key, payload) for key, _, payload in entries if self.published.get(key) != payload]
+                    if changes:
+                        pipe.publish(UPDATES_CHANNEL, encode_changes(name, changes))
+                    published.update(changes)
+                
+                pending.append((name, signature, stat.st_mtime, len(entries), time.perf_counter() - start))
             except Exception as e:
-                logging.error(f"Erreur lors de la mise à jour des données de marché: {str(e)}")
-            
-            # Charger les données sentimentales
+                if metrics["error"] != str(e):
+                    self.logger.error(f"Erreur lors de la mise à jour de {name}: {str(e)}")
+                metrics["error"] = str(e)
+        
+        # Résumé de trading écrit dans Redis par les workflows: une lecture groupée par cycle
+        try:
+            values = redis_client.mget(TRADING_SUMMARY_KEYS)
+            changes = [
+                (key, value) for key, value in zip(TRADING_SUMMARY_KEYS, values)
+                if value is not None and self.published.get(key) != value
+            ]
+            if changes:
+                pipe.publish(UPDATES_CHANNEL, encode_changes("trading_summary", changes))
+            published.update(changes)
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la lecture du résumé de trading: {str(e)}")
+        
+        execute_duration = 0
+        if len(pipe):
+            execute_start = time.perf_counter()
+            pipe.execute()
+            execute_duration = time.perf_counter() - execute_start
+            self.published.update(published)
+            self.last_sentiment_entry = sentiment_entry
+            if pending or published:
+                self.version += 1
+        
+        if pending:
+            now = time.time()
+            with self.lock:
+                for name, signature, mtime, keys, duration in pending:
+                    self.signatures[name] = signature
+                    self.metrics[name].update({
+                        "published_at": now,
+                        "source_mtime": mtime,
+                        "refresh_duration_ms": (duration + execute_duration) * 1000,
+                        "refresh_count": self.metrics[name]["refresh_count"] + 1,
+                        "keys": keys,
+                        "error": None
+                    })
+        
+        return [name for name, *_ in pending]
+    
+    def run(self):
+        """Boucle de surveillance (thread dédié)"""
+        while True:
             try:
-                with open('/home/crypto_bot/data/emotional_data.json', 'r') as f:
-                    sentiment_data = json.load(f)
-                    
-                    # Prendre les 1000 dernières entrées maximum
-                    recent_data = sentiment_data[-1000:]
-                    
-                    # Stocker dans Redis avec expiration de 1 heure
-                    redis_client.setex(
-                        "sentiment_data", 
-                        3600, 
-                        json.dumps(recent_data)
-                    )
+                self.refresh()
             except Exception as e:
-                logging.error(f"Erreur lors de la mise à jour des données sentimentales: {str(e)}")
-            
-            # Charger les rapports de marché
+                self.logger.error(f"Erreur dans la tâche de mise à jour Redis: {str(e)}")
+            time.sleep(self.poll_interval)
+    
+    def get_metrics(self) -> Dict:
+        """Âge des données publiées et durée des dernières mises à jour, par source"""
+        now = time.time()
+        with self.lock:
+            sources = {}
+            for name, metrics in self.metrics.items():
+                published_at = metrics["published_at"]
+                sources[name] = {
+                    "cache_age_seconds": now - published_at if published_at else None,
+                    "source_age_seconds": now - metrics["source_mtime"] if metrics["source_mtime"] else None,
+                    "published_at": datetime.fromtimestamp(published_at).isoformat() if published_at else None,
+                    "last_refresh_duration_ms": metrics["refresh_duration_ms"],
+                    "refresh_count": metrics["refresh_count"],
+                    "keys": metrics["keys"],
+                    "error": metrics["error"]
+                }
+        return {
+            "sources": sources,
+            "poll_interval_seconds": self.poll_interval,
+            "timestamp": datetime.now().isoformat()
+        }
+
+# Tâche de mise à jour des données dans Redis
+cache_refresher = RedisCacheRefresher()
+
+@app.route('/api/cache-metrics')
+@cached_api
+def api_cache_metrics():
+    """API pour récupérer l'âge du cache Redis et la durée des mises à jour"""
+    return cache_refresher.get_metrics()
+
+def update_redis_cache():
+    """Met à jour les données dans Redis dès que les fichiers sources changent"""
+    cache_refresher.run()
+
+class UpdateBroadcaster:
+    """
+    Relaie les mises à jour publiées dans Redis vers les navigateurs connectés (Server-Sent Events)
+    
+    Un seul abonnement pub/sub par processus: chaque message est mis en forme
+    une fois puis déposé dans la file de chaque client. Un client trop lent
+    (file pleine) est déconnecté et se reconnecte automatiquement.
+    """
+    
+    def __init__(self, channel: str = UPDATES_CHANNEL, max_queue: int = 100):
+        self.channel = channel
+        self.max_queue = max_queue
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.logger = logging.getLogger('update_broadcaster')
+    
+    def subscribe(self) -> queue.Queue:
+        """Inscrit un client et démarre l'écoute Redis au premier abonné"""
+        client_queue = queue.Queue(maxsize=self.max_queue)
+        with self.lock:
+            self.subscribers.add(client_queue)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.listen, daemon=True)
+                self.thread.start()
+        return client_queue
+    
+    def unsubscribe(self, client_queue: queue.Queue):
+        """Désinscrit un client"""
+        with self.lock:
+            self.subscribers.discard(client_queue)
+    
+    def broadcast(self, message: str):
+        """Met en forme un message une seule fois et le transmet à tous les clients"""
+        source = json.loads(message).get("source", "update")
+        frame = f"event: {source}\ndata: {message}\n\n"
+        with self.lock:
+            for client_queue in list(self.subscribers):
+                try:
+                    client_queue.put_nowait((source, frame))
+                except queue.Full:
+                    # Client trop lent: file vidée et fin du flux (le navigateur se reconnecte)
+                    self.subscribers.discard(client_queue)
+                    try:
+                        while True:
+                            client_queue.get_nowait()
+                    except queue.Empty:
+                        client_queue.put_nowait((None, None))
+    
+    def listen(self):
+        """Boucle d'écoute du canal Redis (thread dédié), avec reconnexion"""
+        while True:
             try:
-                with open('/home/crypto_bot/data/market_reports.json', 'r') as f:
-                    reports = json.load(f)
-                    
-                    if reports:
-                        # Stocker dans Redis avec expiration de 1 jour
-                        redis_client.setex(
-                            "portfolio_recommendations", 
-                            86400, 
-                            json.dumps(reports[0])
-                        )
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        self.broadcast(message['data'])
             except Exception as e:
-                logging.error(f"Erreur lors de la mise à jour des recommandations: {str(e)}")
-                
-        except Exception as e:
-            logging.error(f"Erreur dans la tâche de mise à jour Redis: {str(e)}")
-        
-        # Attendre 5 minutes avant la prochaine mise à jour
-        time.sleep(300)
+                self.logger.error(f"Erreur lors de l'écoute des mises à jour: {str(e)}")
+                time.sleep(5)
+
+# Diffusion des mises à jour aux navigateurs
+update_broadcaster = UpdateBroadcaster()
+
+@app.route('/api/stream')
+def api_stream():
+    """Flux Server-Sent Events des mises à jour (sources filtrables par ?sources=market_data,trading_summary)"""
+    sources = request.args.get('sources')
+    sources = set(sources.split(',')) if sources else None
+    client_queue = update_broadcaster.subscribe()
+    
+    def events():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    source, frame = client_queue.get(timeout=15)
+                except queue.Empty:
+                    # Maintien de la connexion à travers les proxys
+                    yield ": keepalive\n\n"
+                    continue
+                if frame is None:
+                    return
+                if sources is None or source in sources:
+                    yield frame
+        finally:
+            update_broadcaster.unsubscribe(client_queue)
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 if __name__ == '__main__':
     # Configurer le logging
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark des accès Redis du dashboard: requêtes une par une contre MGET et pipelines
+
+Usage: python3 scripts/benchmark_redis.py [--symbols 200] [--iterations 200]
+"""
+import sys
+import json
+import time
+import argparse
+import statistics
+
+import redis
+
+# Préfixe des clés de test (les clés du dashboard ne sont pas touchées)
+KEY_PREFIX = 'benchmark:'
+
+
+def sample_tick(symbol):
+    """
+    Construit un tick de marché représentatif
+
+    Args:
+        symbol (str): Symbole
+
+    Returns:
+        dict: Tick au format de market_data.json
+    """
+    return {
+        'symbol': symbol,
+        'timestamp': '2025-01-01T00:00:00.000Z',
+        'price': 100.0,
+        'price_change_24h': 1.5,
+        'volume_24h': 1e9,
+        'technical_indicators': {'sma20': 99.0, 'sma50': 97.5, 'rsi14': 55.0, 'macd': 0.4},
+        'technical_signal': 'NEUTRAL'
+    }
+
+
+def measure(operation, iterations):
+    """
+    Mesure la durée d'une opération
+
+    Args:
+        operation (callable): Opération à mesurer
+        iterations (int): Nombre de répétitions
+
+    Returns:
+        tuple: (médiane, 95e percentile) en millisecondes
+    """
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return statistics.median(durations), durations[int(len(durations) * 0.95) - 1]
+
+
+def main():
+    """
+    Fonction principale
+    """
+    parser = argparse.ArgumentParser(description="Benchmark des accès Redis du dashboard")
+    parser.add_argument('--host', default='localhost', help="Hôte Redis")
+    parser.add_argument('--port', type=int, default=6379, help="Port Redis")
+    parser.add_argument('--symbols', type=int, default=200, help="Nombre de symboles")
+    parser.add_argument('--iterations', type=int, default=200, help="Répétitions par mesure")
+    args = parser.parse_args()
+
+    pool = redis.ConnectionPool(host=args.host, port=args.port, decode_responses=True)
+    client = redis.Redis(connection_pool=pool)
+    try:
+        client.ping()
+    except redis.ConnectionError as e:
+        print(f"Redis indisponible sur {args.host}:{args.port}: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    keys = [f"{KEY_PREFIX}market_data:{symbol}" for symbol in symbols]
+    payloads = [json.dumps(sample_tick(symbol)) for symbol in symbols]
+    summary_keys = [f"{KEY_PREFIX}{name}" for name in ('daily_report', 'scan_summary', 'open_positions', 'recent_signals')]
+
+    def setex_each():
+        for key, payload in zip(keys, payloads):
+            client.setex(key, 3600, payload)
+
+    def setex_pipeline():
+        pipe = client.pipeline(transaction=False)
+        for key, payload in zip(keys, payloads):
+            pipe.setex(key, 3600, payload)
+        pipe.execute()
+
+    setex_pipeline()
+    for key in summary_keys:
+        client.setex(key, 3600, '{}')
+
+    cases = [
+        (f"Lecture de {args.symbols} symboles (get_market_data)",
+         lambda: [client.get(key) for key in keys],
+         lambda: client.mget(keys)),
+        ("Résumé de trading, 4 clés (get_trading_summary)",
+         lambda: [client.get(key) for key in summary_keys],
+         lambda: client.mget(summary_keys)),
+        (f"Écriture de {args.symbols} symboles (update_redis_cache)",
+         setex_each,
+         setex_pipeline)
+    ]
+
+    try:
+        for label, each, batched in cases:
+            each_median, each_p95 = measure(each, args.iterations)
+            batched_median, batched_p95 = measure(batched, args.iterations)
+            print(label)
+            print(f"  une par une: {each_median:.3f} ms (p95 {each_p95:.3f} ms)")
+            print(f"  groupée:     {batched_median:.3f} ms (p95 {batched_p95:.3f} ms)")
+            print(f"  gain:        {each_median / batched_median:.1f}x")
+    finally:
+        client.delete(*keys, *summary_keys)
+
+
+if __name__ == "__main__":
+    main()
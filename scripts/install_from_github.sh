@@ -58,7 +58,7 @@ source $INSTALL_DIR/venv/bin/activate
 
 # Installer les dépendances Python
 log "Installation des dépendances Python..."
-pip install faster-whisper yt-dlp pandas numpy matplotlib flask gunicorn plotly redis python-dotenv requests beautifulsoup4
+pip install faster-whisper yt-dlp pandas numpy pyarrow matplotlib flask gunicorn plotly redis python-dotenv brotli requests beautifulsoup4
 
 # Cloner le dépôt GitHub
 log "Clonage du dépôt GitHub..."
@@ -70,7 +70,7 @@ fi
 
 # Créer la structure de répertoires
 log "Création de la structure de répertoires..."
-mkdir -p $INSTALL_DIR/{data,logs,scripts,config,workflows,flask_app,backups}
+mkdir -p $INSTALL_DIR/{data,logs,scripts,config,workflows,flask_app,backups,run}
 mkdir -p $INSTALL_DIR/data/{transcripts}
 
 # Copier les fichiers depuis le dépôt cloné
@@ -130,6 +130,7 @@ After=network.target redis.service
 User=$(logname)
 WorkingDirectory=$INSTALL_DIR/flask_app
 Environment="PATH=$INSTALL_DIR/venv/bin"
+Environment="PYTHONPATH=$INSTALL_DIR/scripts"
 ExecStart=$INSTALL_DIR/venv/bin/gunicorn -w 4 -b 127.0.0.1:5000 app:app
 Restart=always
 RestartSec=10
@@ -138,10 +139,51 @@ RestartSec=10
 WantedBy=multi-user.target
 EOF
 
+# Créer les services systemd des workers (modules et modèle Whisper gardés en mémoire):
+# analyses d'une part, transcriptions (longues) d'autre part
+log "Configuration des workers d'analyse..."
+cat > /etc/systemd/system/crypto-worker.service << EOF
+[Unit]
+Description=Crypto Bot Analysis Worker
+After=network.target
+
+[Service]
+User=root
+WorkingDirectory=$INSTALL_DIR/scripts
+Environment="PATH=$INSTALL_DIR/venv/bin"
+Environment="PYTHONPATH=$INSTALL_DIR/scripts"
+ExecStart=$INSTALL_DIR/venv/bin/python $INSTALL_DIR/scripts/utils/analysis_worker.py
+Restart=always
+RestartSec=10
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
+cat > /etc/systemd/system/crypto-transcriber.service << EOF
+[Unit]
+Description=Crypto Bot Transcription Worker
+After=network.target
+
+[Service]
+User=root
+WorkingDirectory=$INSTALL_DIR/scripts
+Environment="PATH=$INSTALL_DIR/venv/bin"
+Environment="PYTHONPATH=$INSTALL_DIR/scripts"
+ExecStart=$INSTALL_DIR/venv/bin/python $INSTALL_DIR/scripts/utils/analysis_worker.py --socket /home/crypto_bot/run/transcription_worker.sock --jobs transcription --preload-whisper
+Restart=always
+RestartSec=10
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
 # Recharger systemd et activer les services
 systemctl daemon-reload
 systemctl enable n8n
 systemctl enable crypto-flask
+systemctl enable crypto-worker
+systemctl enable crypto-transcriber
 systemctl enable redis
 systemctl enable nginx
 
@@ -185,6 +227,8 @@ chmod 600 $INSTALL_DIR/config/api_keys.env
 # Démarrer les services
 log "Démarrage des services..."
 systemctl start redis
+systemctl start crypto-worker
+systemctl start crypto-transcriber
 systemctl start n8n
 systemctl start crypto-flask
 systemctl restart nginx
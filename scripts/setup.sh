@@ -28,7 +28,7 @@ fi
 
 # Créer la structure de fichiers
 log "Création de la structure de fichiers..."
-mkdir -p /home/crypto_bot/{data,scripts,config,logs,backups}
+mkdir -p /home/crypto_bot/{data,scripts,config,logs,backups,run}
 
 # Définir les droits d'accès
 chmod -R 755 /home/crypto_bot
@@ -55,7 +55,7 @@ source /home/crypto_bot/venv/bin/activate
 
 # Installer les dépendances Python
 log "Installation des dépendances Python..."
-pip install faster-whisper yt-dlp pandas numpy matplotlib flask gunicorn plotly redis python-dotenv
+pip install faster-whisper yt-dlp pandas numpy pyarrow matplotlib flask gunicorn plotly redis python-dotenv brotli
 
 # Copier les fichiers depuis le dépôt
 log "Copie des fichiers depuis le dépôt..."
@@ -127,6 +127,7 @@ After=network.target redis.service
 User=ubuntu
 WorkingDirectory=/home/crypto_bot/flask_app
 Environment="PATH=/home/crypto_bot/venv/bin"
+Environment="PYTHONPATH=/home/crypto_bot/scripts"
 ExecStart=/home/crypto_bot/venv/bin/gunicorn -w 4 -b 127.0.0.1:5000 app:app
 Restart=always
 RestartSec=10
@@ -135,10 +136,51 @@ RestartSec=10
 WantedBy=multi-user.target
 EOF
 
+# Créer les services systemd des workers (modules et modèle Whisper gardés en mémoire):
+# analyses d'une part, transcriptions (longues) d'autre part
+log "Configuration des workers d'analyse..."
+cat > /etc/systemd/system/crypto-worker.service << 'EOF'
+[Unit]
+Description=Crypto Bot Analysis Worker
+After=network.target
+
+[Service]
+User=root
+WorkingDirectory=/home/crypto_bot/scripts
+Environment="PATH=/home/crypto_bot/venv/bin"
+Environment="PYTHONPATH=/home/crypto_bot/scripts"
+ExecStart=/home/crypto_bot/venv/bin/python /home/crypto_bot/scripts/utils/analysis_worker.py
+Restart=always
+RestartSec=10
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
+cat > /etc/systemd/system/crypto-transcriber.service << 'EOF'
+[Unit]
+Description=Crypto Bot Transcription Worker
+After=network.target
+
+[Service]
+User=root
+WorkingDirectory=/home/crypto_bot/scripts
+Environment="PATH=/home/crypto_bot/venv/bin"
+Environment="PYTHONPATH=/home/crypto_bot/scripts"
+ExecStart=/home/crypto_bot/venv/bin/python /home/crypto_bot/scripts/utils/analysis_worker.py --socket /home/crypto_bot/run/transcription_worker.sock --jobs transcription --preload-whisper
+Restart=always
+RestartSec=10
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
 # Recharger systemd et activer les services
 systemctl daemon-reload
 systemctl enable n8n
 systemctl enable crypto-flask
+systemctl enable crypto-worker
+systemctl enable crypto-transcriber
 systemctl enable redis
 systemctl enable nginx
 
@@ -176,6 +218,8 @@ done
 # Démarrer les services
 log "Démarrage des services..."
 systemctl start redis
+systemctl start crypto-worker
+systemctl start crypto-transcriber
 systemctl start n8n
 systemctl start crypto-flask
 systemctl restart nginx
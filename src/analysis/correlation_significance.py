@@ -0,0 +1,176 @@
+import numpy as np
+
+from analysis.cross_correlation import cross_correlation
+
+
+def _masked_corr(a, b, min_periods=3):
+    """
+    Corrélation de Pearson le long du dernier axe en ignorant les NaN paire par paire
+
+    Args:
+        a (np.ndarray): Tableau (..., observations)
+        b (np.ndarray): Tableau (..., observations)
+        min_periods (int): Nombre minimal de paires
+
+    Returns:
+        np.ndarray: Corrélations (...)
+    """
+    mask = np.isfinite(a) & np.isfinite(b)
+    n = mask.sum(axis=-1)
+    a = np.where(mask, a, 0.0)
+    b = np.where(mask, b, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_a = a.sum(axis=-1) / n
+        mean_b = b.sum(axis=-1) / n
+        da = np.where(mask, a - mean_a[..., None], 0.0)
+        db = np.where(mask, b - mean_b[..., None], 0.0)
+        corr = (da * db).sum(axis=-1) / np.sqrt((da * da).sum(axis=-1) * (db * db).sum(axis=-1))
+    return np.where(n >= min_periods, np.clip(corr, -1.0, 1.0), np.nan)
+
+
+def block_permutations(y, n_resamples, block_size, rng):
+    """
+    Génère des permutations par blocs d'une série (l'autocorrélation intra-bloc est conservée)
+
+    Args:
+        y (np.ndarray): Série (observations)
+        n_resamples (int): Nombre de permutations
+        block_size (int): Taille des blocs
+        rng (np.random.Generator): Générateur aléatoire
+
+    Returns:
+        np.ndarray: Séries permutées (permutations, blocs * taille des blocs)
+    """
+    n_blocks = int(np.ceil(len(y) / block_size))
+    padded = np.full(n_blocks * block_size, np.nan)
+    padded[:len(y)] = y
+    blocks = padded.reshape(n_blocks, block_size)
+    order = np.argsort(rng.random((n_resamples, n_blocks)), axis=1)
+    return blocks[order].reshape(n_resamples, -1)
+
+
+def block_bootstrap_indices(n_obs, n_resamples, block_size, rng):
+    """
+    Génère les indices d'un bootstrap par blocs mobiles
+
+    Args:
+        n_obs (int): Nombre d'observations
+        n_resamples (int): Nombre de rééchantillonnages
+        block_size (int): Taille des blocs
+        rng (np.random.Generator): Générateur aléatoire
+
+    Returns:
+        np.ndarray: Indices (rééchantillonnages, observations)
+    """
+    block_size = max(1, min(block_size, n_obs))
+    n_blocks = int(np.ceil(n_obs / block_size))
+    starts = rng.integers(0, n_obs - block_size + 1, size=(n_resamples, n_blocks))
+    indices = starts[:, :, None] + np.arange(block_size)
+    return indices.reshape(n_resamples, -1)[:, :n_obs]
+
+
+def correlation_significance(x, y, max_lag, ci_lags, n_resamples=1000, block_size=24,
+                             confidence=0.95, seed=None, chunk_size=500):
+    """
+    Évalue la significativité des corrélations d'un symbole pour tous les décalages
+
+    Les p-values sont obtenues par permutation par blocs du sentiment: toutes
+    les permutations sont évaluées en un seul calcul FFT groupé. La p-value
+    ajustée compare chaque corrélation au maximum sur tous les décalages de
+    chaque permutation, ce qui corrige la sélection du meilleur décalage.
+    Les intervalles de confiance proviennent d'un bootstrap par blocs des
+    paires, vectorisé sur les rééchantillonnages.
+
+    Args:
+        x (np.ndarray): Variations de prix horaires (observations)
+        y (np.ndarray): Sentiment horaire (observations)
+        max_lag (int): Décalage maximal en heures
+        ci_lags (list): Décalages pour lesquels calculer un intervalle de confiance
+        n_resamples (int): Nombre de permutations et de rééchantillonnages
+        block_size (int): Taille des blocs en heures
+        confidence (float): Niveau des intervalles de confiance
+        seed (int, optional): Graine du générateur aléatoire
+        chunk_size (int): Nombre de rééchantillonnages traités à la fois (borne la mémoire)
+
+    Returns:
+        dict: Décalages, p-values brutes et ajustées, intervalles de confiance
+    """
+    rng = np.random.default_rng(seed)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n_obs = len(x)
+
+    lags, observed, _ = cross_correlation(x[None, :], y[None, :], max_lag)
+    observed = np.abs(observed[0])
+
+    # Permutations par blocs, évaluées par paquets pour borner la mémoire
+    exceed = np.zeros(len(lags))
+    exceed_max = np.zeros(len(lags))
+    valid = np.zeros(len(lags))
+    for start in range(0, n_resamples, chunk_size):
+        count = min(chunk_size, n_resamples - start)
+        permuted = block_permutations(y, count, block_size, rng)
+        x_padded = np.full(permuted.shape[1], np.nan)
+        x_padded[:n_obs] = x
+        _, null_corr, _ = cross_correlation(np.broadcast_to(x_padded, permuted.shape), permuted, len(lags) // 2)
+        null_abs = np.abs(null_corr)
+        finite = np.isfinite(null_abs)
+        with np.errstate(invalid='ignore'):
+            exceed += (finite & (null_abs >= observed - 1e-12)).sum(axis=0)
+            null_max = np.nanmax(np.where(finite, null_abs, -1.0), axis=1)
+            exceed_max += (null_max[:, None] >= observed[None, :] - 1e-12).sum(axis=0)
+        valid += finite.sum(axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p_values = (exceed + 1) / (valid + 1)
+        p_adjusted = (exceed_max + 1) / (n_resamples + 1)
+    p_values = np.where(np.isfinite(observed), p_values, np.nan)
+    p_adjusted = np.where(np.isfinite(observed), p_adjusted, np.nan)
+
+    # Bootstrap par blocs des paires (x[t], y[t - k]) pour les décalages demandés
+    ci_lags = [int(lag) for lag in ci_lags if abs(int(lag)) <= lags[-1]]
+    pairs_x = np.full((len(ci_lags), n_obs), np.nan)
+    pairs_y = np.full((len(ci_lags), n_obs), np.nan)
+    for j, lag in enumerate(ci_lags):
+        if lag >= 0:
+            pairs_x[j, lag:] = x[lag:]
+            pairs_y[j, lag:] = y[:n_obs - lag]
+        else:
+            pairs_x[j, :n_obs + lag] = x[:n_obs + lag]
+            pairs_y[j, :n_obs + lag] = y[-lag:]
+
+    boot = []
+    for start in range(0, n_resamples, chunk_size):
+        count = min(chunk_size, n_resamples - start)
+        indices = block_bootstrap_indices(n_obs, count, block_size, rng)
+        boot.append(_masked_corr(pairs_x[:, indices], pairs_y[:, indices]))
+    boot = np.concatenate(boot, axis=1) if boot else np.empty((len(ci_lags), 0))
+
+    alpha = (1 - confidence) / 2
+    intervals = {}
+    for j, lag in enumerate(ci_lags):
+        samples = boot[j][np.isfinite(boot[j])]
+        if len(samples):
+            intervals[lag] = (float(np.quantile(samples, alpha)), float(np.quantile(samples, 1 - alpha)))
+
+    return {
+        'lags': lags,
+        'p_values': p_values,
+        'p_values_adjusted': p_adjusted,
+        'confidence_intervals': intervals
+    }
+
+
+def significance_shard(args):
+    """
+    Évalue la significativité d'un symbole (exécuté dans un processus de travail)
+
+    Args:
+        args (tuple): (x, y, max_lag, ci_lags, n_resamples, block_size, seed)
+
+    Returns:
+        dict: Résultat de correlation_significance
+    """
+    x, y, max_lag, ci_lags, n_resamples, block_size, seed = args
+    return correlation_significance(x, y, max_lag, ci_lags, n_resamples=n_resamples,
+                                    block_size=block_size, seed=seed)
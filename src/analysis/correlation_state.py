@@ -0,0 +1,294 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class CorrelationState:
+    """
+    État incrémental des corrélations sentiment/prix par symbole et par décalage
+
+    Pour chaque décalage k, les paires (variation de prix x[t], sentiment y[t - k])
+    de la fenêtre glissante sont résumées par une moyenne et des co-moments de
+    type Welford. Chaque heure ajoutée insère les paires qu'elle complète et
+    retire celles qui sortent de la fenêtre: le coût par heure est O(décalages).
+    """
+
+    STAT_NAMES = ('n', 'mean_x', 'mean_y', 'm2_x', 'm2_y', 'c_xy')
+
+    def __init__(self, window_hours=168, max_lag=72, min_periods=3):
+        """
+        Initialise un état vide
+
+        Args:
+            window_hours (int): Taille de la fenêtre glissante en heures
+            max_lag (int): Décalage maximal en heures, dans les deux sens
+            min_periods (int): Nombre minimal de paires pour une corrélation
+        """
+        self.window_hours = window_hours
+        self.max_lag = min(max_lag, window_hours - 1)
+        self.min_periods = min_periods
+        self.lags = np.arange(-self.max_lag, self.max_lag + 1)
+        self.buffer_size = window_hours + 1
+
+        self.symbols = []
+        self.last_hour = None
+        self.last_price = np.empty(0)
+        self.x_buffer = np.empty((0, self.buffer_size))
+        self.y_buffer = np.empty((0, self.buffer_size))
+        self.stats = {name: np.empty((0, len(self.lags))) for name in self.STAT_NAMES}
+
+    def add_symbols(self, symbols):
+        """
+        Ajoute des symboles à l'état (sans historique)
+
+        Args:
+            symbols (list): Symboles à suivre
+        """
+        new_symbols = [symbol for symbol in symbols if symbol not in self.symbols]
+        if not new_symbols:
+            return
+        count = len(new_symbols)
+        self.symbols.extend(new_symbols)
+        self.last_price = np.concatenate([self.last_price, np.full(count, np.nan)])
+        self.x_buffer = np.vstack([self.x_buffer, np.full((count, self.buffer_size), np.nan)])
+        self.y_buffer = np.vstack([self.y_buffer, np.full((count, self.buffer_size), np.nan)])
+        for name in self.STAT_NAMES:
+            self.stats[name] = np.vstack([self.stats[name], np.zeros((count, len(self.lags)))])
+
+    def fold(self, symbols, hours, prices, sentiments):
+        """
+        Intègre de nouvelles heures closes dans l'état
+
+        Args:
+            symbols (list): Symboles des lignes des matrices
+            hours (pd.DatetimeIndex): Heures consécutives postérieures à last_hour
+            prices (np.ndarray): Dernier prix de chaque heure (symboles, heures)
+            sentiments (np.ndarray): Sentiment moyen de chaque heure (symboles, heures)
+        """
+        self.add_symbols(symbols)
+        rows = np.array([self.symbols.index(symbol) for symbol in symbols], dtype=int)
+
+        for j, hour in enumerate(hours):
+            hour = pd.Timestamp(hour)
+            if self.last_hour is not None:
+                # Heure déjà intégrée: l'appelant n'intègre une heure qu'après
+                # le délai de grâce des données sentimentales en retard
+                if hour <= self.last_hour:
+                    continue
+                # Heures sans données entre deux exécutions
+                gap = int((hour - self.last_hour) / pd.Timedelta(hours=1)) - 1
+                if gap > self.buffer_size + self.max_lag:
+                    self.reset_window()
+                else:
+                    for _ in range(gap):
+                        self._step(self.last_hour + pd.Timedelta(hours=1), None, None)
+
+            price = np.full(len(self.symbols), np.nan)
+            sentiment = np.full(len(self.symbols), np.nan)
+            price[rows] = prices[:, j]
+            sentiment[rows] = sentiments[:, j]
+            self._step(hour, price, sentiment)
+
+    def reset_window(self):
+        """
+        Vide la fenêtre glissante (après une interruption plus longue que la fenêtre)
+        """
+        self.last_price[:] = np.nan
+        self.x_buffer[:] = np.nan
+        self.y_buffer[:] = np.nan
+        for name in self.STAT_NAMES:
+            self.stats[name][:] = 0.0
+
+    def correlations(self):
+        """
+        Calcule les corrélations courantes à partir des co-moments
+
+        Returns:
+            tuple: (décalages, corrélations (symboles, décalages), nombre de paires)
+        """
+        n = self.stats['n']
+        m2_x = self.stats['m2_x']
+        m2_y = self.stats['m2_y']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.stats['c_xy'] / np.sqrt(m2_x * m2_y)
+        invalid = (n < self.min_periods) | (m2_x <= 1e-12) | (m2_y <= 1e-12)
+        corr = np.clip(np.where(invalid, np.nan, corr), -1.0, 1.0)
+        return self.lags, corr, np.rint(n).astype(int)
+
+    def window_arrays(self):
+        """
+        Retourne les séries de la fenêtre courante dans l'ordre chronologique
+
+        Returns:
+            tuple: (variations de prix, sentiment), matrices (symboles, heures)
+        """
+        if self.last_hour is None:
+            empty = np.empty((len(self.symbols), 0))
+            return empty, empty
+        t = int(self.last_hour.timestamp() // 3600)
+        slots = (t - self.window_hours + 1 + np.arange(self.window_hours)) % self.buffer_size
+        return self.x_buffer[:, slots], self.y_buffer[:, slots]
+
+    def _step(self, hour, price, sentiment):
+        """
+        Avance l'état d'une heure
+
+        Args:
+            hour (pd.Timestamp): Heure intégrée
+            price (np.ndarray): Dernier prix de l'heure par symbole (None si absent)
+            sentiment (np.ndarray): Sentiment moyen de l'heure par symbole (None si absent)
+        """
+        size = self.buffer_size
+        t = int(hour.timestamp() // 3600)
+        slot = t % size
+
+        # Variation horaire par rapport à l'heure précédente
+        if price is None:
+            price = np.full(len(self.symbols), np.nan)
+            sentiment = np.full(len(self.symbols), np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x_new = price / self.last_price - 1
+        self.last_price = price
+
+        # Retirer les paires dont la première heure sort de la fenêtre
+        e = t - self.window_hours
+        abs_lags = np.abs(self.lags)
+        x_old = np.where(self.lags >= 0, (e + abs_lags) % size, e % size)
+        y_old = np.where(self.lags >= 0, e % size, (e + abs_lags) % size)
+        self._update(self.x_buffer[:, x_old], self.y_buffer[:, y_old], remove=True)
+
+        self.x_buffer[:, slot] = x_new
+        self.y_buffer[:, slot] = sentiment
+
+        # Ajouter les paires complétées par cette heure
+        x_idx = np.where(self.lags >= 0, t % size, (t - abs_lags) % size)
+        y_idx = np.where(self.lags >= 0, (t - abs_lags) % size, t % size)
+        self._update(self.x_buffer[:, x_idx], self.y_buffer[:, y_idx], remove=False)
+
+        self.last_hour = hour
+
+    def _update(self, x, y, remove):
+        """
+        Ajoute ou retire des paires des co-moments (formules de Welford)
+
+        Args:
+            x (np.ndarray): Variations de prix (symboles, décalages)
+            y (np.ndarray): Sentiments (symboles, décalages)
+            remove (bool): True pour retirer les paires
+        """
+        valid = np.isfinite(x) & np.isfinite(y)
+        if not valid.any():
+            return
+        s = self.stats
+        x = np.where(valid, x, 0.0)
+        y = np.where(valid, y, 0.0)
+
+        if remove:
+            n_new = s['n'] - valid
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean_x_new = np.where(n_new > 0, (s['n'] * s['mean_x'] - x) / n_new, 0.0)
+                mean_y_new = np.where(n_new > 0, (s['n'] * s['mean_y'] - y) / n_new, 0.0)
+            dx = x - mean_x_new
+            dy = y - mean_y_new
+            s['c_xy'] = np.where(valid, s['c_xy'] - dx * (y - s['mean_y']), s['c_xy'])
+            s['m2_x'] = np.where(valid, s['m2_x'] - dx * (x - s['mean_x']), s['m2_x'])
+            s['m2_y'] = np.where(valid, s['m2_y'] - dy * (y - s['mean_y']), s['m2_y'])
+            s['mean_x'] = np.where(valid, mean_x_new, s['mean_x'])
+            s['mean_y'] = np.where(valid, mean_y_new, s['mean_y'])
+            s['n'] = n_new
+            empty = s['n'] <= 0
+            for name in self.STAT_NAMES:
+                s[name] = np.where(empty, 0.0, s[name])
+        else:
+            n_new = s['n'] + valid
+            safe_n = np.maximum(n_new, 1)
+            dx = x - s['mean_x']
+            dy = y - s['mean_y']
+            mean_x_new = np.where(valid, s['mean_x'] + dx / safe_n, s['mean_x'])
+            mean_y_new = np.where(valid, s['mean_y'] + dy / safe_n, s['mean_y'])
+            s['c_xy'] = np.where(valid, s['c_xy'] + dx * (y - mean_y_new), s['c_xy'])
+            s['m2_x'] = np.where(valid, s['m2_x'] + dx * (x - mean_x_new), s['m2_x'])
+            s['m2_y'] = np.where(valid, s['m2_y'] + dy * (y - mean_y_new), s['m2_y'])
+            s['mean_x'] = mean_x_new
+            s['mean_y'] = mean_y_new
+            s['n'] = n_new
+
+    def to_dict(self):
+        """
+        Sérialise l'état
+
+        Returns:
+            dict: État sérialisable en JSON
+        """
+        return {
+            'window_hours': self.window_hours,
+            'max_lag': self.max_lag,
+            'min_periods': self.min_periods,
+            'symbols': self.symbols,
+            'last_hour': self.last_hour.isoformat() if self.last_hour is not None else None,
+            'last_price': self.last_price.tolist(),
+            'x_buffer': self.x_buffer.tolist(),
+            'y_buffer': self.y_buffer.tolist(),
+            'stats': {name: values.tolist() for name, values in self.stats.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Reconstruit un état sérialisé
+
+        Args:
+            data (dict): État produit par to_dict()
+
+        Returns:
+            CorrelationState: État reconstruit
+        """
+        state = cls(data['window_hours'], data['max_lag'], data['min_periods'])
+        state.symbols = list(data['symbols'])
+        state.last_hour = pd.Timestamp(data['last_hour']) if data['last_hour'] else None
+        count = len(state.symbols)
+        state.last_price = np.array(data['last_price'], dtype=float).reshape(count)
+        state.x_buffer = np.array(data['x_buffer'], dtype=float).reshape(count, state.buffer_size)
+        state.y_buffer = np.array(data['y_buffer'], dtype=float).reshape(count, state.buffer_size)
+        state.stats = {
+            name: np.array(data['stats'][name], dtype=float).reshape(count, len(state.lags))
+            for name in cls.STAT_NAMES
+        }
+        return state
+
+    def save(self, path):
+        """
+        Sauvegarde l'état de façon atomique
+
+        Args:
+            path (str): Chemin du fichier d'état
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, window_hours=168, max_lag=72):
+        """
+        Charge l'état s'il existe et correspond aux paramètres demandés
+
+        Args:
+            path (str): Chemin du fichier d'état
+            window_hours (int): Taille de fenêtre attendue
+            max_lag (int): Décalage maximal attendu
+
+        Returns:
+            CorrelationState: État chargé, ou None
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if data['window_hours'] != window_hours or data['max_lag'] != min(max_lag, window_hours - 1):
+            return None
+        return cls.from_dict(data)
+
@@ -0,0 +1,179 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Séries minimales par processus (fenêtre de 7 jours, 72 h de décalage): la
+# passe FFT coûte ~0,1 ms par série, l'envoi des blocs à un pool déjà démarré
+# ~2 ms et le démarrage d'un pool ~15 ms; en deçà, le calcul séquentiel gagne
+MIN_SERIES_PER_WORKER = 64
+MIN_SERIES_PER_NEW_WORKER = 400
+
+
+def lag_label(lag):
+    """
+    Retourne le libellé de rapport d'un décalage
+
+    Args:
+        lag (int): Décalage en heures (positif: le sentiment précède le prix)
+
+    Returns:
+        str: 'direct', 'lag_{n}h' ou 'lead_{n}h'
+    """
+    if lag == 0:
+        return 'direct'
+    if lag > 0:
+        return f"lag_{lag}h"
+    return f"lead_{-lag}h"
+
+
+def _cross_sum(a, b, n_fft, max_lag):
+    """
+    Calcule sum_t a[t] * b[t - k] pour k dans [-max_lag, max_lag] par FFT
+
+    Args:
+        a (np.ndarray): Matrice (séries, observations)
+        b (np.ndarray): Matrice (séries, observations)
+        n_fft (int): Taille de la FFT (>= 2 * observations pour éviter le repliement)
+        max_lag (int): Décalage maximal
+
+    Returns:
+        np.ndarray: Matrice (séries, 2 * max_lag + 1), décalages croissants
+    """
+    full = np.fft.irfft(np.fft.rfft(a, n_fft, axis=1) * np.conj(np.fft.rfft(b, n_fft, axis=1)), n_fft, axis=1)
+    # Les décalages négatifs sont rangés en fin de tampon
+    return np.concatenate([full[:, n_fft - max_lag:], full[:, :max_lag + 1]], axis=1)
+
+
+def cross_correlation(x, y, max_lag, min_periods=3):
+    """
+    Calcule la corrélation de Pearson entre x[t] et y[t - k] pour tous les décalages
+
+    Toutes les séries et tous les décalages sont traités en une seule passe FFT.
+    Les valeurs manquantes (NaN) sont exclues paire par paire, comme
+    pandas.Series.corr.
+
+    Args:
+        x (np.ndarray): Matrice (séries, observations), ex. variations de prix
+        y (np.ndarray): Matrice (séries, observations), ex. sentiment
+        max_lag (int): Décalage maximal en nombre d'observations
+        min_periods (int): Nombre minimal de paires pour une corrélation
+
+    Returns:
+        tuple: (décalages, corrélations (séries, décalages), nombre de paires)
+    """
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    n_obs = x.shape[1]
+    max_lag = min(max_lag, max(n_obs - 1, 0))
+    lags = np.arange(-max_lag, max_lag + 1)
+
+    mx = np.isfinite(x).astype(float)
+    my = np.isfinite(y).astype(float)
+
+    # Centrer-réduire chaque série limite les pertes de précision des sommes
+    with np.errstate(invalid='ignore', divide='ignore'):
+        xs = np.where(mx > 0, x, np.nan)
+        ys = np.where(my > 0, y, np.nan)
+        xs = (xs - np.nanmean(xs, axis=1, keepdims=True)) / np.nanstd(xs, axis=1, keepdims=True)
+        ys = (ys - np.nanmean(ys, axis=1, keepdims=True)) / np.nanstd(ys, axis=1, keepdims=True)
+    xs = np.where(np.isfinite(xs), xs, 0.0)
+    ys = np.where(np.isfinite(ys), ys, 0.0)
+
+    n_fft = 1 << int(np.ceil(np.log2(max(2 * n_obs, 2))))
+    n = np.rint(_cross_sum(mx, my, n_fft, max_lag))
+    sx = _cross_sum(xs, my, n_fft, max_lag)
+    sy = _cross_sum(mx, ys, n_fft, max_lag)
+    sxx = _cross_sum(xs * xs, my, n_fft, max_lag)
+    syy = _cross_sum(mx, ys * ys, n_fft, max_lag)
+    sxy = _cross_sum(xs, ys, n_fft, max_lag)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = n * sxy - sx * sy
+        var_x = n * sxx - sx * sx
+        var_y = n * syy - sy * sy
+        denom = np.sqrt(var_x * var_y)
+        corr = cov / denom
+
+    tolerance = 1e-9 * np.maximum(n, 1) ** 2
+    invalid = (n < min_periods) | (var_x <= tolerance) | (var_y <= tolerance)
+    corr = np.clip(np.where(invalid, np.nan, corr), -1.0, 1.0)
+    return lags, corr, n.astype(int)
+
+
+def _correlate_shard(args):
+    """
+    Calcule les corrélations d'un bloc de séries (exécuté dans un processus de travail)
+
+    Args:
+        args (tuple): (x, y, max_lag, min_periods) pour le bloc
+
+    Returns:
+        tuple: (corrélations, nombre de paires) du bloc
+    """
+    x, y, max_lag, min_periods = args
+    _, corr, counts = cross_correlation(x, y, max_lag, min_periods)
+    return corr, counts
+
+
+def parallel_cross_correlation(x, y, max_lag, workers=1, min_periods=3, executor=None):
+    """
+    Répartit le calcul de cross_correlation sur un pool de processus
+
+    Les séries sont découpées en blocs contigus de lignes; seuls des tableaux
+    NumPy sont transmis aux processus et les blocs sont réassemblés dans
+    l'ordre d'origine, le résultat est donc identique au calcul séquentiel.
+    Le pool n'est utilisé qu'à partir de MIN_SERIES_PER_WORKER séries par
+    processus s'il est fourni, MIN_SERIES_PER_NEW_WORKER s'il faut le démarrer.
+
+    Args:
+        x (np.ndarray): Matrice (séries, observations)
+        y (np.ndarray): Matrice (séries, observations)
+        max_lag (int): Décalage maximal en nombre d'observations
+        workers (int): Nombre de processus
+        min_periods (int): Nombre minimal de paires pour une corrélation
+        executor (ProcessPoolExecutor, optional): Pool existant à réutiliser
+
+    Returns:
+        tuple: (décalages, corrélations (séries, décalages), nombre de paires)
+    """
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    min_series = MIN_SERIES_PER_WORKER if executor is not None else MIN_SERIES_PER_NEW_WORKER
+    workers = min(workers, x.shape[0] // min_series)
+    if workers <= 1:
+        return cross_correlation(x, y, max_lag, min_periods)
+
+    bounds = np.linspace(0, x.shape[0], workers + 1).astype(int)
+    tasks = [
+        (x[start:stop], y[start:stop], max_lag, min_periods)
+        for start, stop in zip(bounds[:-1], bounds[1:])
+    ]
+    if executor is not None:
+        parts = list(executor.map(_correlate_shard, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_correlate_shard, tasks))
+
+    max_lag = min(max_lag, max(x.shape[1] - 1, 0))
+    lags = np.arange(-max_lag, max_lag + 1)
+    corr = np.concatenate([part[0] for part in parts], axis=0)
+    counts = np.concatenate([part[1] for part in parts], axis=0)
+    return lags, corr, counts
+
+
+def best_lag(lags, corr):
+    """
+    Retourne le décalage de corrélation absolue maximale pour chaque série
+
+    Args:
+        lags (np.ndarray): Décalages
+        corr (np.ndarray): Corrélations (séries, décalages)
+
+    Returns:
+        tuple: (décalage optimal, corrélation correspondante) par série, NaN si aucune
+    """
+    corr = np.atleast_2d(corr)
+    abs_corr = np.where(np.isfinite(corr), np.abs(corr), -1.0)
+    idx = np.argmax(abs_corr, axis=1)
+    values = corr[np.arange(corr.shape[0]), idx]
+    return lags[idx], values
@@ -0,0 +1,326 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from analysis.cross_correlation import lag_label
+
+DEFAULT_OUTPUT_DIR = '/home/crypto_bot/data/rolling_correlation'
+META_FILE = '_meta.json'
+
+# Un fichier par symbole et par jour, une fenêtre JSON par ligne: chaque
+# passage n'ajoute que ses lignes et la rétention supprime des jours entiers
+CHUNK_SUFFIX = '.jsonl'
+
+
+def rolling_correlation(x, y, lags, window, ends, min_periods=3):
+    """
+    Calcule la corrélation glissante entre x[t] et y[t - k] par sommes cumulées
+
+    Pour une fin de fenêtre E, seules les paires dont les deux observations sont
+    dans [E - window + 1, E] sont retenues, comme pour le calcul sur une seule
+    fenêtre. Chaque fenêtre coûte O(1) par symbole et par décalage.
+
+    Args:
+        x (np.ndarray): Matrice (séries, observations), ex. variations de prix
+        y (np.ndarray): Matrice (séries, observations), ex. sentiment
+        lags (list): Décalages en nombre d'observations
+        window (int): Taille de la fenêtre en observations
+        ends (np.ndarray): Indices des fins de fenêtre
+        min_periods (int): Nombre minimal de paires pour une corrélation
+
+    Returns:
+        np.ndarray: Corrélations (séries, décalages, fenêtres)
+    """
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    ends = np.asarray(ends, dtype=int)
+    n_series, n_obs = x.shape
+
+    # Centrer chaque série limite les pertes de précision des sommes cumulées
+    with np.errstate(invalid='ignore'):
+        x = x - np.nanmean(x, axis=1, keepdims=True)
+        y = y - np.nanmean(y, axis=1, keepdims=True)
+
+    result = np.full((n_series, len(lags), len(ends)), np.nan)
+    for j, lag in enumerate(lags):
+        shift = abs(lag)
+        if shift >= min(window, n_obs):
+            continue
+
+        # Paires indexées par leur observation la plus récente
+        a = np.full((n_series, n_obs), np.nan)
+        b = np.full((n_series, n_obs), np.nan)
+        if lag >= 0:
+            a[:, shift:] = x[:, shift:]
+            b[:, shift:] = y[:, :n_obs - shift]
+        else:
+            a[:, shift:] = x[:, :n_obs - shift]
+            b[:, shift:] = y[:, shift:]
+
+        mask = np.isfinite(a) & np.isfinite(b)
+        a = np.where(mask, a, 0.0)
+        b = np.where(mask, b, 0.0)
+
+        sums = []
+        for values in (mask.astype(float), a, b, a * a, b * b, a * b):
+            cumulative = np.concatenate([np.zeros((n_series, 1)), np.cumsum(values, axis=1)], axis=1)
+            starts = np.clip(ends - window + shift + 1, 0, None)
+            sums.append(cumulative[:, ends + 1] - cumulative[:, starts])
+        n, sa, sb, saa, sbb, sab = sums
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var_a = n * saa - sa * sa
+            var_b = n * sbb - sb * sb
+            corr = (n * sab - sa * sb) / np.sqrt(var_a * var_b)
+        tolerance = 1e-12 * np.maximum(n, 1) ** 2
+        invalid = (np.rint(n) < min_periods) | (var_a <= tolerance) | (var_b <= tolerance)
+        result[:, j, :] = np.clip(np.where(invalid, np.nan, corr), -1.0, 1.0)
+
+    return result
+
+
+def parse_chunk(f):
+    """
+    Analyse un fichier journalier de corrélation glissante
+
+    Une ligne incomplète (écriture interrompue) ou une fenêtre déjà lue
+    (réécrite après une interruption) est ignorée.
+
+    Args:
+        f (file): Fichier ouvert (une fenêtre JSON par ligne)
+
+    Returns:
+        dict: Colonnes ({'timestamps', 'values'})
+    """
+    timestamps = []
+    rows = []
+    for line in f:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if timestamps and entry['timestamp'] <= timestamps[-1]:
+            continue
+        timestamps.append(entry['timestamp'])
+        rows.append(entry['values'])
+    labels = list(rows[-1]) if rows else []
+    return {'timestamps': timestamps, 'values': {label: [row.get(label) for row in rows] for label in labels}}
+
+
+def read_chunk(path):
+    """
+    Lit un fichier journalier de corrélation glissante
+
+    Args:
+        path (str): Chemin du fichier
+
+    Returns:
+        dict: Colonnes ({'timestamps', 'values'})
+    """
+    with open(path, 'r') as f:
+        return parse_chunk(f)
+
+
+class RollingCorrelationStore:
+    """
+    Stockage incrémental des séries de corrélation glissante
+
+    Un répertoire par symbole et un fichier JSONL par jour: une mise à jour
+    n'ajoute que les lignes de ses nouvelles fenêtres, et la rétention
+    supprime les fichiers des jours expirés.
+    """
+
+    def __init__(self, output_dir=DEFAULT_OUTPUT_DIR, window_hours=168, step_hours=1,
+                 lags=(0, 1, 3, 6, 12, 24, -1, -3, -6, -12, -24), retention_days=365):
+        """
+        Initialise le stockage
+
+        Args:
+            output_dir (str): Répertoire des séries par symbole
+            window_hours (int): Taille de la fenêtre en heures
+            step_hours (int): Pas entre deux fenêtres en heures
+            lags (tuple): Décalages calculés en heures
+            retention_days (int): Historique conservé en jours
+        """
+        self.output_dir = output_dir
+        self.window_hours = window_hours
+        self.step_hours = step_hours
+        self.lags = [int(lag) for lag in lags]
+        self.retention_days = retention_days
+        self.meta_file = os.path.join(output_dir, META_FILE)
+
+    @property
+    def max_lag(self):
+        """Décalage absolu maximal en heures"""
+        return max(abs(lag) for lag in self.lags)
+
+    def last_end(self):
+        """
+        Retourne la dernière fin de fenêtre calculée
+
+        Returns:
+            pd.Timestamp: Dernière fin de fenêtre, ou None si aucune (ou paramètres modifiés)
+        """
+        if not os.path.exists(self.meta_file):
+            return None
+        with open(self.meta_file, 'r') as f:
+            meta = json.load(f)
+        if (meta.get('window_hours') != self.window_hours or meta.get('step_hours') != self.step_hours
+                or meta.get('lags') != self.lags or not meta.get('last_end')):
+            return None
+        return pd.Timestamp(meta['last_end'])
+
+    def required_start(self, last_end):
+        """
+        Retourne la première heure de données nécessaire au calcul des nouvelles fenêtres
+
+        Args:
+            last_end (pd.Timestamp): Dernière fin de fenêtre calculée
+
+        Returns:
+            pd.Timestamp: Première heure à charger (une heure de plus pour les variations)
+        """
+        first_end = last_end + pd.Timedelta(hours=self.step_hours)
+        return first_end - pd.Timedelta(hours=self.window_hours + self.max_lag)
+
+    def update(self, symbols, hours, price_changes, sentiments):
+        """
+        Calcule les fenêtres postérieures à la dernière sauvegarde et les ajoute au stockage
+
+        Args:
+            symbols (list): Symboles des lignes des matrices
+            hours (pd.DatetimeIndex): Heures consécutives des matrices
+            price_changes (np.ndarray): Variations de prix horaires (symboles, heures)
+            sentiments (np.ndarray): Sentiment horaire (symboles, heures)
+
+        Returns:
+            int: Nombre de nouvelles fenêtres calculées
+        """
+        if len(hours) == 0:
+            return 0
+
+        last_end = self.last_end()
+        epoch_hours = np.asarray((hours - pd.Timestamp('1970-01-01', tz=hours.tz)) // pd.Timedelta(hours=1))
+        on_step = epoch_hours % self.step_hours == 0
+        if last_end is not None:
+            on_step &= hours > last_end
+        ends = np.flatnonzero(on_step)
+        if len(ends) == 0:
+            return 0
+
+        values = rolling_correlation(price_changes, sentiments, self.lags, self.window_hours, ends)
+        timestamps = [hour.isoformat() for hour in hours[ends]]
+        labels = [lag_label(lag) for lag in self.lags]
+        cutoff_day = (hours[ends[-1]] - pd.Timedelta(days=self.retention_days)).date().isoformat()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        for i, symbol in enumerate(symbols):
+            symbol_dir = self.symbol_dir(symbol)
+            if last_end is None:
+                # Paramètres modifiés ou premier passage: la série repart de zéro
+                for name in self._chunk_names(symbol):
+                    os.remove(os.path.join(symbol_dir, name))
+            os.makedirs(symbol_dir, exist_ok=True)
+
+            # Ajouter les nouvelles fenêtres au fichier de leur jour
+            lines_by_day = {}
+            for k, timestamp in enumerate(timestamps):
+                row = {label: float(v) if np.isfinite(v) else None for label, v in zip(labels, values[i, :, k])}
+                lines_by_day.setdefault(timestamp[:10], []).append(
+                    json.dumps({'timestamp': timestamp, 'values': row}) + '\n'
+                )
+            for day, lines in lines_by_day.items():
+                with open(os.path.join(symbol_dir, day + CHUNK_SUFFIX), 'a') as f:
+                    f.writelines(lines)
+
+            # Conserver uniquement la période de rétention (par jours entiers)
+            for name in self._chunk_names(symbol):
+                if name[:-len(CHUNK_SUFFIX)] < cutoff_day:
+                    os.remove(os.path.join(symbol_dir, name))
+
+        self._write(self.meta_file, {
+            'window_hours': self.window_hours,
+            'step_hours': self.step_hours,
+            'lags': self.lags,
+            'last_end': timestamps[-1]
+        })
+        return len(ends)
+
+    def symbol_dir(self, symbol):
+        """
+        Retourne le répertoire des fichiers journaliers d'un symbole
+
+        Args:
+            symbol (str): Symbole de la crypto
+
+        Returns:
+            str: Chemin du répertoire
+        """
+        return os.path.join(self.output_dir, symbol)
+
+    def _chunk_names(self, symbol):
+        """
+        Liste les fichiers journaliers d'un symbole
+
+        Args:
+            symbol (str): Symbole de la crypto
+
+        Returns:
+            list: Noms de fichiers triés par jour
+        """
+        symbol_dir = self.symbol_dir(symbol)
+        if not os.path.isdir(symbol_dir):
+            return []
+        return sorted(name for name in os.listdir(symbol_dir) if name.endswith(CHUNK_SUFFIX))
+
+    def load(self, symbol, hours_back=None, reader=read_chunk):
+        """
+        Charge la série de corrélation glissante d'un symbole
+
+        Args:
+            symbol (str): Symbole de la crypto
+            hours_back (int, optional): Ne lire que les jours couvrant les dernières heures
+            reader (callable): Lecture d'un fichier journalier (read_chunk ou une version en cache)
+
+        Returns:
+            dict: Série ({'symbol', 'timestamps', 'values'}), ou None
+        """
+        names = self._chunk_names(symbol)
+        if not names:
+            return None
+
+        symbol_dir = self.symbol_dir(symbol)
+        chunks = {}
+        if hours_back is not None:
+            newest = reader(os.path.join(symbol_dir, names[-1]))
+            chunks[names[-1]] = newest
+            if newest['timestamps']:
+                first_day = (pd.Timestamp(newest['timestamps'][-1]) - pd.Timedelta(hours=hours_back)).date().isoformat()
+                names = [name for name in names if name[:-len(CHUNK_SUFFIX)] >= first_day]
+
+        series = {'symbol': symbol, 'timestamps': [], 'values': {}}
+        for name in names:
+            chunk = chunks.get(name) or reader(os.path.join(symbol_dir, name))
+            offset = len(series['timestamps'])
+            series['timestamps'].extend(chunk['timestamps'])
+            for label, column in chunk['values'].items():
+                series['values'].setdefault(label, [None] * offset).extend(column)
+            for column in series['values'].values():
+                column.extend([None] * (len(series['timestamps']) - len(column)))
+        return series
+
+    @staticmethod
+    def _write(path, data):
+        """
+        Écrit un fichier JSON de façon atomique
+
+        Args:
+            path (str): Chemin du fichier
+            data (dict): Contenu
+        """
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
@@ -3,35 +3,104 @@ import numpy as np
 import matplotlib.pyplot as plt
 import json
 import os
+import sys
+import argparse
+import bisect
 from datetime import datetime, timedelta
 import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from data_collection.market_store import MarketStore, format_timestamp
+from analysis.cross_correlation import parallel_cross_correlation, best_lag, lag_label
+from analysis.correlation_state import CorrelationState
+from analysis.rolling_correlation import RollingCorrelationStore
+from analysis.correlation_significance import significance_shard
+from utils.file_cache import file_cache
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('/home/crypto_bot/logs/correlation.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger('correlation_analysis')
 
-def load_data():
+# Décalages (en heures) repris dans le dictionnaire 'correlations' du rapport
+REPORTED_LAGS = [1, 3, 6, 12, 24]
+
+# Seuils des recommandations: corrélation minimale et p-value ajustée maximale
+RECOMMENDATION_MIN_CORRELATION = 0.6
+SIGNIFICANCE_LEVEL = 0.05
+
+# État persistant du mode incrémental
+CORRELATION_STATE_FILE = '/home/crypto_bot/data/correlation_state.json'
+
+MARKET_DATA_FILE = '/home/crypto_bot/data/market_data.json'
+SENTIMENT_DATA_FILE = '/home/crypto_bot/data/emotional_data.json'
+
+# Délai de grâce des données sentimentales, en heures: une heure n'est intégrée
+# à l'état incrémental et à la série glissante qu'une fois close depuis ce délai.
+# Une entrée qui arrive plus tard, horodatée dans une heure déjà intégrée, est
+# ignorée par ces calculs incrémentaux (l'analyse complète la prend en compte).
+SENTIMENT_GRACE_HOURS = 6
+
+# Symboles minimaux par processus pour le test de significativité (~0,2 s par
+# symbole à 1000 rééchantillonnages): en deçà, le pool n'est pas créé
+MIN_SIGNIFICANCE_SYMBOLS_PER_WORKER = 2
+
+def index_by_timestamp(f):
+    """
+    Analyse un fichier JSON d'entrées horodatées et les trie par timestamp
+    
+    Args:
+        f (file): Fichier ouvert (liste JSON)
+        
+    Returns:
+        dict: Entrées triées et leurs timestamps ({'records', 'timestamps'})
+    """
+    records = sorted(json.load(f), key=lambda item: item.get('timestamp', ''))
+    return {'records': records, 'timestamps': [item.get('timestamp', '') for item in records]}
+
+def records_since(path, since_str):
+    """
+    Retourne les entrées d'un fichier JSON postérieures à une date
+    
+    Le fichier n'est analysé et trié qu'une fois par modification (cache
+    partagé): les lectures suivantes de l'exécution, ou des exécutions du
+    worker tant que le fichier ne change pas, se limitent à une recherche
+    dichotomique.
+    
+    Args:
+        path (str): Chemin du fichier
+        since_str (str): Date de début ISO (incluse)
+        
+    Returns:
+        list: Entrées triées par timestamp (partagées, à ne pas modifier)
+    """
+    index = file_cache.get(path, index_by_timestamp)
+    return index['records'][bisect.bisect_left(index['timestamps'], since_str):]
+
+def load_data(window_days=7):
     """
-    Charge les données de marché et sentimentales depuis les fichiers JSON
+    Charge les données de marché et sentimentales
+    
+    Les données de marché sont lues depuis le stockage partitionné (seules les
+    partitions couvrant la fenêtre d'analyse), avec repli sur market_data.json.
     
+    Args:
+        window_days (int): Fenêtre d'analyse en jours
+        
     Returns:
         tuple: (données de marché, données sentimentales)
     """
     try:
         # Charger les données de marché
-        with open('/home/crypto_bot/data/market_data.json', 'r') as f:
-            market_data = json.load(f)
+        store = MarketStore()
+        if store.has_data():
+            # Un jour de marge pour les variations sur 24h en début de fenêtre
+            market_data = store.read_tail(
+                days=window_days + 2,
+                columns=['timestamp', 'symbol', 'price']
+            )
+        else:
+            market_data = records_since(MARKET_DATA_FILE, '')
         
         # Charger les données sentimentales
-        with open('/home/crypto_bot/data/emotional_data.json', 'r') as f:
-            sentiment_data = json.load(f)
+        sentiment_data = records_since(SENTIMENT_DATA_FILE, '')
         
         logger.info(f"Données chargées: {len(market_data)} entrées de marché, {len(sentiment_data)} entrées sentimentales")
         return market_data, sentiment_data
@@ -39,12 +108,42 @@ def load_data():
         logger.error(f"Erreur lors du chargement des données: {str(e)}")
         return [], []
 
+def load_data_since(since):
+    """
+    Charge les seules données de marché et sentimentales postérieures à une date
+    
+    Args:
+        since (datetime): Date de début (incluse)
+        
+    Returns:
+        tuple: (données de marché, données sentimentales)
+    """
+    try:
+        since_str = format_timestamp(since)
+        
+        store = MarketStore()
+        if store.is_available():
+            # Ticks lus dans les seules partitions postérieures (import unique du JSON si le stockage est vide)
+            if not store.has_data():
+                store.sync_from_json(MARKET_DATA_FILE)
+            market_data = store.read(start=since, columns=['timestamp', 'symbol', 'price'])
+        else:
+            market_data = records_since(MARKET_DATA_FILE, since_str)
+        
+        sentiment_data = records_since(SENTIMENT_DATA_FILE, since_str)
+        
+        logger.info(f"Nouvelles données depuis {since_str}: {len(market_data)} entrées de marché, {len(sentiment_data)} entrées sentimentales")
+        return market_data, sentiment_data
+    except Exception as e:
+        logger.error(f"Erreur lors du chargement des nouvelles données: {str(e)}")
+        return [], []
+
 def preprocess_market_data(market_data):
     """
     Prétraite les données de marché
     
     Args:
-        market_data (list): Liste des données de marché
+        market_data (list|pd.DataFrame): Données de marché
         
     Returns:
         dict: Données de marché prétraitées par symbole
@@ -54,47 +153,46 @@ def preprocess_market_data(market_data):
         df = pd.DataFrame(market_data)
         
         # Convertir les timestamps en datetime
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True)
         
         # Trier par timestamp
         df = df.sort_values('timestamp')
         
+        # Variations de prix calculées pour tous les symboles en une passe
+        prices = df.groupby('symbol', sort=False)['price']
+        df['price_change'] = prices.pct_change(fill_method=None)
+        df['price_change_1h'] = prices.pct_change(periods=2, fill_method=None)  # Approximation pour 1h
+        df['price_change_24h'] = prices.pct_change(periods=48, fill_method=None)  # Approximation pour 24h
+        
         # Organiser par symbole
-        result = {}
-        for symbol in df['symbol'].unique():
-            symbol_df = df[df['symbol'] == symbol].copy()
-            
-            # Ajouter des colonnes pour les variations de prix
-            symbol_df['price_change'] = symbol_df['price'].pct_change()
-            symbol_df['price_change_1h'] = symbol_df['price'].pct_change(periods=2)  # Approximation pour 1h
-            symbol_df['price_change_24h'] = symbol_df['price'].pct_change(periods=48)  # Approximation pour 24h
-            
-            result[symbol] = symbol_df
+        result = {symbol: symbol_df for symbol, symbol_df in df.groupby('symbol', sort=False)}
         
         return result
     except Exception as e:
         logger.error(f"Erreur lors du prétraitement des données de marché: {str(e)}")
         return {}
 
-def preprocess_sentiment_data(sentiment_data):
+def preprocess_sentiment_data(sentiment_data, symbols=None):
     """
     Prétraite les données sentimentales
     
+    La liste related_crypto est éclatée une seule fois puis agrégée par
+    (symbole, heure): le coût est linéaire en nombre de tweets, quel que soit
+    le nombre de cryptos suivies.
+    
     Args:
         sentiment_data (list): Liste des données sentimentales
+        symbols (list, optional): Symboles à conserver (tous ceux présents par défaut)
         
     Returns:
-        dict: Données sentimentales prétraitées par symbole
+        dict: Sentiment horaire par symbole (moyenne, nombre d'entrées et écart-type)
     """
     try:
         # Convertir en DataFrame
         df = pd.DataFrame(sentiment_data)
         
         # Convertir les timestamps en datetime
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
-        # Trier par timestamp
-        df = df.sort_values('timestamp')
+        df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True)
         
         # Convertir le sentiment en valeur numérique
         sentiment_map = {
@@ -104,19 +202,23 @@ def preprocess_sentiment_data(sentiment_data):
         }
         df['sentiment_value'] = df['sentiment'].map(sentiment_map)
         
+        # Éclater related_crypto: une ligne par (entrée, symbole)
+        df = df.loc[df['related_crypto'].map(lambda x: isinstance(x, list)), ['timestamp', 'sentiment_value', 'related_crypto']]
+        exploded = df.explode('related_crypto').dropna(subset=['related_crypto'])
+        exploded = exploded.rename_axis('entry').reset_index().drop_duplicates(subset=['entry', 'related_crypto'])
+        if symbols is not None:
+            exploded = exploded[exploded['related_crypto'].isin(symbols)]
+        
+        # Agréger par symbole et par heure en une seule passe
+        exploded['hour'] = exploded['timestamp'].dt.floor('h')
+        hourly = exploded.groupby(['related_crypto', 'hour'])['sentiment_value'].agg(['mean', 'count', 'std'])
+        hourly.columns = ['sentiment_value', 'sentiment_count', 'sentiment_std']
+        hourly['sentiment_std'] = hourly['sentiment_std'].fillna(0.0)
+        
         # Organiser par symbole (related_crypto)
         result = {}
-        symbols = ['BTC', 'ETH', 'SOL', 'ADA', 'BNB', 'DOT', 'XRP']
-        
-        for symbol in symbols:
-            # Filtrer les entrées liées à ce symbole
-            symbol_df = df[df['related_crypto'].apply(lambda x: symbol in x if isinstance(x, list) else False)].copy()
-            
-            # Agréger par heure
-            symbol_df['hour'] = symbol_df['timestamp'].dt.floor('H')
-            hourly_sentiment = symbol_df.groupby('hour')['sentiment_value'].mean().reset_index()
-            hourly_sentiment.columns = ['timestamp', 'sentiment_value']
-            
+        for symbol, hourly_sentiment in hourly.groupby(level='related_crypto'):
+            hourly_sentiment = hourly_sentiment.droplevel('related_crypto').rename_axis('timestamp').reset_index()
             result[symbol] = hourly_sentiment
         
         return result
@@ -124,75 +226,367 @@ def preprocess_sentiment_data(sentiment_data):
         logger.error(f"Erreur lors du prétraitement des données sentimentales: {str(e)}")
         return {}
 
-def calculate_correlation(market_data_by_symbol, sentiment_data_by_symbol, window_days=7):
+def fill_missing_sentiment(market_data_by_symbol, sentiment_data_by_symbol):
+    """
+    Ajoute une série de sentiment vide pour les symboles sans sentiment récent
+    
+    Les heures de marché sans sentiment restent ainsi sur la grille horaire
+    (les calculs incrémentaux doivent avancer même sans nouveau tweet).
+    
+    Args:
+        market_data_by_symbol (dict): Données de marché par symbole
+        sentiment_data_by_symbol (dict): Données sentimentales par symbole (complétées en place)
+    """
+    for symbol in market_data_by_symbol:
+        if symbol not in sentiment_data_by_symbol:
+            sentiment_data_by_symbol[symbol] = pd.DataFrame({
+                'timestamp': pd.Series(dtype='datetime64[ns, UTC]'),
+                'sentiment_value': pd.Series(dtype=float)
+            })
+
+def closed_hours(hours, grace_hours=SENTIMENT_GRACE_HOURS):
+    """
+    Sélectionne les heures à intégrer aux calculs incrémentaux
+    
+    L'heure du dernier tick n'est pas close, et les heures du délai de grâce
+    peuvent encore recevoir des données sentimentales en retard: elles seront
+    intégrées à un prochain passage.
+    
+    Args:
+        hours (pd.DatetimeIndex): Heures consécutives des matrices
+        grace_hours (int): Délai de grâce des données sentimentales en heures
+        
+    Returns:
+        np.ndarray: Masque des heures à intégrer
+    """
+    return hours < hours.max() - pd.Timedelta(hours=grace_hours)
+
+def hourly_matrices(market_data_by_symbol, sentiment_data_by_symbol):
+    """
+    Construit les matrices horaires de prix et de sentiment de tous les symboles
+    
+    Args:
+        market_data_by_symbol (dict): Données de marché par symbole
+        sentiment_data_by_symbol (dict): Données sentimentales par symbole
+        
+    Returns:
+        tuple: (symboles, index horaire, prix horaires (DataFrame), sentiment horaire (DataFrame))
+    """
+    symbols = [symbol for symbol in market_data_by_symbol if symbol in sentiment_data_by_symbol]
+    if not symbols:
+        return [], pd.DatetimeIndex([]), pd.DataFrame(), pd.DataFrame()
+    
+    # Dernier prix de chaque heure, pour tous les symboles à la fois
+    market_df = pd.concat(
+        [market_data_by_symbol[symbol][['timestamp', 'price']].assign(symbol=symbol) for symbol in symbols],
+        ignore_index=True
+    )
+    market_df['hour'] = market_df['timestamp'].dt.floor('h')
+    prices = market_df.pivot_table(index='hour', columns='symbol', values='price', aggfunc='last')
+    hours = pd.date_range(prices.index.min(), prices.index.max(), freq='h')
+    prices = prices.reindex(hours)
+    
+    sentiment_df = pd.concat(
+        [sentiment_data_by_symbol[symbol][['timestamp', 'sentiment_value']].assign(symbol=symbol) for symbol in symbols],
+        ignore_index=True
+    )
+    sentiments = sentiment_df.pivot_table(index='timestamp', columns='symbol', values='sentiment_value')
+    sentiments = sentiments.reindex(index=hours, columns=prices.columns)
+    
+    return list(prices.columns), hours, prices, sentiments
+
+def align_hourly_series(market_data_by_symbol, sentiment_data_by_symbol, window_days=7):
+    """
+    Aligne les variations de prix et le sentiment sur une grille horaire commune
+    
+    Args:
+        market_data_by_symbol (dict): Données de marché par symbole
+        sentiment_data_by_symbol (dict): Données sentimentales par symbole
+        window_days (int): Fenêtre de corrélation en jours
+        
+    Returns:
+        tuple: (symboles, index horaire, matrice des variations de prix, matrice du sentiment)
+    """
+    symbols, hours, prices, sentiments = hourly_matrices(market_data_by_symbol, sentiment_data_by_symbol)
+    if not symbols:
+        return [], hours, np.empty((0, 0)), np.empty((0, 0))
+    
+    price_changes = prices.pct_change(fill_method=None)
+    
+    # Filtrer pour la fenêtre temporelle
+    cutoff_date = hours.max() - timedelta(days=window_days)
+    in_window = hours > cutoff_date
+    
+    return (
+        symbols,
+        hours[in_window],
+        price_changes[in_window].to_numpy().T,
+        sentiments[in_window].to_numpy().T
+    )
+
+def build_correlation_results(symbols, lags, corr, counts, window_days):
+    """
+    Met en forme les profils de corrélation par symbole
+    
+    Args:
+        symbols (list): Symboles des lignes des matrices
+        lags (np.ndarray): Décalages en heures
+        corr (np.ndarray): Corrélations (symboles, décalages)
+        counts (np.ndarray): Nombre de paires (symboles, décalages)
+        window_days (int): Fenêtre de corrélation en jours
+        
+    Returns:
+        dict: Résultats de corrélation par symbole
+    """
+    results = {}
+    best_lags, best_values = best_lag(lags, corr)
+    lag_index = {int(lag): j for j, lag in enumerate(lags)}
+    
+    for i, symbol in enumerate(symbols):
+        if not np.isfinite(best_values[i]):
+            logger.warning(f"Pas assez de données pour calculer la corrélation de {symbol}")
+            continue
+        
+        # Décalages historiques du rapport: directe, retard (sentiment précède le prix)
+        # et avance (prix précède le sentiment)
+        correlations = {}
+        for lag in [0] + REPORTED_LAGS + [-lead for lead in REPORTED_LAGS]:
+            if lag in lag_index:
+                correlations[lag_label(lag)] = float(corr[i, lag_index[lag]])
+        
+        best_type = lag_label(int(best_lags[i]))
+        best_value = float(best_values[i])
+        
+        results[symbol] = {
+            'correlations': correlations,
+            'lag_profile': {
+                'lags': [int(lag) for lag in lags],
+                'values': [float(v) if np.isfinite(v) else None for v in corr[i]]
+            },
+            'best_correlation': {
+                'type': best_type,
+                'value': best_value
+            },
+            'interpretation': interpret_correlation(best_type, best_value),
+            'data_points': int(counts[i, lag_index[0]]),
+            'window_days': window_days
+        }
+    
+    return results
+
+def analysis_pool(workers, n_symbols, n_resamples):
+    """
+    Crée le pool de processus de l'analyse si le nombre de symboles le justifie
+    
+    Args:
+        workers (int): Nombre de processus demandé
+        n_symbols (int): Nombre de symboles analysés
+        n_resamples (int): Rééchantillonnages du test de significativité
+        
+    Returns:
+        ProcessPoolExecutor: Pool partagé par les étapes de l'analyse, ou None
+    """
+    if not n_resamples:
+        return None
+    size = min(workers, n_symbols // MIN_SIGNIFICANCE_SYMBOLS_PER_WORKER)
+    return ProcessPoolExecutor(max_workers=size) if size > 1 else None
+
+def attach_significance(results, symbols, price_changes, sentiments, max_lag_hours, n_resamples=1000, block_hours=24,
+                        executor=None):
+    """
+    Ajoute p-values et intervalles de confiance aux résultats de corrélation
+    
+    Chaque symbole est une tâche indépendante (graine propre), répartie sur
+    le pool s'il est fourni: le résultat est identique au calcul séquentiel.
+    
+    Args:
+        results (dict): Résultats de corrélation par symbole (complétés en place)
+        symbols (list): Symboles des lignes des matrices
+        price_changes (np.ndarray): Variations de prix horaires de la fenêtre (symboles, heures)
+        sentiments (np.ndarray): Sentiment horaire de la fenêtre (symboles, heures)
+        max_lag_hours (int): Décalage maximal en heures
+        n_resamples (int): Nombre de permutations et de rééchantillonnages bootstrap
+        block_hours (int): Taille des blocs en heures
+        executor (ProcessPoolExecutor, optional): Pool de processus
+    """
+    tasks = []
+    for i, symbol in enumerate(symbols):
+        if symbol not in results:
+            continue
+        result = results[symbol]
+        lag_by_label = {lag_label(lag): lag for lag in result['lag_profile']['lags']}
+        labels = list(result['correlations']) + [result['best_correlation']['type']]
+        ci_lags = sorted({lag_by_label[label] for label in labels if label in lag_by_label})
+        tasks.append((symbol, lag_by_label, ci_lags,
+                      (price_changes[i], sentiments[i], max_lag_hours, ci_lags, n_resamples, block_hours, i)))
+    
+    shards = [task[3] for task in tasks]
+    significances = executor.map(significance_shard, shards) if executor is not None else map(significance_shard, shards)
+    
+    for (symbol, lag_by_label, ci_lags, _), significance in zip(tasks, significances):
+        result = results[symbol]
+        best_type = result['best_correlation']['type']
+        index = {int(lag): j for j, lag in enumerate(significance['lags'])}
+        
+        def to_float(value):
+            return float(value) if np.isfinite(value) else None
+        
+        result['significance'] = {
+            'method': 'block_permutation',
+            'resamples': n_resamples,
+            'block_hours': block_hours,
+            'p_values': {
+                lag_label(lag): to_float(significance['p_values'][index[lag]]) for lag in ci_lags
+            },
+            'confidence_intervals': {
+                lag_label(lag): list(interval) for lag, interval in significance['confidence_intervals'].items()
+            },
+            'best_p_value_adjusted': to_float(significance['p_values_adjusted'][index[lag_by_label[best_type]]])
+        }
+
+def calculate_correlation(market_data_by_symbol, sentiment_data_by_symbol, window_days=7, max_lag_hours=72, workers=1, n_resamples=1000):
     """
     Calcule la corrélation entre les données de marché et sentimentales
     
+    Tous les décalages de -max_lag_hours à +max_lag_hours sont calculés en une
+    seule passe sur la grille horaire alignée de tous les symboles.
+    
     Args:
         market_data_by_symbol (dict): Données de marché par symbole
         sentiment_data_by_symbol (dict): Données sentimentales par symbole
         window_days (int): Fenêtre de corrélation en jours
+        max_lag_hours (int): Décalage maximal en heures, dans les deux sens
+        workers (int): Nombre de processus pour répartir les symboles
+        n_resamples (int): Rééchantillonnages du test de significativité (0 pour le désactiver)
         
     Returns:
         dict: Résultats de corrélation par symbole
     """
     try:
-        results = {}
-        
-        for symbol in market_data_by_symbol.keys():
-            if symbol not in sentiment_data_by_symbol:
-                continue
-            
-            market_df = market_data_by_symbol[symbol]
-            sentiment_df = sentiment_data_by_symbol[symbol]
-            
-            # Fusionner les données sur le timestamp
-            merged_df = pd.merge_asof(
-                market_df, 
-                sentiment_df, 
-                on='timestamp',
-                direction='nearest'
+        symbols, hours, price_changes, sentiments = align_hourly_series(
+            market_data_by_symbol, sentiment_data_by_symbol, window_days
+        )
+        if not symbols:
+            return {}
+        
+        executor = analysis_pool(workers, len(symbols), n_resamples)
+        try:
+            lags, corr, counts = parallel_cross_correlation(
+                price_changes, sentiments, max_lag_hours, workers, executor=executor
             )
+            results = build_correlation_results(symbols, lags, corr, counts, window_days)
+            if n_resamples:
+                attach_significance(results, symbols, price_changes, sentiments, max_lag_hours, n_resamples,
+                                    executor=executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return results
+    except Exception as e:
+        logger.error(f"Erreur lors du calcul des corrélations: {str(e)}")
+        return {}
+
+def update_correlation_state(window_days=7, max_lag_hours=72, state_file=CORRELATION_STATE_FILE, n_resamples=1000,
+                             workers=1):
+    """
+    Met à jour l'état incrémental avec les seules heures closes depuis la dernière exécution
+    
+    Args:
+        window_days (int): Fenêtre de corrélation en jours
+        max_lag_hours (int): Décalage maximal en heures, dans les deux sens
+        state_file (str): Chemin du fichier d'état
+        n_resamples (int): Rééchantillonnages du test de significativité (0 pour le désactiver)
+        workers (int): Nombre de processus pour le test de significativité
+        
+    Returns:
+        dict: Résultats de corrélation par symbole
+    """
+    try:
+        window_hours = window_days * 24
+        state = CorrelationState.load(state_file, window_hours, max_lag_hours)
+        
+        if state is None:
+            # Démarrage à froid: toute la fenêtre est intégrée une fois
+            logger.info("Aucun état de corrélation, initialisation sur la fenêtre complète")
+            state = CorrelationState(window_hours, max_lag_hours)
+            market_data, sentiment_data = load_data(window_days)
+        else:
+            since = state.last_hour + timedelta(hours=1)
+            market_data, sentiment_data = load_data_since(since)
+        
+        if len(market_data) == 0:
+            logger.info("Aucune nouvelle donnée de marché")
+        else:
+            market_data_by_symbol = preprocess_market_data(market_data)
+            sentiment_data_by_symbol = preprocess_sentiment_data(sentiment_data) if len(sentiment_data) else {}
+            fill_missing_sentiment(market_data_by_symbol, sentiment_data_by_symbol)
             
-            # Filtrer pour la fenêtre temporelle
-            cutoff_date = merged_df['timestamp'].max() - timedelta(days=window_days)
-            window_df = merged_df[merged_df['timestamp'] > cutoff_date]
-            
-            # Calculer les corrélations
-            correlations = {}
-            
-            # Corrélation directe
-            correlations['direct'] = window_df['price_change'].corr(window_df['sentiment_value'])
-            
-            # Corrélation avec décalage (sentiment précède le prix)
-            for lag in [1, 3, 6, 12, 24]:
-                window_df[f'sentiment_lag_{lag}'] = window_df['sentiment_value'].shift(lag)
-                correlations[f'lag_{lag}h'] = window_df['price_change'].corr(window_df[f'sentiment_lag_{lag}'])
-            
-            # Corrélation avec avance (prix précède le sentiment)
-            for lead in [1, 3, 6, 12, 24]:
-                window_df[f'sentiment_lead_{lead}'] = window_df['sentiment_value'].shift(-lead)
-                correlations[f'lead_{lead}h'] = window_df['price_change'].corr(window_df[f'sentiment_lead_{lead}'])
-            
-            # Trouver la meilleure corrélation
-            best_corr = max(correlations.items(), key=lambda x: abs(x[1]))
+            symbols, hours, prices, sentiments = hourly_matrices(market_data_by_symbol, sentiment_data_by_symbol)
             
-            results[symbol] = {
-                'correlations': correlations,
-                'best_correlation': {
-                    'type': best_corr[0],
-                    'value': best_corr[1]
-                },
-                'interpretation': interpret_correlation(best_corr[0], best_corr[1]),
-                'data_points': len(window_df),
-                'window_days': window_days
-            }
-        
+            closed = closed_hours(hours)
+            state.fold(symbols, hours[closed], prices[closed].to_numpy().T, sentiments[closed].to_numpy().T)
+            state.save(state_file)
+            logger.info(f"État de corrélation mis à jour: {int(closed.sum())} nouvelles heures")
+        
+        lags, corr, counts = state.correlations()
+        results = build_correlation_results(state.symbols, lags, corr, counts, window_days)
+        if n_resamples:
+            # Le test porte sur la fenêtre conservée dans l'état, sans relire l'historique
+            price_changes, sentiments = state.window_arrays()
+            executor = analysis_pool(workers, len(state.symbols), n_resamples)
+            try:
+                attach_significance(results, state.symbols, price_changes, sentiments, state.max_lag, n_resamples,
+                                    executor=executor)
+            finally:
+                if executor is not None:
+                    executor.shutdown()
         return results
     except Exception as e:
-        logger.error(f"Erreur lors du calcul des corrélations: {str(e)}")
+        logger.error(f"Erreur lors de la mise à jour incrémentale des corrélations: {str(e)}")
         return {}
 
+def update_rolling_correlation(window_days=7, step_hours=1, history_days=30):
+    """
+    Ajoute à la série de corrélation glissante les fenêtres closes depuis le dernier passage
+    
+    Args:
+        window_days (int): Taille de la fenêtre glissante en jours
+        step_hours (int): Pas entre deux fenêtres en heures
+        history_days (int): Historique calculé lors de la première exécution
+        
+    Returns:
+        int: Nombre de nouvelles fenêtres calculées
+    """
+    try:
+        rolling_store = RollingCorrelationStore(window_hours=window_days * 24, step_hours=step_hours)
+        last_end = rolling_store.last_end()
+        
+        if last_end is None:
+            market_data, sentiment_data = load_data(history_days)
+        else:
+            # Une heure de plus pour la variation de prix de la première heure
+            market_data, sentiment_data = load_data_since(rolling_store.required_start(last_end) - timedelta(hours=1))
+        
+        if len(market_data) == 0:
+            return 0
+        
+        market_data_by_symbol = preprocess_market_data(market_data)
+        sentiment_data_by_symbol = preprocess_sentiment_data(sentiment_data) if len(sentiment_data) else {}
+        fill_missing_sentiment(market_data_by_symbol, sentiment_data_by_symbol)
+        
+        symbols, hours, prices, sentiments = hourly_matrices(market_data_by_symbol, sentiment_data_by_symbol)
+        price_changes = prices.pct_change(fill_method=None)
+        
+        closed = closed_hours(hours)
+        count = rolling_store.update(
+            symbols, hours[closed], price_changes[closed].to_numpy().T, sentiments[closed].to_numpy().T
+        )
+        logger.info(f"Corrélation glissante mise à jour: {count} nouvelles fenêtres")
+        return count
+    except Exception as e:
+        logger.error(f"Erreur lors de la mise à jour de la corrélation glissante: {str(e)}")
+        return 0
+
 def interpret_correlation(corr_type, corr_value):
     """
     Interprète la corrélation
@@ -262,7 +656,13 @@ def generate_correlation_report(correlation_results):
             corr_value = result['best_correlation']['value']
             corr_type = result['best_correlation']['type']
             
-            if abs(corr_value) > 0.6:
+            # Une recommandation exige une corrélation forte et significative
+            # après correction pour le choix du meilleur décalage
+            p_value = result.get('significance', {}).get('best_p_value_adjusted')
+            if p_value is not None and p_value > SIGNIFICANCE_LEVEL:
+                continue
+            
+            if abs(corr_value) > RECOMMENDATION_MIN_CORRELATION:
                 if "lag" in corr_type:
                     lag_hours = int(corr_type.split('_')[1].replace('h', ''))
                     if corr_value > 0:
@@ -271,6 +671,11 @@ def generate_correlation_report(correlation_results):
                         recommendations.append(f"Surveiller le sentiment négatif pour {symbol} comme indicateur avancé de baisse de prix ({lag_hours}h)")
         
         report["summary"]["recommendations"] = recommendations
+        report["summary"]["significant_symbols"] = [
+            symbol for symbol, result in correlation_results.items()
+            if result.get('significance', {}).get('best_p_value_adjusted') is not None
+            and result['significance']['best_p_value_adjusted'] <= SIGNIFICANCE_LEVEL
+        ]
         
         return report
     except Exception as e:
@@ -303,6 +708,7 @@ def plot_correlation_heatmap(correlation_results):
     Args:
         correlation_results (dict): Résultats de corrélation par symbole
     """
+    fig = None
     try:
         # Extraire les données pour la heatmap
         symbols = list(correlation_results.keys())
@@ -315,7 +721,7 @@ def plot_correlation_heatmap(correlation_results):
                 data[i, j] = correlation_results[symbol]['correlations'].get(corr_type, 0)
         
         # Créer la heatmap
-        plt.figure(figsize=(12, 8))
+        fig = plt.figure(figsize=(12, 8))
         plt.imshow(data, cmap='coolwarm', aspect='auto', vmin=-1, vmax=1)
         
         # Ajouter les labels
@@ -336,27 +742,71 @@ def plot_correlation_heatmap(correlation_results):
         logger.info("Heatmap de corrélation sauvegardée")
     except Exception as e:
         logger.error(f"Erreur lors de la génération de la heatmap: {str(e)}")
+    finally:
+        # Le worker d'analyse est persistant: chaque figure doit être libérée
+        if fig is not None:
+            plt.close(fig)
 
-def main():
+def parse_args(argv=None):
     """
-    Fonction principale
+    Analyse les arguments de la ligne de commande
+    
+    Args:
+        argv (list, optional): Arguments (sys.argv par défaut)
+        
+    Returns:
+        argparse.Namespace: Options de l'analyse
+    """
+    parser = argparse.ArgumentParser(description="Analyse de corrélation sentiment/prix")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Met à jour l'état persistant avec les seules nouvelles heures")
+    parser.add_argument('--window-days', type=int, default=7, help="Fenêtre de corrélation en jours")
+    parser.add_argument('--max-lag-hours', type=int, default=72, help="Décalage maximal en heures")
+    parser.add_argument('--rolling-step-hours', type=int, default=1,
+                        help="Pas de la série de corrélation glissante en heures")
+    parser.add_argument('--resamples', type=int, default=1000,
+                        help="Permutations du test de significativité (0 pour le désactiver)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Nombre de processus pour l'analyse par symbole (0 = tous les cœurs)")
+    return parser.parse_args(argv)
+
+def run(argv=None, stdin=None):
+    """
+    Exécute l'analyse de corrélation
+    
+    Args:
+        argv (list, optional): Arguments de la ligne de commande
+        stdin (file, optional): Entrée standard (inutilisée)
+        
+    Returns:
+        tuple: (code de sortie, sortie du script)
     """
     try:
         logger.info("Démarrage de l'analyse de corrélation")
+        args = parse_args(argv)
+        workers = args.workers or os.cpu_count()
         
-        # Charger les données
-        market_data, sentiment_data = load_data()
-        
-        if not market_data or not sentiment_data:
-            logger.error("Données insuffisantes pour l'analyse")
-            return
-        
-        # Prétraiter les données
-        market_data_by_symbol = preprocess_market_data(market_data)
-        sentiment_data_by_symbol = preprocess_sentiment_data(sentiment_data)
-        
-        # Calculer les corrélations
-        correlation_results = calculate_correlation(market_data_by_symbol, sentiment_data_by_symbol)
+        if args.incremental:
+            correlation_results = update_correlation_state(
+                args.window_days, args.max_lag_hours, n_resamples=args.resamples, workers=workers
+            )
+        else:
+            # Charger les données
+            market_data, sentiment_data = load_data(args.window_days)
+            
+            if len(market_data) == 0 or len(sentiment_data) == 0:
+                logger.error("Données insuffisantes pour l'analyse")
+                return 0, ''
+            
+            # Prétraiter les données
+            market_data_by_symbol = preprocess_market_data(market_data)
+            sentiment_data_by_symbol = preprocess_sentiment_data(sentiment_data)
+            
+            # Calculer les corrélations
+            correlation_results = calculate_correlation(
+                market_data_by_symbol, sentiment_data_by_symbol, args.window_days, args.max_lag_hours,
+                workers, args.resamples
+            )
         
         # Générer le rapport
         report = generate_correlation_report(correlation_results)
@@ -367,9 +817,33 @@ def main():
         # Générer la heatmap
         plot_correlation_heatmap(correlation_results)
         
+        # Prolonger la série de corrélation glissante
+        update_rolling_correlation(args.window_days, args.rolling_step_hours)
+        
         logger.info("Analyse de corrélation terminée avec succès")
     except Exception as e:
         logger.error(f"Erreur lors de l'analyse de corrélation: {str(e)}")
+    return 0, ''
+
+def main(argv=None):
+    """
+    Point d'entrée en ligne de commande
+
+    Args:
+        argv (list, optional): Arguments de la ligne de commande
+    """
+    exit_code, output = run(argv, sys.stdin)
+    sys.stdout.write(output)
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
+    # Configuration du logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('/home/crypto_bot/logs/correlation.log'),
+            logging.StreamHandler()
+        ]
+    )
     main()
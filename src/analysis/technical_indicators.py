@@ -0,0 +1,691 @@
+import sys
+import os
+import json
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from data_collection.market_store import MarketStore, format_timestamp
+
+logger = logging.getLogger('technical_indicators')
+
+MARKET_DATA_FILE = '/home/crypto_bot/data/market_data.json'
+INDICATOR_STATE_FILE = '/home/crypto_bot/data/indicator_state.json'
+
+# Nombre maximal d'entrées conservées dans market_data.json (environ 2-3 semaines)
+MAX_MARKET_ENTRIES = 20000
+
+# Périodes des indicateurs, en ticks
+SMA_PERIODS = (20, 50)
+RSI_PERIOD = 14
+EMA_FAST = 12
+EMA_SLOW = 26
+MACD_SIGNAL = 9
+BOLLINGER_PERIOD = 20
+BOLLINGER_WIDTH = 2
+
+# Seuils du RSI
+RSI_OVERBOUGHT = 70
+RSI_OVERSOLD = 30
+
+# Nombre de prix conservés dans l'état de chaque symbole
+WINDOW_SIZE = max(SMA_PERIODS + (BOLLINGER_PERIOD, EMA_SLOW, RSI_PERIOD + 1))
+
+# Ticks récents utilisés pour reconstruire l'état d'un symbole: au-delà, l'effet
+# de l'amorçage sur les moyennes exponentielles (EMA 26, RSI 14) est négligeable
+REBUILD_TICKS = 200
+
+
+def _seeded_ewm(frame, period, alpha):
+    """
+    Moyenne exponentielle amorcée par la moyenne simple des `period` premières valeurs
+
+    C'est la convention de Wilder (RSI) et des EMA classiques: la première
+    valeur est la moyenne simple, puis y[t] = y[t-1] + alpha * (x[t] - y[t-1]).
+
+    Args:
+        frame (pd.DataFrame): Séries (ticks, symboles), NaN en tête pour les séries courtes
+        period (int): Période d'amorçage
+        alpha (float): Coefficient de lissage
+
+    Returns:
+        pd.DataFrame: Moyennes exponentielles (NaN avant l'amorçage)
+    """
+    seed = frame.rolling(period).mean()
+    rank = seed.notna().cumsum()
+    series = frame.where(rank > 1, seed.where(rank == 1))
+    return series.ewm(alpha=alpha, adjust=False).mean()
+
+
+def compute_indicators(prices):
+    """
+    Calcule tous les indicateurs pour tous les symboles en une passe vectorisée
+
+    Args:
+        prices (pd.DataFrame): Prix (ticks, symboles), du plus ancien au plus récent
+
+    Returns:
+        dict: Indicateurs par nom, chacun un DataFrame de même forme que prices
+    """
+    indicators = {}
+    for period in SMA_PERIODS:
+        indicators[f'sma{period}'] = prices.rolling(period).mean()
+
+    # RSI avec le lissage de Wilder
+    delta = prices.diff()
+    avg_gain = _seeded_ewm(delta.clip(lower=0), RSI_PERIOD, 1 / RSI_PERIOD)
+    avg_loss = _seeded_ewm((-delta).clip(lower=0), RSI_PERIOD, 1 / RSI_PERIOD)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    indicators['rsi14'] = rsi.where(avg_loss != 0, 100.0).where(avg_loss.notna())
+    indicators['avg_gain'] = avg_gain
+    indicators['avg_loss'] = avg_loss
+
+    # MACD
+    ema_fast = _seeded_ewm(prices, EMA_FAST, 2 / (EMA_FAST + 1))
+    ema_slow = _seeded_ewm(prices, EMA_SLOW, 2 / (EMA_SLOW + 1))
+    macd = ema_fast - ema_slow
+    macd_signal = _seeded_ewm(macd, MACD_SIGNAL, 2 / (MACD_SIGNAL + 1))
+    indicators['ema12'] = ema_fast
+    indicators['ema26'] = ema_slow
+    indicators['macd'] = macd
+    indicators['macd_signal'] = macd_signal
+    indicators['macd_histogram'] = macd - macd_signal
+
+    # Bandes de Bollinger (écart-type de population)
+    middle = prices.rolling(BOLLINGER_PERIOD).mean()
+    std = prices.rolling(BOLLINGER_PERIOD).std(ddof=0)
+    indicators['bollinger_middle'] = middle
+    indicators['bollinger_upper'] = middle + BOLLINGER_WIDTH * std
+    indicators['bollinger_lower'] = middle - BOLLINGER_WIDTH * std
+
+    return indicators
+
+
+def rsi_signal(rsi):
+    """
+    Interprète le RSI
+
+    Args:
+        rsi (float): RSI, ou None
+
+    Returns:
+        str: 'OVERBOUGHT', 'OVERSOLD' ou 'NEUTRAL'
+    """
+    if rsi is None:
+        return 'NEUTRAL'
+    if rsi > RSI_OVERBOUGHT:
+        return 'OVERBOUGHT'
+    if rsi < RSI_OVERSOLD:
+        return 'OVERSOLD'
+    return 'NEUTRAL'
+
+
+def classify_signal(price, sma20, sma50, rsi):
+    """
+    Combine les indicateurs en signal technique, tel que consommé par InvestmentTracker
+
+    Args:
+        price (float): Prix courant
+        sma20 (float): Moyenne mobile 20 ticks, ou None
+        sma50 (float): Moyenne mobile 50 ticks, ou None
+        rsi (float): RSI 14, ou None
+
+    Returns:
+        str: 'BULLISH', 'BULLISH_CAUTION', 'BEARISH', 'BEARISH_OPPORTUNITY' ou 'NEUTRAL'
+    """
+    signal = 'NEUTRAL'
+    if sma20 is not None and sma50 is not None:
+        if price > sma20 and price > sma50:
+            signal = 'BULLISH'
+        elif price <= sma20 and price <= sma50:
+            signal = 'BEARISH'
+
+    # Ajuster selon le RSI
+    rsi_state = rsi_signal(rsi)
+    if rsi_state == 'OVERBOUGHT' and signal == 'BULLISH':
+        signal = 'BULLISH_CAUTION'  # Tendance haussière mais potentiellement en surachat
+    elif rsi_state == 'OVERSOLD' and signal == 'BEARISH':
+        signal = 'BEARISH_OPPORTUNITY'  # Tendance baissière mais potentielle opportunité
+    return signal
+
+
+def signal_matrix(prices, indicators):
+    """
+    Version vectorisée de classify_signal sur tout l'historique
+
+    Args:
+        prices (pd.DataFrame): Prix (ticks, symboles)
+        indicators (dict): Résultat de compute_indicators(prices)
+
+    Returns:
+        pd.DataFrame: Signaux techniques (ticks, symboles)
+    """
+    sma20 = indicators['sma20']
+    sma50 = indicators['sma50']
+    rsi = indicators['rsi14']
+    known = sma20.notna() & sma50.notna()
+    bullish = known & (prices > sma20) & (prices > sma50)
+    bearish = known & (prices <= sma20) & (prices <= sma50)
+    signals = np.select(
+        [bullish & (rsi > RSI_OVERBOUGHT), bullish, bearish & (rsi < RSI_OVERSOLD), bearish],
+        ['BULLISH_CAUTION', 'BULLISH', 'BEARISH_OPPORTUNITY', 'BEARISH'],
+        default='NEUTRAL'
+    )
+    return pd.DataFrame(signals, index=prices.index, columns=prices.columns)
+
+
+def _to_float(value):
+    """
+    Convertit une valeur numérique en float JSON (None si absente)
+
+    Args:
+        value (float): Valeur
+
+    Returns:
+        float: Valeur, ou None si NaN
+    """
+    if value is None or not np.isfinite(value):
+        return None
+    return float(value)
+
+
+class IndicatorState:
+    """
+    État incrémental des indicateurs techniques par symbole
+
+    Chaque symbole conserve ses derniers prix et les moyennes exponentielles
+    courantes: un nouveau tick met tous les indicateurs à jour en temps constant.
+    """
+
+    def __init__(self, symbols=None):
+        """
+        Initialise un état
+
+        Args:
+            symbols (dict, optional): État par symbole
+        """
+        self.symbols = symbols or {}
+
+    @classmethod
+    def from_history(cls, prices, timestamps):
+        """
+        Construit l'état à partir de l'historique (calcul vectorisé)
+
+        Args:
+            prices (pd.DataFrame): Prix (ticks, symboles), du plus ancien au plus récent
+            timestamps (pd.DataFrame): Timestamps ISO des ticks, même forme que prices
+
+        Returns:
+            IndicatorState: État à jour au dernier tick de chaque symbole
+        """
+        indicators = compute_indicators(prices)
+        state = cls()
+        for symbol in prices.columns:
+            series = prices[symbol].dropna()
+            if series.empty:
+                continue
+            last = series.index[-1]
+            macd = indicators['macd'][symbol].dropna()
+            state.symbols[symbol] = {
+                'last_timestamp': timestamps.at[last, symbol],
+                'count': len(series),
+                'window': series.iloc[-WINDOW_SIZE:].tolist(),
+                'ema_fast': _to_float(indicators['ema12'].at[last, symbol]),
+                'ema_slow': _to_float(indicators['ema26'].at[last, symbol]),
+                'avg_gain': _to_float(indicators['avg_gain'].at[last, symbol]),
+                'avg_loss': _to_float(indicators['avg_loss'].at[last, symbol]),
+                'macd_window': macd.iloc[-MACD_SIGNAL:].tolist(),
+                'macd_signal': _to_float(indicators['macd_signal'].at[last, symbol])
+            }
+        return state
+
+    def update(self, symbol, timestamp, price):
+        """
+        Intègre un nouveau tick et retourne les indicateurs correspondants
+
+        Args:
+            symbol (str): Symbole de la crypto
+            timestamp (str): Timestamp ISO du tick
+            price (float): Prix du tick
+
+        Returns:
+            dict: Indicateurs techniques, ou None si le tick est déjà connu
+        """
+        s = self.symbols.get(symbol)
+        if s is None:
+            s = self.symbols[symbol] = {
+                'last_timestamp': None, 'count': 0, 'window': [],
+                'ema_fast': None, 'ema_slow': None, 'avg_gain': None, 'avg_loss': None,
+                'macd_window': [], 'macd_signal': None
+            }
+        elif s['last_timestamp'] is not None and timestamp <= s['last_timestamp']:
+            return None
+
+        price = float(price)
+        previous = s['window'][-1] if s['window'] else None
+        s['window'] = (s['window'] + [price])[-WINDOW_SIZE:]
+        s['count'] += 1
+        s['last_timestamp'] = timestamp
+        window = s['window']
+        count = s['count']
+
+        # RSI de Wilder: amorçage par la moyenne des RSI_PERIOD premières variations
+        if count == RSI_PERIOD + 1:
+            deltas = np.diff(window[-(RSI_PERIOD + 1):])
+            s['avg_gain'] = float(np.clip(deltas, 0, None).mean())
+            s['avg_loss'] = float(np.clip(-deltas, 0, None).mean())
+        elif count > RSI_PERIOD + 1:
+            delta = price - previous
+            s['avg_gain'] += (max(delta, 0.0) - s['avg_gain']) / RSI_PERIOD
+            s['avg_loss'] += (max(-delta, 0.0) - s['avg_loss']) / RSI_PERIOD
+
+        # Moyennes exponentielles du MACD
+        for key, period in (('ema_fast', EMA_FAST), ('ema_slow', EMA_SLOW)):
+            if count == period:
+                s[key] = float(np.mean(window[-period:]))
+            elif count > period:
+                s[key] += 2 / (period + 1) * (price - s[key])
+
+        macd = None
+        if s['ema_slow'] is not None:
+            macd = s['ema_fast'] - s['ema_slow']
+            s['macd_window'] = (s['macd_window'] + [macd])[-MACD_SIGNAL:]
+            if s['macd_signal'] is None and len(s['macd_window']) == MACD_SIGNAL:
+                s['macd_signal'] = float(np.mean(s['macd_window']))
+            elif s['macd_signal'] is not None:
+                s['macd_signal'] += 2 / (MACD_SIGNAL + 1) * (macd - s['macd_signal'])
+
+        return self.indicators(symbol, macd)
+
+    def indicators(self, symbol, macd=None):
+        """
+        Calcule les indicateurs d'un symbole à partir de son état
+
+        Args:
+            symbol (str): Symbole de la crypto
+            macd (float, optional): MACD du dernier tick
+
+        Returns:
+            dict: Indicateurs techniques au format de market_data.json
+        """
+        s = self.symbols[symbol]
+        window = np.array(s['window'])
+        price = window[-1]
+
+        sma = {period: float(window[-period:].mean()) if len(window) >= period else None for period in SMA_PERIODS}
+
+        rsi = None
+        if s['avg_loss'] is not None:
+            rsi = 100.0 if s['avg_loss'] == 0 else 100 - 100 / (1 + s['avg_gain'] / s['avg_loss'])
+
+        if macd is None and s['ema_slow'] is not None:
+            macd = s['ema_fast'] - s['ema_slow']
+
+        upper = middle = lower = None
+        if len(window) >= BOLLINGER_PERIOD:
+            recent = window[-BOLLINGER_PERIOD:]
+            middle = float(recent.mean())
+            std = float(recent.std())
+            upper = middle + BOLLINGER_WIDTH * std
+            lower = middle - BOLLINGER_WIDTH * std
+
+        return {
+            'sma20': sma[20],
+            'sma50': sma[50],
+            'rsi14': rsi,
+            'price_above_sma20': bool(price > sma[20]) if sma[20] is not None else None,
+            'price_above_sma50': bool(price > sma[50]) if sma[50] is not None else None,
+            'rsi_signal': rsi_signal(rsi),
+            'ema12': s['ema_fast'],
+            'ema26': s['ema_slow'],
+            'macd': macd,
+            'macd_signal': s['macd_signal'],
+            'macd_histogram': macd - s['macd_signal'] if macd is not None and s['macd_signal'] is not None else None,
+            'bollinger_upper': upper,
+            'bollinger_middle': middle,
+            'bollinger_lower': lower
+        }
+
+    def save(self, path):
+        """
+        Sauvegarde l'état de façon atomique
+
+        Args:
+            path (str): Chemin du fichier d'état
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'symbols': self.symbols}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Charge l'état s'il existe
+
+        Args:
+            path (str): Chemin du fichier d'état
+
+        Returns:
+            IndicatorState: État chargé, ou None
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return cls(json.load(f)['symbols'])
+
+
+def price_matrix(market_data):
+    """
+    Aligne l'historique des prix en matrice (ticks, symboles)
+
+    Les séries sont alignées sur leur tick le plus récent; les séries plus
+    courtes commencent par des NaN.
+
+    Args:
+        market_data (list|pd.DataFrame): Ticks de marché
+
+    Returns:
+        tuple: (prix, timestamps ISO), DataFrames (ticks, symboles)
+    """
+    df = pd.DataFrame(market_data)[['timestamp', 'symbol', 'price']]
+    df['time'] = pd.to_datetime(df['timestamp'], utc=True)
+    df = df.drop_duplicates(['symbol', 'time']).sort_values('time')
+    df['timestamp'] = df['time'].map(format_timestamp)
+    df['tick'] = -df.groupby('symbol').cumcount(ascending=False)
+
+    prices = df.pivot(index='tick', columns='symbol', values='price').sort_index().astype(float)
+    timestamps = df.pivot(index='tick', columns='symbol', values='timestamp').sort_index()
+    return prices, timestamps
+
+
+def read_store_tail(store, symbol, ticks):
+    """
+    Lit au moins les N derniers ticks d'un symbole dans le stockage partitionné
+
+    Le nombre de partitions journalières lues double jusqu'à couvrir N ticks:
+    seule la fin de l'historique est lue.
+
+    Args:
+        store (MarketStore): Stockage de marché
+        symbol (str): Symbole de la crypto
+        ticks (int): Nombre de ticks souhaités
+
+    Returns:
+        pd.DataFrame: Derniers ticks du symbole (N au plus)
+    """
+    available = len(store.days(symbol))
+    days = 1
+    while True:
+        df = store.read_tail(symbols=[symbol], days=days, columns=['timestamp', 'symbol', 'price'])
+        if len(df) >= ticks or days >= available:
+            return df.iloc[-ticks:]
+        days *= 2
+
+
+def load_history(store=None, market_data_file=MARKET_DATA_FILE, symbols=None, ticks=None):
+    """
+    Charge l'historique des prix depuis le stockage partitionné ou market_data.json
+
+    Args:
+        store (MarketStore, optional): Stockage de marché
+        market_data_file (str): Repli JSON
+        symbols (list, optional): Symboles à charger (tous par défaut)
+        ticks (int, optional): Nombre de ticks récents par symbole (tout l'historique par défaut)
+
+    Returns:
+        list|pd.DataFrame: Ticks de marché
+    """
+    store = store or MarketStore()
+    if store.has_data():
+        if ticks is None:
+            return store.read(symbols=symbols, columns=['timestamp', 'symbol', 'price'])
+        frames = [read_store_tail(store, symbol, ticks) for symbol in (symbols or store.symbols())]
+        frames = [frame for frame in frames if not frame.empty]
+        return pd.concat(frames, ignore_index=True) if frames else []
+    if os.path.exists(market_data_file):
+        # market_data.json est borné à MAX_MARKET_ENTRIES entrées
+        with open(market_data_file, 'r') as f:
+            market_data = json.load(f)
+        if symbols is not None:
+            wanted = set(symbols)
+            market_data = [tick for tick in market_data if tick['symbol'] in wanted]
+        if ticks is not None:
+            by_symbol = {}
+            for tick in sorted(market_data, key=lambda t: t['timestamp']):
+                by_symbol.setdefault(tick['symbol'], []).append(tick)
+            market_data = [tick for series in by_symbol.values() for tick in series[-ticks:]]
+        return market_data
+    return []
+
+
+def load_state(state_file=INDICATOR_STATE_FILE, symbols=None):
+    """
+    Charge l'état des indicateurs, en le reconstruisant depuis l'historique si nécessaire
+
+    Seuls les symboles absents de l'état sont reconstruits, à partir de leurs
+    REBUILD_TICKS derniers ticks.
+
+    Args:
+        state_file (str): Chemin du fichier d'état
+        symbols (list, optional): Symboles attendus dans l'état
+
+    Returns:
+        IndicatorState: État des indicateurs
+    """
+    state = IndicatorState.load(state_file)
+    if state is None:
+        missing = symbols
+    else:
+        missing = [symbol for symbol in (symbols or []) if symbol not in state.symbols]
+        if not missing:
+            return state
+
+    history = load_history(symbols=missing, ticks=REBUILD_TICKS)
+    if len(history) == 0:
+        return state or IndicatorState()
+
+    prices, timestamps = price_matrix(history)
+    rebuilt = IndicatorState.from_history(prices, timestamps)
+    logger.info(f"État des indicateurs reconstruit depuis l'historique récent: {len(prices)} ticks, {len(prices.columns)} symboles")
+    if state is not None:
+        # Conserver les symboles déjà suivis, n'ajouter que les nouveaux
+        rebuilt.symbols.update(state.symbols)
+    return rebuilt
+
+
+def enrich_ticks(ticks, state):
+    """
+    Ajoute les indicateurs et le signal technique aux nouveaux ticks
+
+    Args:
+        ticks (list): Nouveaux ticks au format de market_data.json
+        state (IndicatorState): État des indicateurs (mis à jour en place)
+
+    Returns:
+        list: Ticks enrichis (les ticks déjà connus sont écartés)
+    """
+    enriched = []
+    for tick in sorted(ticks, key=lambda t: t['timestamp']):
+        indicators = state.update(tick['symbol'], tick['timestamp'], tick['price'])
+        if indicators is None:
+            continue
+        enriched.append({
+            **tick,
+            'technical_indicators': indicators,
+            'technical_signal': classify_signal(
+                tick['price'], indicators['sma20'], indicators['sma50'], indicators['rsi14']
+            )
+        })
+    return enriched
+
+
+def read_market_entries(market_data_file=MARKET_DATA_FILE):
+    """
+    Lit les entrées de market_data.json sans les analyser
+
+    Le fichier est écrit une entrée par ligne, la plus récente en tête. Un
+    fichier d'un autre format (écrit d'un bloc) est analysé une seule fois,
+    puis réécrit ligne par ligne par save_market_data.
+
+    Args:
+        market_data_file (str): Chemin du fichier
+
+    Returns:
+        list: Entrées JSON (une chaîne par tick), la plus récente en tête
+    """
+    if not os.path.exists(market_data_file):
+        return []
+    with open(market_data_file, 'r') as f:
+        lines = f.read().splitlines()
+
+    if len(lines) >= 2 and lines[0] == '[' and lines[-1] == ']':
+        entries = [line.rstrip(',') for line in lines[1:-1] if line]
+        if all(entry.startswith('{') and entry.endswith('}') for entry in entries):
+            return entries
+
+    market_data = json.loads('\n'.join(lines) or '[]')
+    return [json.dumps(tick, separators=(',', ':')) for tick in market_data]
+
+
+def save_market_data(enriched, market_data_file=MARKET_DATA_FILE):
+    """
+    Ajoute les ticks enrichis en tête de market_data.json
+
+    Les entrées existantes sont recopiées telles quelles (une par ligne),
+    sans être analysées ni resérialisées.
+
+    Args:
+        enriched (list): Ticks enrichis
+        market_data_file (str): Chemin du fichier
+
+    Returns:
+        int: Nombre total d'entrées du fichier
+    """
+    newest_first = sorted(enriched, key=lambda t: t['timestamp'], reverse=True)
+    entries = [json.dumps(tick, separators=(',', ':')) for tick in newest_first]
+    merged = (entries + read_market_entries(market_data_file))[:MAX_MARKET_ENTRIES]
+
+    tmp_path = market_data_file + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write('[\n' + ',\n'.join(merged) + '\n]\n')
+    os.replace(tmp_path, market_data_file)
+    return len(merged)
+
+
+def signal_summary(enriched):
+    """
+    Résume les signaux des nouveaux ticks, au format retourné par le workflow n8n
+
+    Args:
+        enriched (list): Ticks enrichis
+
+    Returns:
+        dict: Statistiques et signaux par symbole
+    """
+    signals = {}
+    for tick in enriched:
+        signals[tick['symbol']] = {
+            'price': tick['price'],
+            'change_1h': tick.get('price_change_1h'),
+            'change_24h': tick.get('price_change_24h'),
+            'technical_signal': tick['technical_signal'],
+            'rsi': tick['technical_indicators']['rsi14']
+        }
+
+    return {
+        'success': True,
+        'timestamp': format_timestamp(pd.Timestamp.now(tz='UTC')),
+        'crypto_count': len(enriched),
+        'signals': signals
+    }
+
+
+def parse_args(argv=None):
+    """
+    Analyse les arguments de la ligne de commande
+
+    Args:
+        argv (list, optional): Arguments (sys.argv par défaut)
+
+    Returns:
+        argparse.Namespace: Arguments
+    """
+    parser = argparse.ArgumentParser(description="Indicateurs techniques des cryptomonnaies")
+    parser.add_argument('input', nargs='?', default='-',
+                        help="Fichier JSON des nouveaux ticks ('-' pour l'entrée standard)")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="Reconstruire l'état depuis l'historique avant l'ajout")
+    parser.add_argument('--state-file', default=INDICATOR_STATE_FILE,
+                        help="Fichier d'état des indicateurs")
+    return parser.parse_args(argv)
+
+
+def run(argv=None, stdin=None):
+    """
+    Enrichit les nouveaux ticks et les ajoute au stockage et à market_data.json
+
+    Args:
+        argv (list, optional): Arguments de la ligne de commande
+        stdin (file, optional): Entrée standard lue avec "-" (sys.stdin par défaut)
+
+    Returns:
+        tuple: (code de sortie, résumé des signaux en JSON)
+    """
+    args = parse_args(argv)
+
+    try:
+        if args.input == '-':
+            ticks = json.load(stdin if stdin is not None else sys.stdin)
+        else:
+            with open(args.input, 'r') as f:
+                ticks = json.load(f)
+        if isinstance(ticks, dict):
+            ticks = [ticks]
+
+        if args.rebuild and os.path.exists(args.state_file):
+            os.remove(args.state_file)
+        state = load_state(args.state_file, symbols=sorted({tick['symbol'] for tick in ticks}))
+
+        enriched = enrich_ticks(ticks, state)
+        if enriched:
+            # Le stockage partitionné reçoit directement les nouveaux ticks;
+            # market_data.json reste écrit pour le rapport quotidien n8n et
+            # les installations sans pyarrow
+            store = MarketStore()
+            if store.is_available():
+                store.append(enriched)
+            total = save_market_data(enriched)
+            state.save(args.state_file)
+            logger.info(f"Données de marché mises à jour: {len(enriched)} nouvelles entrées, {total} entrées au total")
+        else:
+            logger.info("Aucun nouveau tick à intégrer")
+
+        return 0, json.dumps(signal_summary(enriched)) + '\n'
+    except Exception as e:
+        logger.error(f"Erreur lors du calcul des indicateurs techniques: {str(e)}")
+        return 1, json.dumps({'success': False, 'error': str(e)}) + '\n'
+
+
+def main(argv=None):
+    """
+    Fonction principale: le résumé des signaux est écrit en JSON sur la sortie standard
+
+    Args:
+        argv (list, optional): Arguments de la ligne de commande
+    """
+    exit_code, output = run(argv, sys.stdin)
+    sys.stdout.write(output)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    main()
@@ -0,0 +1,274 @@
+import os
+import json
+
+import numpy as np
+
+from utils.file_cache import FileCache
+
+# Résolutions des barres (durée en millisecondes) et découpage des fichiers
+# (un fichier par mois ou par année: quelques milliers de barres au plus)
+RESOLUTIONS = {
+    '15min': (15 * 60 * 1000, 'month'),
+    '1h': (60 * 60 * 1000, 'month'),
+    '4h': (4 * 60 * 60 * 1000, 'year'),
+    '1d': (24 * 60 * 60 * 1000, 'year')
+}
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+# Colonnes des fichiers de barres (format colonnaire JSON)
+BAR_COLUMNS = ('t', 'open', 'high', 'low', 'close', 'volume', 'ticks')
+
+
+def aggregate_bars(times, prices, volumes, resolution_ms):
+    """
+    Agrège des ticks triés en barres OHLC
+
+    Le volume des ticks (total_volume de CoinGecko) est un volume glissant
+    sur 24 h: la barre conserve sa dernière valeur, avec le nombre de ticks
+    agrégés.
+
+    Args:
+        times (np.ndarray): Timestamps epoch en millisecondes, croissants
+        prices (np.ndarray): Prix
+        volumes (np.ndarray): Volumes sur 24 h (NaN si absent)
+        resolution_ms (int): Durée d'une barre en millisecondes
+
+    Returns:
+        dict: Colonnes des barres (BAR_COLUMNS)
+    """
+    if len(times) == 0:
+        return {column: [] for column in BAR_COLUMNS}
+
+    buckets = times // resolution_ms * resolution_ms
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(buckets)) + 1])
+    ends = np.concatenate([starts[1:], [len(times)]])
+    last_volumes = volumes[ends - 1]
+
+    return {
+        't': buckets[starts].tolist(),
+        'open': prices[starts].tolist(),
+        'high': np.maximum.reduceat(prices, starts).tolist(),
+        'low': np.minimum.reduceat(prices, starts).tolist(),
+        'close': prices[ends - 1].tolist(),
+        'volume': [None if np.isnan(v) else float(v) for v in last_volumes],
+        'ticks': (ends - starts).tolist()
+    }
+
+
+def merge_bars(bars, width_ms):
+    """
+    Regroupe des barres journalières en barres plus larges
+
+    Les barres sont regroupées par tranches de width_ms alignées sur l'epoch:
+    ouverture de la première, plus haut et plus bas de la tranche, clôture de
+    la dernière. Le volume d'une barre journalière (volume sur 24 h en fin de
+    journée) est celui du jour: les volumes et nombres de ticks sont additionnés.
+
+    Args:
+        bars (dict): Colonnes des barres (BAR_COLUMNS), triées
+        width_ms (int): Durée d'une barre regroupée en millisecondes
+
+    Returns:
+        dict: Colonnes des barres regroupées
+    """
+    if len(bars['t']) == 0:
+        return {column: [] for column in BAR_COLUMNS}
+
+    times = np.asarray(bars['t'], dtype='int64')
+    buckets = times // width_ms * width_ms
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(buckets)) + 1])
+    ends = np.concatenate([starts[1:], [len(times)]])
+
+    volumes = np.array([np.nan if v is None else v for v in bars['volume']], dtype=float)
+    known = np.add.reduceat(np.isfinite(volumes).astype(int), starts)
+    volume_sums = np.add.reduceat(np.nan_to_num(volumes), starts)
+
+    return {
+        't': buckets[starts].tolist(),
+        'open': [bars['open'][i] for i in starts],
+        'high': np.maximum.reduceat(np.asarray(bars['high'], dtype=float), starts).tolist(),
+        'low': np.minimum.reduceat(np.asarray(bars['low'], dtype=float), starts).tolist(),
+        'close': [bars['close'][i] for i in ends - 1],
+        'volume': [float(v) if k else None for v, k in zip(volume_sums, known)],
+        'ticks': np.add.reduceat(np.asarray(bars['ticks'], dtype='int64'), starts).tolist()
+    }
+
+
+def lttb(times, values, threshold):
+    """
+    Sous-échantillonne une série par Largest-Triangle-Three-Buckets
+
+    Conserve le premier et le dernier point, puis dans chaque tranche le
+    point formant le plus grand triangle avec le point retenu précédent et
+    la moyenne de la tranche suivante: la forme de la courbe est préservée.
+
+    Args:
+        times (np.ndarray): Abscisses croissantes
+        values (np.ndarray): Ordonnées
+        threshold (int): Nombre de points souhaité
+
+    Returns:
+        np.ndarray: Indices des points retenus
+    """
+    n = len(times)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        if i + 2 < len(edges):
+            avg_t, avg_v = times[end:next_end].mean(), values[end:next_end].mean()
+        else:
+            avg_t, avg_v = times[-1], values[-1]
+
+        area = np.abs(
+            (times[previous] - avg_t) * (values[start:end] - values[previous])
+            - (times[previous] - times[start:end]) * (avg_v - values[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+
+    return selected
+
+
+class BarStore:
+    """
+    Barres OHLC pré-agrégées par symbole et par résolution
+
+    Les barres d'un jour sont recalculées à partir des ticks de ce jour à
+    chaque ingestion (toutes les résolutions divisent la journée UTC) puis
+    fusionnées dans le fichier mensuel ou annuel correspondant.
+    """
+
+    def __init__(self, base_dir):
+        """
+        Initialise le stockage des barres
+
+        Args:
+            base_dir (str): Répertoire racine des barres
+        """
+        self.base_dir = base_dir
+        self.cache = FileCache(max_entries=256)
+
+    def period_path(self, resolution, symbol, t_ms):
+        """
+        Retourne le fichier de barres contenant un instant
+
+        Args:
+            resolution (str): Résolution (clé de RESOLUTIONS)
+            symbol (str): Symbole de la crypto
+            t_ms (int): Timestamp epoch en millisecondes
+
+        Returns:
+            str: Chemin du fichier
+        """
+        day = np.datetime64(int(t_ms), 'ms').astype('datetime64[D]').astype(str)
+        period = day[:7] if RESOLUTIONS[resolution][1] == 'month' else day[:4]
+        return os.path.join(self.base_dir, f"resolution={resolution}", f"symbol={symbol}", f"{period}.json")
+
+    def _load(self, path):
+        """
+        Charge un fichier de barres
+
+        Args:
+            path (str): Chemin du fichier
+
+        Returns:
+            dict: Colonnes des barres (vides si le fichier n'existe pas)
+        """
+        try:
+            return self.cache.get(path)
+        except FileNotFoundError:
+            return {column: [] for column in BAR_COLUMNS}
+
+    def update_day(self, symbol, times, prices, volumes):
+        """
+        Recalcule les barres d'un jour à partir de tous ses ticks
+
+        Args:
+            symbol (str): Symbole de la crypto
+            times (np.ndarray): Timestamps epoch (ms) des ticks du jour, croissants
+            prices (np.ndarray): Prix
+            volumes (np.ndarray): Volumes sur 24 h
+        """
+        if len(times) == 0:
+            return
+        day_start = int(times[0]) // DAY_MS * DAY_MS
+        day_end = day_start + DAY_MS
+
+        for resolution, (resolution_ms, _) in RESOLUTIONS.items():
+            bars = aggregate_bars(times, prices, volumes, resolution_ms)
+            path = self.period_path(resolution, symbol, day_start)
+            existing = self._load(path)
+
+            # Remplacer les barres du jour, garder celles des autres jours
+            t = existing['t']
+            before = np.searchsorted(t, day_start, side='left')
+            after = np.searchsorted(t, day_end, side='left')
+            merged = {
+                column: existing[column][:before] + bars[column] + existing[column][after:]
+                for column in BAR_COLUMNS
+            }
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(merged, f)
+            os.replace(tmp_path, path)
+
+    def read(self, symbol, resolution, start_ms, end_ms):
+        """
+        Lit les barres d'une plage
+
+        Args:
+            symbol (str): Symbole de la crypto
+            resolution (str): Résolution (clé de RESOLUTIONS)
+            start_ms (int): Début inclus (epoch ms)
+            end_ms (int): Fin incluse (epoch ms)
+
+        Returns:
+            dict: Colonnes des barres dont le début est dans la plage
+        """
+        symbol_dir = os.path.join(self.base_dir, f"resolution={resolution}", f"symbol={symbol}")
+        if not os.path.isdir(symbol_dir):
+            return {column: [] for column in BAR_COLUMNS}
+
+        unit = 'M' if RESOLUTIONS[resolution][1] == 'month' else 'Y'
+        result = {column: [] for column in BAR_COLUMNS}
+        for name in sorted(os.listdir(symbol_dir)):
+            if not name.endswith('.json'):
+                continue
+            # Ignorer les fichiers dont la période ne recoupe pas la plage
+            period = np.datetime64(name[:-len('.json')], unit)
+            period_start = period.astype('datetime64[ms]').astype('int64')
+            period_end = (period + 1).astype('datetime64[ms]').astype('int64')
+            if period_start > end_ms or period_end <= start_ms:
+                continue
+            bars = self._load(os.path.join(symbol_dir, name))
+            lo = np.searchsorted(bars['t'], start_ms, side='left')
+            hi = np.searchsorted(bars['t'], end_ms, side='right')
+            for column in BAR_COLUMNS:
+                result[column].extend(bars[column][lo:hi])
+        return result
+
+    def has_data(self, symbol):
+        """
+        Indique si des barres existent pour un symbole
+
+        Args:
+            symbol (str): Symbole de la crypto
+
+        Returns:
+            bool: True si des barres ont été calculées
+        """
+        return os.path.isdir(os.path.join(self.base_dir, "resolution=1d", f"symbol={symbol}"))
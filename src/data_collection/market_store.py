@@ -0,0 +1,541 @@
+import sys
+import os
+import json
+import hashlib
+import logging
+
+import numpy as np
+import pandas as pd
+
+from data_collection.bar_store import BarStore
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow est optionnel, les consommateurs retombent sur le JSON
+    pa = None
+    pq = None
+
+logger = logging.getLogger('market_store')
+
+DEFAULT_STORE_DIR = '/home/crypto_bot/data/market_store'
+DEFAULT_MARKET_DATA_FILE = '/home/crypto_bot/data/market_data.json'
+
+# Colonnes imbriquées (dict/list) sérialisées en JSON dans les fichiers Parquet
+JSON_COLUMNS = ('technical_indicators',)
+
+PARTITION_FILE = 'data.parquet'
+
+# Index annexe du dernier tick par symbole, maintenu à chaque ingestion
+LATEST_INDEX_FILE = 'latest.json'
+
+# Barres OHLC pré-agrégées, recalculées pour chaque partition réécrite
+BARS_DIR = 'bars'
+
+# Empreinte de la première entrée de market_data.json lors de la dernière synchronisation
+JSON_SYNC_FILE = 'json_sync.json'
+
+
+def format_timestamp(ts):
+    """
+    Formate un timestamp au format ISO utilisé par les workflows n8n (toISOString)
+
+    Args:
+        ts (pd.Timestamp): Timestamp UTC
+
+    Returns:
+        str: Timestamp ISO 8601 en millisecondes avec suffixe Z
+    """
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC')
+    return ts.strftime('%Y-%m-%dT%H:%M:%S.') + f"{ts.microsecond // 1000:03d}Z"
+
+
+def to_utc(ts):
+    """
+    Convertit une date en timestamp UTC (les dates naïves sont supposées UTC)
+
+    Args:
+        ts (datetime|str|None): Date à convertir
+
+    Returns:
+        pd.Timestamp: Timestamp UTC, ou None
+    """
+    if ts is None:
+        return None
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+
+class MarketStore:
+    """Stockage colonnaire des ticks de marché, partitionné par symbole et par jour"""
+
+    def __init__(self, base_dir=DEFAULT_STORE_DIR):
+        """
+        Initialise le stockage
+
+        Args:
+            base_dir (str): Répertoire racine des partitions Parquet
+        """
+        self.base_dir = base_dir
+        self.latest_index_file = os.path.join(base_dir, LATEST_INDEX_FILE)
+        self.json_sync_file = os.path.join(base_dir, JSON_SYNC_FILE)
+        self._latest_cache = None
+        self.bar_store = BarStore(os.path.join(base_dir, BARS_DIR))
+
+    @staticmethod
+    def is_available():
+        """
+        Indique si le moteur Parquet (pyarrow) est installé
+
+        Returns:
+            bool: True si le stockage colonnaire est utilisable
+        """
+        return pq is not None
+
+    def has_data(self):
+        """
+        Indique si le stockage contient au moins une partition
+
+        Returns:
+            bool: True si des données sont disponibles
+        """
+        if not self.is_available():
+            return False
+        return os.path.exists(self.latest_index_file) or bool(self.symbols())
+
+    def partition_dir(self, symbol, day):
+        """
+        Retourne le répertoire d'une partition
+
+        Args:
+            symbol (str): Symbole de la crypto
+            day (date): Jour de la partition
+
+        Returns:
+            str: Chemin du répertoire de la partition
+        """
+        return os.path.join(self.base_dir, f"symbol={symbol}", f"date={day.isoformat()}")
+
+    def symbols(self):
+        """
+        Liste les symboles présents dans le stockage
+
+        Returns:
+            list: Symboles triés
+        """
+        if not os.path.isdir(self.base_dir):
+            return []
+        return sorted(
+            name.split('=', 1)[1] for name in os.listdir(self.base_dir)
+            if name.startswith('symbol=')
+        )
+
+    def days(self, symbol):
+        """
+        Liste les jours disponibles pour un symbole
+
+        Args:
+            symbol (str): Symbole de la crypto
+
+        Returns:
+            list: Jours (str ISO) triés
+        """
+        symbol_dir = os.path.join(self.base_dir, f"symbol={symbol}")
+        if not os.path.isdir(symbol_dir):
+            return []
+        return sorted(
+            name.split('=', 1)[1] for name in os.listdir(symbol_dir)
+            if name.startswith('date=')
+        )
+
+    def append(self, records):
+        """
+        Ajoute des ticks de marché au stockage
+
+        Seules les partitions (symbole, jour) concernées sont réécrites; les
+        doublons de timestamp sont éliminés, l'index du dernier tick par
+        symbole et les barres des jours concernés sont mis à jour.
+
+        Args:
+            records (list): Liste de ticks au format de market_data.json
+
+        Returns:
+            int: Nombre de ticks ajoutés
+        """
+        if not records:
+            return 0
+
+        df = pd.DataFrame(records)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True)
+        for column in df.columns:
+            if df[column].dtype == object and column != 'symbol':
+                df[column] = df[column].map(
+                    lambda x: json.dumps(x) if isinstance(x, (dict, list)) else x
+                )
+        df['_day'] = df['timestamp'].dt.date
+
+        added = 0
+        newest = []
+        for (symbol, day), group in df.groupby(['symbol', '_day'], sort=False):
+            group = group.drop(columns=['_day']).drop_duplicates('timestamp', keep='last')
+            path = os.path.join(self.partition_dir(symbol, day), PARTITION_FILE)
+
+            if os.path.exists(path):
+                existing = pq.read_table(path).to_pandas()
+                known = set(existing['timestamp'])
+                group = group[~group['timestamp'].isin(known)]
+                if group.empty:
+                    continue
+                merged = pd.concat([existing, group], ignore_index=True)
+            else:
+                merged = group
+
+            merged = merged.sort_values('timestamp').reset_index(drop=True)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            pq.write_table(pa.Table.from_pandas(merged, preserve_index=False), tmp_path)
+            os.replace(tmp_path, path)
+            self._update_bars(symbol, merged)
+            added += len(group)
+            newest.append(group.loc[[group['timestamp'].idxmax()]])
+
+        if newest:
+            self._update_latest_index(MarketStore.to_records(pd.concat(newest)))
+
+        return added
+
+    def _update_bars(self, symbol, day_ticks):
+        """
+        Recalcule les barres d'un jour à partir de sa partition
+
+        Args:
+            symbol (str): Symbole de la crypto
+            day_ticks (pd.DataFrame): Ticks du jour triés par timestamp
+        """
+        times = ((day_ticks['timestamp'] - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(milliseconds=1)).to_numpy('int64')
+        prices = day_ticks['price'].to_numpy(float)
+        if 'total_volume' in day_ticks:
+            volumes = pd.to_numeric(day_ticks['total_volume'], errors='coerce').to_numpy(float)
+        else:
+            volumes = np.full(len(day_ticks), np.nan)
+        self.bar_store.update_day(symbol, times, prices, volumes)
+
+    def rebuild_bars(self):
+        """
+        Recalcule toutes les barres à partir des partitions (migration)
+
+        Returns:
+            int: Nombre de partitions traitées
+        """
+        count = 0
+        for symbol in self.symbols():
+            for day in self.days(symbol):
+                path = os.path.join(self.base_dir, f"symbol={symbol}", f"date={day}", PARTITION_FILE)
+                columns = [c for c in ('timestamp', 'price', 'total_volume') if c in pq.read_schema(path).names]
+                day_ticks = pq.read_table(path, columns=columns).to_pandas()
+                self._update_bars(symbol, day_ticks.sort_values('timestamp').reset_index(drop=True))
+                count += 1
+        logger.info(f"Barres recalculées pour {count} partitions")
+        return count
+
+    def latest(self, symbols=None):
+        """
+        Retourne le tick le plus récent de chaque symbole
+
+        L'index annexe n'est relu que si le fichier a changé depuis la dernière
+        lecture; il est reconstruit depuis les dernières partitions s'il manque.
+
+        Args:
+            symbols (list, optional): Symboles souhaités (tous par défaut)
+
+        Returns:
+            dict: Dernier tick par symbole
+        """
+        try:
+            stat = os.stat(self.latest_index_file)
+        except FileNotFoundError:
+            if not self.has_data():
+                return {}
+            self.rebuild_latest_index()
+            stat = os.stat(self.latest_index_file)
+
+        key = (stat.st_mtime_ns, stat.st_size)
+        if self._latest_cache is None or self._latest_cache[0] != key:
+            with open(self.latest_index_file, 'r') as f:
+                self._latest_cache = (key, json.load(f))
+
+        index = self._latest_cache[1]
+        if symbols is None:
+            return dict(index)
+        return {symbol: index[symbol] for symbol in symbols if symbol in index}
+
+    def rebuild_latest_index(self):
+        """
+        Reconstruit l'index du dernier tick par symbole depuis les dernières partitions
+        """
+        tail = self.read_tail(days=1)
+        index = {}
+        if not tail.empty:
+            rows = tail.loc[tail.groupby('symbol')['timestamp'].idxmax()]
+            index = {record['symbol']: record for record in MarketStore.to_records(rows)}
+        self._write_latest_index(index)
+
+    def _update_latest_index(self, records):
+        """
+        Fusionne des ticks candidats dans l'index du dernier tick par symbole
+
+        Args:
+            records (list): Ticks candidats (un ou plusieurs par symbole)
+        """
+        index = self.latest() if os.path.exists(self.latest_index_file) else {}
+        for record in records:
+            current = index.get(record['symbol'])
+            if current is None or record['timestamp'] > current['timestamp']:
+                index[record['symbol']] = record
+        self._write_latest_index(index)
+
+    def _write_latest_index(self, index):
+        """
+        Écrit l'index du dernier tick par symbole de façon atomique
+
+        Args:
+            index (dict): Dernier tick par symbole
+        """
+        os.makedirs(self.base_dir, exist_ok=True)
+        tmp_path = self.latest_index_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.latest_index_file)
+        self._latest_cache = None
+
+    def read(self, symbols=None, start=None, end=None, columns=None):
+        """
+        Lit une tranche du stockage
+
+        Args:
+            symbols (list, optional): Symboles à lire (tous par défaut)
+            start (datetime, optional): Borne inférieure incluse
+            end (datetime, optional): Borne supérieure incluse
+            columns (list, optional): Colonnes à lire (toutes par défaut)
+
+        Returns:
+            pd.DataFrame: Ticks triés par timestamp
+        """
+        start = to_utc(start)
+        end = to_utc(end)
+        start_day = start.date().isoformat() if start is not None else None
+        end_day = end.date().isoformat() if end is not None else None
+
+        paths = []
+        for symbol in (symbols or self.symbols()):
+            for day in self.days(symbol):
+                if start_day and day < start_day:
+                    continue
+                if end_day and day > end_day:
+                    continue
+                paths.append(os.path.join(self.base_dir, f"symbol={symbol}", f"date={day}", PARTITION_FILE))
+
+        return self._read_paths(paths, start, end, columns)
+
+    def read_tail(self, symbols=None, days=1, columns=None):
+        """
+        Lit les N dernières partitions journalières de chaque symbole
+
+        Args:
+            symbols (list, optional): Symboles à lire (tous par défaut)
+            days (int): Nombre de partitions journalières par symbole
+            columns (list, optional): Colonnes à lire (toutes par défaut)
+
+        Returns:
+            pd.DataFrame: Ticks triés par timestamp
+        """
+        paths = []
+        for symbol in (symbols or self.symbols()):
+            for day in self.days(symbol)[-days:]:
+                paths.append(os.path.join(self.base_dir, f"symbol={symbol}", f"date={day}", PARTITION_FILE))
+
+        return self._read_paths(paths, None, None, columns)
+
+    def read_records(self, symbols=None, start=None, end=None, columns=None):
+        """
+        Lit une tranche du stockage au format de market_data.json
+
+        Args:
+            symbols (list, optional): Symboles à lire (tous par défaut)
+            start (datetime, optional): Borne inférieure incluse
+            end (datetime, optional): Borne supérieure incluse
+            columns (list, optional): Colonnes à lire (toutes par défaut)
+
+        Returns:
+            list: Ticks sous forme de dictionnaires
+        """
+        return self.to_records(self.read(symbols, start, end, columns))
+
+    @staticmethod
+    def to_records(df):
+        """
+        Convertit un DataFrame du stockage en liste de dictionnaires
+
+        Args:
+            df (pd.DataFrame): Ticks lus depuis le stockage
+
+        Returns:
+            list: Ticks avec timestamps ISO et colonnes imbriquées décodées
+        """
+        if df.empty:
+            return []
+        df = df.copy()
+        df['timestamp'] = df['timestamp'].map(format_timestamp)
+        df = df.astype(object).where(df.notna(), None)
+        records = df.to_dict('records')
+        for record in records:
+            for column in JSON_COLUMNS:
+                if isinstance(record.get(column), str):
+                    record[column] = json.loads(record[column])
+        return records
+
+    def sync_from_json(self, json_path=DEFAULT_MARKET_DATA_FILE):
+        """
+        Importe dans le stockage les ticks de market_data.json absents du stockage
+
+        Le fichier est écrit une entrée par ligne, la plus récente en tête
+        (technical_indicators.save_market_data): seules les lignes situées
+        avant la première entrée vue par la synchronisation précédente sont
+        analysées. Un fichier d'un autre format, ou dont cette entrée a
+        disparu, est lu en entier.
+
+        Args:
+            json_path (str): Chemin du fichier JSON alimenté par n8n
+
+        Returns:
+            int: Nombre de ticks importés
+        """
+        marker = None
+        if os.path.exists(self.json_sync_file):
+            with open(self.json_sync_file, 'r') as f:
+                marker = json.load(f).get('first_entry')
+
+        first_entry = None
+        with open(json_path, 'r') as f:
+            if f.readline().strip() != '[':
+                # Fichier écrit d'un bloc: lecture complète
+                f.seek(0)
+                market_data = json.load(f)
+            else:
+                entries = []
+                for line in f:
+                    entry = line.strip().rstrip(',')
+                    if not entry.startswith('{'):
+                        continue
+                    digest = hashlib.sha1(entry.encode('utf-8')).hexdigest()
+                    if digest == marker:
+                        break
+                    first_entry = first_entry or digest
+                    entries.append(entry)
+                market_data = [json.loads(entry) for entry in entries]
+                first_entry = first_entry or marker
+
+        # Dernier timestamp connu par symbole, lu dans l'index annexe
+        last_seen = {
+            symbol: pd.Timestamp(record['timestamp'])
+            for symbol, record in self.latest().items()
+        }
+
+        new_records = []
+        for item in market_data:
+            last = last_seen.get(item.get('symbol'))
+            if last is None or pd.Timestamp(item['timestamp']) > last:
+                new_records.append(item)
+
+        added = self.append(new_records)
+        if first_entry is not None:
+            os.makedirs(self.base_dir, exist_ok=True)
+            tmp_path = self.json_sync_file + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'first_entry': first_entry}, f)
+            os.replace(tmp_path, self.json_sync_file)
+        logger.info(f"Stockage de marché synchronisé: {added} nouveaux ticks ({len(market_data)} entrées lues)")
+        return added
+
+    def _read_paths(self, paths, start, end, columns):
+        """
+        Lit et concatène une liste de partitions
+
+        Args:
+            paths (list): Fichiers Parquet à lire
+            start (datetime, optional): Borne inférieure incluse
+            end (datetime, optional): Borne supérieure incluse
+            columns (list, optional): Colonnes à lire
+
+        Returns:
+            pd.DataFrame: Ticks triés par timestamp
+        """
+        frames = []
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            file_columns = None
+            if columns is not None:
+                schema_names = pq.read_schema(path).names
+                file_columns = [c for c in columns if c in schema_names]
+            frames.append(pq.read_table(path, columns=file_columns).to_pandas())
+
+        if not frames:
+            return pd.DataFrame(columns=columns or ['timestamp', 'symbol'])
+
+        df = pd.concat(frames, ignore_index=True)
+        if start is not None:
+            df = df[df['timestamp'] >= start]
+        if end is not None:
+            df = df[df['timestamp'] <= end]
+        return df.sort_values('timestamp').reset_index(drop=True)
+
+
+def run(argv=None, stdin=None):
+    """
+    Synchronise le stockage depuis market_data.json
+
+    Avec --rebuild-bars, recalcule les barres OHLC de toutes les partitions.
+
+    Args:
+        argv (list, optional): Arguments (sys.argv par défaut)
+        stdin (file, optional): Entrée standard (inutilisée)
+
+    Returns:
+        tuple: (code de sortie, sortie du script)
+    """
+    argv = sys.argv[1:] if argv is None else argv
+
+    if not MarketStore.is_available():
+        logger.error("pyarrow n'est pas installé, stockage colonnaire indisponible")
+        return 1, ''
+
+    if '--rebuild-bars' in argv:
+        MarketStore().rebuild_bars()
+        return 0, ''
+
+    json_path = argv[0] if argv else DEFAULT_MARKET_DATA_FILE
+    MarketStore().sync_from_json(json_path)
+    return 0, ''
+
+
+def main(argv=None):
+    """
+    Fonction principale
+
+    Args:
+        argv (list, optional): Arguments de la ligne de commande
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    exit_code, output = run(argv, sys.stdin)
+    sys.stdout.write(output)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
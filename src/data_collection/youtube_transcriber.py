@@ -3,6 +3,21 @@ import os
 import subprocess
 from faster_whisper import WhisperModel
 
+# Modèle Whisper chargé une seule fois par processus
+_model = None
+
+def get_model():
+    """
+    Retourne le modèle Whisper, chargé au premier appel
+    
+    Returns:
+        WhisperModel: Modèle de transcription
+    """
+    global _model
+    if _model is None:
+        _model = WhisperModel("base", compute_type="int8")
+    return _model
+
 def download_audio(youtube_url, output_file="audio.mp3"):
     """
     Télécharge l'audio d'une vidéo YouTube
@@ -28,7 +43,7 @@ def transcribe_audio(audio_file):
     Returns:
         str: Texte transcrit
     """
-    model = WhisperModel("base", compute_type="int8")
+    model = get_model()
     segments, info = model.transcribe(audio_file, beam_size=5)
     
     full_text = ""
@@ -47,34 +62,47 @@ def save_transcript(transcript, output_file="transcript.txt"):
     """
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(transcript)
-    
-    print(f"Transcription sauvegardée dans {output_file}")
 
-def main():
+def run(argv=None, stdin=None):
     """
-    Fonction principale
+    Télécharge et transcrit une vidéo YouTube
+    
+    Args:
+        argv (list, optional): <youtube_url> [output_file] (sys.argv par défaut)
+        stdin (file, optional): Entrée standard (inutilisée)
+        
+    Returns:
+        tuple: (code de sortie, sortie du script)
     """
-    if len(sys.argv) < 2:
-        print("Usage: python youtube_transcriber.py <youtube_url> [output_file]")
-        sys.exit(1)
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        return 1, "Usage: python youtube_transcriber.py <youtube_url> [output_file]\n"
     
-    youtube_url = sys.argv[1]
+    youtube_url = argv[0]
     audio_file = download_audio(youtube_url)
     
     try:
         transcript = transcribe_audio(audio_file)
         
         # Sauvegarder la transcription si un nom de fichier est fourni
-        if len(sys.argv) > 2:
-            output_file = sys.argv[2]
+        if len(argv) > 1:
+            output_file = argv[1]
             save_transcript(transcript, output_file)
-        else:
-            # Sinon, afficher la transcription
-            print(transcript)
+            return 0, f"Transcription sauvegardée dans {output_file}\n"
+        # Sinon, renvoyer la transcription
+        return 0, transcript + '\n'
     finally:
         # Nettoyage
         if os.path.exists(audio_file):
             os.remove(audio_file)
 
+def main():
+    """
+    Fonction principale
+    """
+    exit_code, output = run(sys.argv[1:], sys.stdin)
+    sys.stdout.write(output)
+    sys.exit(exit_code)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,403 @@
+import os
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+from data_collection.market_store import MarketStore, format_timestamp, to_utc
+
+MARKET_DATA_FILE = '/home/crypto_bot/data/market_data.json'
+
+# Méthodes d'optimisation disponibles
+OPTIMIZATION_METHODS = ('risk_parity', 'min_variance', 'max_sharpe')
+
+# Demi-vie (en jours) des moyennes et covariances exponentielles
+COVARIANCE_HALFLIFE_DAYS = 60
+
+# Intensité du rétrécissement de la covariance vers une cible diagonale
+DEFAULT_SHRINKAGE = 0.1
+
+# Poids maximal d'un actif
+DEFAULT_MAX_WEIGHT = 0.4
+
+# Les cryptomonnaies cotent tous les jours
+DAYS_PER_YEAR = 365
+
+
+def load_ticks(store=None, market_data_file=MARKET_DATA_FILE, after=None):
+    """
+    Charge les ticks de marché, éventuellement postérieurs à une date
+
+    Args:
+        store (MarketStore, optional): Stockage de marché
+        market_data_file (str): Repli JSON
+        after (str, optional): Timestamp ISO exclu (seuls les ticks plus récents sont retournés)
+
+    Returns:
+        pd.DataFrame: Ticks (timestamp UTC, symbol, price) triés chronologiquement
+    """
+    store = store or MarketStore()
+    after = to_utc(after)
+    if store.has_data():
+        df = store.read(start=after, columns=['timestamp', 'symbol', 'price'])
+    elif os.path.exists(market_data_file):
+        with open(market_data_file, 'r') as f:
+            df = pd.DataFrame(json.load(f), columns=['timestamp', 'symbol', 'price'])
+    else:
+        df = pd.DataFrame(columns=['timestamp', 'symbol', 'price'])
+
+    df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True)
+    if after is not None:
+        df = df[df['timestamp'] > after]
+    return df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+
+class CovarianceState:
+    """
+    Moyenne et covariance exponentielles des rendements journaliers, mises à jour tick par tick
+
+    Les ticks alimentent la clôture du jour en cours; au premier tick d'un
+    nouveau jour, le rendement logarithmique du jour clos met à jour la
+    moyenne et la covariance en O(symboles²). Réoptimiser l'allocation ne
+    coûte alors que le solveur.
+    """
+
+    def __init__(self, symbols, halflife=COVARIANCE_HALFLIFE_DAYS):
+        """
+        Initialise un état vide
+
+        Args:
+            symbols (list): Symboles suivis
+            halflife (float): Demi-vie en jours
+        """
+        self.symbols = list(symbols)
+        self.halflife = halflife
+        self.count = 0
+        self.mean = np.zeros(len(self.symbols))
+        self.cov = np.zeros((len(self.symbols), len(self.symbols)))
+        self.bar = None
+        self.closes = [None] * len(self.symbols)
+        self.previous_closes = [None] * len(self.symbols)
+        self.last_timestamp = None
+        self._column = {symbol: j for j, symbol in enumerate(self.symbols)}
+
+    def _add_return(self, r):
+        """
+        Intègre un vecteur de rendements journaliers
+
+        Les premiers rendements sont pondérés également, puis le poids
+        converge vers celui de la demi-vie.
+
+        Args:
+            r (np.ndarray): Rendements logarithmiques (symboles)
+        """
+        self.count += 1
+        alpha = max(1 - 0.5 ** (1 / self.halflife), 1 / self.count)
+        delta = r - self.mean
+        self.mean = self.mean + alpha * delta
+        self.cov = (1 - alpha) * (self.cov + alpha * np.outer(delta, delta))
+
+    def _close_bar(self):
+        """
+        Clôt le jour en cours et intègre son rendement si tous les symboles sont cotés
+        """
+        if None not in self.closes:
+            if None not in self.previous_closes:
+                self._add_return(np.log(np.array(self.closes) / np.array(self.previous_closes)))
+            self.previous_closes = list(self.closes)
+
+    def update(self, symbol, timestamp, price):
+        """
+        Intègre un tick
+
+        Args:
+            symbol (str): Symbole de la crypto
+            timestamp (pd.Timestamp): Timestamp UTC du tick
+            price (float): Prix du tick
+        """
+        j = self._column.get(symbol)
+        if j is None or not price or price <= 0:
+            return
+
+        day = timestamp.strftime('%Y-%m-%d')
+        if self.bar is None:
+            self.bar = day
+        elif day > self.bar:
+            self._close_bar()
+            self.bar = day
+        self.closes[j] = float(price)
+
+    def update_ticks(self, ticks):
+        """
+        Intègre des ticks triés chronologiquement
+
+        Args:
+            ticks (pd.DataFrame): Ticks (timestamp UTC, symbol, price)
+        """
+        for timestamp, symbol, price in zip(ticks['timestamp'], ticks['symbol'], ticks['price']):
+            self.update(symbol, timestamp, price)
+        if len(ticks):
+            self.last_timestamp = format_timestamp(ticks['timestamp'].iloc[-1])
+
+    def covariance(self, shrinkage=DEFAULT_SHRINKAGE):
+        """
+        Retourne la covariance journalière, rétrécie vers sa diagonale moyenne
+
+        Args:
+            shrinkage (float): Intensité du rétrécissement (0: covariance empirique)
+
+        Returns:
+            np.ndarray: Covariance (symboles, symboles)
+        """
+        target = np.eye(len(self.symbols)) * np.trace(self.cov) / max(len(self.symbols), 1)
+        return (1 - shrinkage) * self.cov + shrinkage * target
+
+    def to_dict(self):
+        """
+        Sérialise l'état
+
+        Returns:
+            dict: État JSON
+        """
+        return {
+            'symbols': self.symbols,
+            'halflife': self.halflife,
+            'count': self.count,
+            'mean': self.mean.tolist(),
+            'cov': self.cov.tolist(),
+            'bar': self.bar,
+            'closes': self.closes,
+            'previous_closes': self.previous_closes,
+            'last_timestamp': self.last_timestamp
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Reconstruit un état sérialisé
+
+        Args:
+            data (dict): État JSON
+
+        Returns:
+            CovarianceState: État
+        """
+        state = cls(data['symbols'], data['halflife'])
+        state.count = data['count']
+        state.mean = np.array(data['mean'], dtype=float)
+        state.cov = np.array(data['cov'], dtype=float).reshape(len(state.symbols), len(state.symbols))
+        state.bar = data['bar']
+        state.closes = data['closes']
+        state.previous_closes = data['previous_closes']
+        state.last_timestamp = data['last_timestamp']
+        return state
+
+    def save(self, path):
+        """
+        Sauvegarde l'état de façon atomique
+
+        Args:
+            path (str): Chemin du fichier d'état
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Charge l'état s'il existe
+
+        Args:
+            path (str): Chemin du fichier d'état
+
+        Returns:
+            CovarianceState: État chargé, ou None
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+def load_covariance_state(path, symbols, store=None, market_data_file=MARKET_DATA_FILE):
+    """
+    Charge l'état de covariance et y intègre les seuls ticks arrivés depuis la dernière exécution
+
+    L'état est reconstruit depuis tout l'historique s'il n'existe pas ou si
+    les symboles suivis ont changé.
+
+    Args:
+        path (str): Fichier d'état
+        symbols (list): Symboles de l'allocation
+        store (MarketStore, optional): Stockage de marché
+        market_data_file (str): Repli JSON
+
+    Returns:
+        CovarianceState: État à jour
+    """
+    state = CovarianceState.load(path)
+    if state is None or state.symbols != list(symbols):
+        state = CovarianceState(symbols)
+
+    ticks = load_ticks(store, market_data_file, after=state.last_timestamp)
+    if len(ticks):
+        state.update_ticks(ticks)
+        state.save(path)
+    return state
+
+
+def project_capped_simplex(v, cap):
+    """
+    Projette un vecteur sur {0 <= w <= cap, somme(w) = 1}
+
+    Args:
+        v (np.ndarray): Vecteur
+        cap (float): Poids maximal (relevé à 1/n si nécessaire)
+
+    Returns:
+        np.ndarray: Poids projetés
+    """
+    cap = max(cap, 1 / len(v))
+    low, high = v.min() - cap, v.max()
+    for _ in range(100):
+        tau = (low + high) / 2
+        if np.clip(v - tau, 0, cap).sum() > 1:
+            low = tau
+        else:
+            high = tau
+    w = np.clip(v - (low + high) / 2, 0, cap)
+    return w / w.sum()
+
+
+def _projected_gradient(gradient, w, cap, step, iterations=2000, tol=1e-10):
+    """
+    Ascension de gradient projetée sur le simplexe plafonné
+
+    Args:
+        gradient (callable): Gradient de l'objectif à maximiser
+        w (np.ndarray): Poids initiaux
+        cap (float): Poids maximal
+        step (float): Pas
+        iterations (int): Nombre maximal d'itérations
+        tol (float): Variation minimale des poids
+
+    Returns:
+        np.ndarray: Poids
+    """
+    for _ in range(iterations):
+        updated = project_capped_simplex(w + step * gradient(w), cap)
+        if np.abs(updated - w).max() < tol:
+            return updated
+        w = updated
+    return w
+
+
+def min_variance_weights(cov, cap=DEFAULT_MAX_WEIGHT):
+    """
+    Allocation de variance minimale
+
+    Args:
+        cov (np.ndarray): Covariance
+        cap (float): Poids maximal
+
+    Returns:
+        np.ndarray: Poids
+    """
+    n = len(cov)
+    step = 1 / max(np.linalg.eigvalsh(cov).max(), 1e-18)
+    return _projected_gradient(lambda w: -cov @ w, np.full(n, 1 / n), cap, step)
+
+
+def max_sharpe_weights(cov, mean, cap=DEFAULT_MAX_WEIGHT, risk_free=0.0):
+    """
+    Allocation de ratio de Sharpe maximal
+
+    Se replie sur la variance minimale si aucun actif ne rapporte plus que le taux sans risque.
+
+    Args:
+        cov (np.ndarray): Covariance
+        mean (np.ndarray): Rendements attendus (même période que la covariance)
+        cap (float): Poids maximal
+        risk_free (float): Taux sans risque sur la période
+
+    Returns:
+        np.ndarray: Poids
+    """
+    excess = mean - risk_free
+    if excess.max() <= 0:
+        return min_variance_weights(cov, cap)
+
+    def gradient(w):
+        variance = max(w @ cov @ w, 1e-18)
+        return excess / math.sqrt(variance) - (excess @ w) * (cov @ w) / variance ** 1.5
+
+    # Pas adapté à l'échelle de l'objectif (rendement / volatilité)
+    w = min_variance_weights(cov, cap)
+    step = math.sqrt(max(w @ cov @ w, 1e-18)) / max(np.abs(excess).max(), 1e-18) * 0.05
+    return _projected_gradient(gradient, w, cap, step)
+
+
+def risk_parity_weights(cov, cap=DEFAULT_MAX_WEIGHT, iterations=500, tol=1e-10):
+    """
+    Allocation à contributions au risque égales (descente par coordonnées)
+
+    Minimise 1/2 y'Σy - Σ log(y_i)/n, dont la solution normalisée égalise les
+    contributions au risque; le plafond est appliqué par projection.
+
+    Args:
+        cov (np.ndarray): Covariance
+        cap (float): Poids maximal
+        iterations (int): Nombre maximal de passes
+        tol (float): Variation minimale
+
+    Returns:
+        np.ndarray: Poids
+    """
+    n = len(cov)
+    budget = 1 / n
+    diagonal = np.maximum(np.diag(cov), 1e-18)
+    y = 1 / np.sqrt(diagonal)
+    for _ in range(iterations):
+        previous = y.copy()
+        for i in range(n):
+            others = cov[i] @ y - cov[i, i] * y[i]
+            y[i] = (-others + math.sqrt(others * others + 4 * diagonal[i] * budget)) / (2 * diagonal[i])
+        if np.abs(y - previous).max() < tol * np.abs(y).max():
+            break
+    return project_capped_simplex(y / y.sum(), cap)
+
+
+def optimize_allocation(state, method='risk_parity', max_weight=DEFAULT_MAX_WEIGHT, shrinkage=DEFAULT_SHRINKAGE):
+    """
+    Calcule une allocation à partir de l'état de covariance
+
+    Args:
+        state (CovarianceState): Moyenne et covariance des rendements journaliers
+        method (str): Méthode (OPTIMIZATION_METHODS)
+        max_weight (float): Poids maximal d'un actif
+        shrinkage (float): Intensité du rétrécissement de la covariance
+
+    Returns:
+        dict: Poids par symbole (somme 1)
+
+    Raises:
+        ValueError: Si la méthode est inconnue ou l'historique insuffisant
+    """
+    if method not in OPTIMIZATION_METHODS:
+        raise ValueError(f"Méthode d'optimisation inconnue: {method}")
+    if state.count < 2:
+        raise ValueError("Historique insuffisant pour estimer la covariance")
+
+    cov = state.covariance(shrinkage) * DAYS_PER_YEAR
+    if method == 'risk_parity':
+        weights = risk_parity_weights(cov, max_weight)
+    elif method == 'min_variance':
+        weights = min_variance_weights(cov, max_weight)
+    else:
+        weights = max_sharpe_weights(cov, state.mean * DAYS_PER_YEAR, max_weight)
+
+    return {symbol: float(w) for symbol, w in zip(state.symbols, weights)}
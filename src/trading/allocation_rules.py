@@ -0,0 +1,25 @@
+# Règles d'allocation partagées par le suivi d'investissement, le backtest
+# et la recherche de paramètres (module sans effet de bord à l'import)
+
+# Allocation de base (par défaut)
+BASE_ALLOCATION = {
+    'BTC': 0.40,
+    'ETH': 0.30,
+    'SOL': 0.10,
+    'ADA': 0.05,
+    'BNB': 0.05,
+    'DOT': 0.05,
+    'XRP': 0.05
+}
+
+# Ajustement de l'allocation selon le signal technique
+SIGNAL_ADJUSTMENTS = {
+    'BULLISH': 0.05,
+    'BULLISH_CAUTION': 0.02,
+    'BEARISH': -0.05,
+    'BEARISH_OPPORTUNITY': -0.02
+}
+
+# Bonus accordé quand le sentiment précède le prix avec une forte corrélation positive
+CORRELATION_BONUS = 0.02
+CORRELATION_THRESHOLD = 0.5
@@ -0,0 +1,368 @@
+import os
+import json
+import argparse
+import logging
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_collection.market_store import MarketStore, format_timestamp, to_utc
+from analysis.technical_indicators import compute_indicators, signal_matrix
+from analysis.rolling_correlation import RollingCorrelationStore
+from trading.allocation_rules import (
+    BASE_ALLOCATION, SIGNAL_ADJUSTMENTS, CORRELATION_BONUS, CORRELATION_THRESHOLD
+)
+
+logger = logging.getLogger('backtest')
+
+MARKET_DATA_FILE = '/home/crypto_bot/data/market_data.json'
+BACKTEST_REPORT_FILE = '/home/crypto_bot/data/backtest_report.json'
+
+# Codes des signaux techniques (l'indice sert de colonne dans les vecteurs d'ajustement)
+SIGNALS = ['NEUTRAL', 'BULLISH', 'BULLISH_CAUTION', 'BEARISH', 'BEARISH_OPPORTUNITY']
+
+
+def load_price_matrix(freq='30min', start=None, end=None, store=None, market_data_file=MARKET_DATA_FILE):
+    """
+    Charge l'historique des prix sur une grille temporelle régulière
+
+    Args:
+        freq (str): Pas de la grille (alias pandas)
+        start (datetime, optional): Début de l'historique
+        end (datetime, optional): Fin de l'historique
+        store (MarketStore, optional): Stockage de marché
+        market_data_file (str): Repli JSON
+
+    Returns:
+        pd.DataFrame: Dernier prix connu (temps, symboles), NaN avant la première cotation
+    """
+    store = store or MarketStore()
+    if store.has_data():
+        df = store.read(start=start, end=end, columns=['timestamp', 'symbol', 'price'])
+    else:
+        with open(market_data_file, 'r') as f:
+            df = pd.DataFrame(json.load(f))[['timestamp', 'symbol', 'price']]
+        df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True)
+        if start is not None:
+            df = df[df['timestamp'] >= to_utc(start)]
+        if end is not None:
+            df = df[df['timestamp'] <= to_utc(end)]
+
+    df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True)
+    prices = df.pivot_table(index='timestamp', columns='symbol', values='price', aggfunc='last')
+    return prices.resample(freq).last().ffill().astype(float)
+
+
+def investment_schedule(index, cadence='MS'):
+    """
+    Détermine les dates d'investissement: premier point de la grille de chaque période
+
+    Args:
+        index (pd.DatetimeIndex): Grille temporelle
+        cadence (str): Périodicité des investissements (alias pandas, 'MS' pour mensuel)
+
+    Returns:
+        np.ndarray: Positions des dates d'investissement dans la grille
+    """
+    periods = pd.Series(np.arange(len(index)), index=index).resample(cadence).first()
+    return periods.dropna().to_numpy(dtype=int)
+
+
+def correlation_flags(dates, symbols, threshold=CORRELATION_THRESHOLD, store=None):
+    """
+    Indique, à chaque date, si le sentiment précédait le prix avec une forte corrélation
+
+    Reprend la règle de generate_allocation() sur la série de corrélation
+    glissante: meilleur décalage de type 'lag' et corrélation > seuil.
+
+    Args:
+        dates (pd.DatetimeIndex): Dates d'investissement
+        symbols (list): Symboles
+        threshold (float): Seuil de corrélation
+        store (RollingCorrelationStore, optional): Stockage des corrélations glissantes
+
+    Returns:
+        np.ndarray: Booléens (dates, symboles), False sans historique de corrélation
+    """
+    store = store or RollingCorrelationStore()
+    flags = np.zeros((len(dates), len(symbols)), dtype=bool)
+    for j, symbol in enumerate(symbols):
+        series = store.load(symbol)
+        if not series or not series['timestamps']:
+            continue
+        values = pd.DataFrame(series['values'], index=pd.to_datetime(series['timestamps'], utc=True)).astype(float)
+        best_label = values.abs().fillna(-1.0).idxmax(axis=1)
+        best_value = values.to_numpy()[np.arange(len(values)), values.columns.get_indexer(best_label)]
+        flag = pd.Series(best_label.str.startswith('lag_').to_numpy() & (best_value > threshold), index=values.index)
+        # Dernière corrélation connue à chaque date (aucune donnée future)
+        flags[:, j] = flag.reindex(dates, method='ffill').fillna(False).to_numpy(dtype=bool)
+    return flags
+
+
+class BacktestData:
+    """
+    Données préparées d'un backtest: grille de prix, dates d'investissement et signaux
+
+    Préparées une fois, elles peuvent être rejouées avec autant de jeux de
+    paramètres que nécessaire (simulate()).
+    """
+
+    def __init__(self, prices, cadence='MS', use_correlation=True, correlation_threshold=CORRELATION_THRESHOLD):
+        """
+        Prépare les données
+
+        Args:
+            prices (pd.DataFrame): Prix sur une grille régulière (temps, symboles)
+            cadence (str): Périodicité des investissements (alias pandas)
+            use_correlation (bool): Utiliser la série de corrélation glissante
+            correlation_threshold (float): Seuil du bonus de corrélation
+        """
+        self.symbols = list(prices.columns)
+        self.index = prices.index
+        self.prices = prices.to_numpy()
+        self.invest_idx = investment_schedule(prices.index, cadence)
+        self.invest_dates = prices.index[self.invest_idx]
+        self.invest_prices = self.prices[self.invest_idx]
+
+        # Signaux techniques calculés en une passe sur toute la grille
+        signals = signal_matrix(prices, compute_indicators(prices)).to_numpy()[self.invest_idx]
+        self.signal_codes = np.select(
+            [signals == name for name in SIGNALS], np.arange(len(SIGNALS)), default=0
+        )
+
+        if use_correlation:
+            self.correlation = correlation_flags(self.invest_dates, self.symbols, correlation_threshold)
+        else:
+            self.correlation = np.zeros(self.signal_codes.shape, dtype=bool)
+
+        # Position de la dernière date d'investissement pour chaque point de la grille
+        self.position_idx = np.searchsorted(self.invest_idx, np.arange(len(self.index)), side='right') - 1
+        self.periods_per_year = pd.Timedelta(days=365) / (self.index[1] - self.index[0]) if len(self.index) > 1 else 1.0
+
+
+def weight_vectors(symbols, base_allocation=None, signal_adjustments=None):
+    """
+    Convertit l'allocation de base et les ajustements en vecteurs
+
+    Args:
+        symbols (list): Symboles de la grille
+        base_allocation (dict, optional): Poids de base par symbole
+        signal_adjustments (dict, optional): Ajustement par signal technique
+
+    Returns:
+        tuple: (poids de base par symbole, NaN hors allocation; ajustement par code de signal)
+    """
+    base_allocation = BASE_ALLOCATION if base_allocation is None else base_allocation
+    signal_adjustments = SIGNAL_ADJUSTMENTS if signal_adjustments is None else signal_adjustments
+    base = np.array([base_allocation.get(symbol, np.nan) for symbol in symbols], dtype=float)
+    adjustments = np.array([signal_adjustments.get(name, 0.0) for name in SIGNALS])
+    return base, adjustments
+
+
+def simulate(data, base, adjustments, correlation_bonus=CORRELATION_BONUS, monthly_investment=50):
+    """
+    Rejoue les investissements périodiques sur tout l'historique
+
+    Toutes les dates et tous les symboles sont traités par opérations
+    matricielles: allocations, quantités achetées, positions cumulées et
+    valorisation sur toute la grille.
+
+    Args:
+        data (BacktestData): Données préparées
+        base (np.ndarray): Poids de base par symbole (symboles des données, NaN hors allocation)
+        adjustments (np.ndarray): Ajustement par code de signal (SIGNALS)
+        correlation_bonus (float): Bonus de corrélation
+        monthly_investment (float): Montant investi à chaque date
+
+    Returns:
+        dict: Séries et matrices du backtest
+    """
+    # Allocations de chaque date, comme generate_allocation()
+    in_allocation = np.isfinite(base)
+    weights = np.where(
+        in_allocation,
+        np.nan_to_num(base) + adjustments[data.signal_codes] + correlation_bonus * data.correlation,
+        0.0
+    )
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weights = weights / weights.sum(axis=1, keepdims=True)
+    euros = np.round(weights * monthly_investment, 2)
+
+    # Quantités achetées et positions, comme update_portfolio()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        quantities = np.where(data.invest_prices > 0, euros / data.invest_prices, 0.0)
+    positions = np.cumsum(np.nan_to_num(quantities), axis=0)
+    invested_assets = np.cumsum(euros, axis=0)
+
+    # Valorisation sur toute la grille
+    active = data.position_idx >= 0
+    held = np.where(active[:, None], positions[np.maximum(data.position_idx, 0)], 0.0)
+    asset_values = held * np.nan_to_num(data.prices)
+    values = asset_values.sum(axis=1)
+    invested = np.where(active, (data.position_idx + 1) * monthly_investment, 0.0)
+
+    # Rendement pondéré dans le temps (hors apports) pour drawdown et volatilité
+    contributions = np.zeros(len(values))
+    contributions[data.invest_idx] = euros.sum(axis=1)
+    previous = np.concatenate([[0.0], values[:-1]])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = np.where(previous > 0, (values - contributions) / previous - 1, 0.0)
+
+    return {
+        'weights': weights,
+        'euros': euros,
+        'positions': positions,
+        'invested_assets': invested_assets,
+        'asset_values': asset_values,
+        'values': values,
+        'invested': invested,
+        'returns': returns
+    }
+
+
+def performance_metrics(data, result):
+    """
+    Calcule les indicateurs de performance d'un backtest
+
+    Args:
+        data (BacktestData): Données préparées
+        result (dict): Résultat de simulate()
+
+    Returns:
+        dict: ROI, drawdown maximal, volatilité et rendement annualisés
+    """
+    invested = result['invested'][-1]
+    value = result['values'][-1]
+    index = np.cumprod(1 + result['returns'])
+    drawdown = index / np.maximum.accumulate(index) - 1
+    active_returns = result['returns'][data.position_idx >= 0]
+    years = max((data.index[-1] - data.invest_dates[0]) / pd.Timedelta(days=365), 1e-9) if len(data.invest_dates) else 0
+
+    return {
+        'total_invested': float(invested),
+        'final_value': float(value),
+        'roi_percent': float((value - invested) / invested * 100) if invested > 0 else 0.0,
+        'max_drawdown_percent': float(drawdown.min() * 100),
+        'volatility_percent': float(active_returns.std() * np.sqrt(data.periods_per_year) * 100) if len(active_returns) > 1 else 0.0,
+        'annualized_return_percent': float((index[-1] ** (1 / years) - 1) * 100) if years else 0.0
+    }
+
+
+def run_backtest(prices, base_allocation=None, signal_adjustments=None, correlation_bonus=CORRELATION_BONUS,
+                 monthly_investment=50, cadence='MS', use_correlation=True):
+    """
+    Exécute un backtest complet et construit son rapport
+
+    Args:
+        prices (pd.DataFrame): Prix sur une grille régulière (temps, symboles)
+        base_allocation (dict, optional): Poids de base (allocation du tracker par défaut)
+        signal_adjustments (dict, optional): Ajustements par signal (ceux du tracker par défaut)
+        correlation_bonus (float): Bonus de corrélation
+        monthly_investment (float): Montant investi à chaque date
+        cadence (str): Périodicité des investissements (alias pandas)
+        use_correlation (bool): Utiliser la série de corrélation glissante
+
+    Returns:
+        dict: Rapport du backtest
+    """
+    data = BacktestData(prices, cadence, use_correlation)
+    base, adjustments = weight_vectors(data.symbols, base_allocation, signal_adjustments)
+    result = simulate(data, base, adjustments, correlation_bonus, monthly_investment)
+
+    assets = {}
+    for j, symbol in enumerate(data.symbols):
+        total = float(result['invested_assets'][-1, j]) if len(data.invest_idx) else 0.0
+        if total > 0:
+            current = float(result['asset_values'][-1, j])
+            assets[symbol] = {
+                'total_invested': total,
+                'quantity': float(result['positions'][-1, j]),
+                'current_value': current,
+                'current_price': float(data.prices[-1, j]),
+                'roi_percent': (current - total) / total * 100
+            }
+
+    return {
+        'date': datetime.now().isoformat(),
+        'start': format_timestamp(data.index[0]),
+        'end': format_timestamp(data.index[-1]),
+        'cadence': cadence,
+        'monthly_investment': monthly_investment,
+        'investments': len(data.invest_idx),
+        'performance': performance_metrics(data, result),
+        'assets': assets,
+        'history': [
+            {
+                'date': format_timestamp(data.invest_dates[k]),
+                'allocation': dict(zip(data.symbols, result['weights'][k].round(6).tolist())),
+                'total_invested': float(result['invested'][i]),
+                'current_value': float(result['values'][i])
+            }
+            for k, i in enumerate(data.invest_idx)
+        ]
+    }
+
+
+def parse_args(argv=None):
+    """
+    Analyse les arguments de la ligne de commande
+
+    Args:
+        argv (list, optional): Arguments (sys.argv par défaut)
+
+    Returns:
+        argparse.Namespace: Arguments
+    """
+    parser = argparse.ArgumentParser(description="Backtest de la stratégie d'allocation")
+    parser.add_argument('--start', help="Date de début (ex. 2024-01-01)")
+    parser.add_argument('--end', help="Date de fin")
+    parser.add_argument('--cadence', default='MS',
+                        help="Périodicité des investissements (alias pandas: MS, W, 14D...)")
+    parser.add_argument('--monthly-investment', type=float, default=50,
+                        help="Montant investi à chaque date (EUR)")
+    parser.add_argument('--freq', default='30min', help="Pas de la grille de prix")
+    parser.add_argument('--no-correlation', action='store_true',
+                        help="Ignorer les ajustements de corrélation")
+    parser.add_argument('--output', default=BACKTEST_REPORT_FILE, help="Fichier du rapport")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Fonction principale
+
+    Args:
+        argv (list, optional): Arguments de la ligne de commande
+    """
+    try:
+        args = parse_args(argv)
+        prices = load_price_matrix(args.freq, args.start, args.end)
+        if prices.empty:
+            logger.error("Données insuffisantes pour le backtest")
+            return
+
+        report = run_backtest(
+            prices, monthly_investment=args.monthly_investment,
+            cadence=args.cadence, use_correlation=not args.no_correlation
+        )
+
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        performance = report['performance']
+        logger.info(
+            f"Backtest terminé: {report['investments']} investissements, "
+            f"ROI = {performance['roi_percent']:.2f}%, drawdown max = {performance['max_drawdown_percent']:.2f}%"
+        )
+    except Exception as e:
+        logger.error(f"Erreur lors du backtest: {str(e)}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    main()
@@ -0,0 +1,254 @@
+import os
+import json
+import argparse
+import logging
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from trading.suivi_investissement_crypto import InvestmentTracker
+
+logger = logging.getLogger('batch_valuation')
+
+DATA_DIR = '/home/crypto_bot/data'
+# Un sous-répertoire par client, au format du tracker (portfolio.json + journal)
+CLIENTS_DIR = '/home/crypto_bot/data/clients'
+BATCH_VALUATION_FILE = '/home/crypto_bot/data/batch_valuation.csv'
+
+
+def load_client_portfolio(client_dir):
+    """
+    Lit le portefeuille d'un client (instantané puis journal) sans rien écrire
+
+    Contrairement à InvestmentTracker, ni l'état de risque ni la migration
+    d'un ancien portfolio.json ne sont écrits, et l'instantané ne passe pas
+    par le cache partagé (qui garderait chaque client en mémoire).
+
+    Args:
+        client_dir (str): Répertoire de données du client
+
+    Returns:
+        dict: Portefeuille actuel
+    """
+    portfolio_file = os.path.join(client_dir, 'portfolio.json')
+    if os.path.exists(portfolio_file):
+        with open(portfolio_file, 'r') as f:
+            portfolio = json.load(f)
+        # Ancien format: les avoirs incluent déjà l'historique
+        portfolio.pop('history', None)
+    else:
+        portfolio = InvestmentTracker._empty_portfolio()
+    return InvestmentTracker.replay_journal(portfolio, os.path.join(client_dir, 'portfolio_journal.jsonl'))
+
+
+def load_portfolios(clients_dir=CLIENTS_DIR):
+    """
+    Charge le portefeuille de chaque client (instantané puis journal)
+
+    Args:
+        clients_dir (str): Répertoire contenant un répertoire de données par client
+
+    Returns:
+        dict: Portefeuille par identifiant de client
+    """
+    portfolios = {}
+    for client_id in sorted(os.listdir(clients_dir)):
+        client_dir = os.path.join(clients_dir, client_id)
+        if os.path.isdir(client_dir):
+            try:
+                portfolios[client_id] = load_client_portfolio(client_dir)
+            except Exception as e:
+                logger.error(f"Erreur lors du chargement du portefeuille {client_id}: {str(e)}")
+    return portfolios
+
+
+def holdings_matrix(portfolios, symbols=None):
+    """
+    Construit les matrices des avoirs (portefeuilles, symboles)
+
+    Args:
+        portfolios (dict): Portefeuille par identifiant de client
+        symbols (list, optional): Colonnes (tous les actifs détenus par défaut)
+
+    Returns:
+        tuple: (identifiants, symboles, quantités, montants investis par actif, totaux investis)
+    """
+    client_ids = list(portfolios)
+    if symbols is None:
+        symbols = sorted({symbol for portfolio in portfolios.values() for symbol in portfolio['assets']})
+    column = {symbol: j for j, symbol in enumerate(symbols)}
+
+    quantities = np.zeros((len(client_ids), len(symbols)))
+    invested = np.zeros((len(client_ids), len(symbols)))
+    total_invested = np.zeros(len(client_ids))
+    for i, client_id in enumerate(client_ids):
+        portfolio = portfolios[client_id]
+        total_invested[i] = portfolio['total_invested']
+        for symbol, asset in portfolio['assets'].items():
+            if symbol in column:
+                quantities[i, column[symbol]] = asset['quantity']
+                invested[i, column[symbol]] = asset['total_invested']
+
+    return client_ids, list(symbols), quantities, invested, total_invested
+
+
+def price_vector(market_data, symbols):
+    """
+    Extrait les prix du snapshot de marché dans l'ordre des colonnes
+
+    Args:
+        market_data (dict): Dernier tick par symbole
+        symbols (list): Symboles
+
+    Returns:
+        np.ndarray: Prix (0 pour un symbole sans cotation, comme le tracker)
+    """
+    return np.array([market_data.get(symbol, {}).get('price', 0) or 0 for symbol in symbols], dtype=float)
+
+
+def value_portfolios(quantities, invested, total_invested, prices):
+    """
+    Valorise tous les portefeuilles au même prix
+
+    Args:
+        quantities (np.ndarray): Quantités (portefeuilles, symboles)
+        invested (np.ndarray): Montants investis par actif (portefeuilles, symboles)
+        total_invested (np.ndarray): Totaux investis (portefeuilles)
+        prices (np.ndarray): Prix (symboles)
+
+    Returns:
+        dict: Valeurs par actif, valeurs totales, ROI par actif et ROI total (%, NaN sans investissement)
+    """
+    asset_values = quantities * prices
+    current_values = asset_values.sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        asset_roi = np.where(invested > 0, (asset_values - invested) / invested * 100, np.nan)
+        total_roi = np.where(total_invested > 0, (current_values - total_invested) / total_invested * 100, np.nan)
+
+    return {
+        'asset_values': asset_values,
+        'current_values': current_values,
+        'asset_roi': asset_roi,
+        'total_roi': total_roi
+    }
+
+
+def next_allocations(allocation, symbols, monthly_investments):
+    """
+    Répartit le prochain investissement de chaque portefeuille selon l'allocation commune
+
+    L'allocation ne dépend que du marché et des corrélations: elle est calculée
+    une seule fois puis appliquée au montant de chaque client.
+
+    Args:
+        allocation (dict): Allocation du tracker (generate_allocation)
+        symbols (list): Symboles
+        monthly_investments (np.ndarray): Montant investi par portefeuille
+
+    Returns:
+        np.ndarray: Montants en euros (portefeuilles, symboles), arrondis au centime
+    """
+    weights = np.array([allocation['normalized_allocation'].get(symbol, 0) for symbol in symbols], dtype=float)
+    return np.round(np.outer(monthly_investments, weights), 2)
+
+
+def run_batch_valuation(portfolios, tracker, monthly_investment=50):
+    """
+    Valorise un ensemble de portefeuilles contre un même snapshot de marché
+
+    Args:
+        portfolios (dict): Portefeuille par identifiant de client
+        tracker (InvestmentTracker): Tracker donnant le snapshot de marché et l'allocation
+        monthly_investment (float or np.ndarray): Montant investi (commun ou par portefeuille)
+
+    Returns:
+        pd.DataFrame: Une ligne par portefeuille (totaux, puis valeur, ROI et prochain achat par actif)
+    """
+    market_data = tracker.load_market_data()
+    allocation = tracker.generate_allocation()
+
+    # Colonnes: actifs détenus et actifs de l'allocation
+    held = {symbol for portfolio in portfolios.values() for symbol in portfolio['assets']}
+    symbols = sorted(held | set(allocation['normalized_allocation']))
+
+    client_ids, symbols, quantities, invested, total_invested = holdings_matrix(portfolios, symbols)
+    prices = price_vector(market_data, symbols)
+    valuation = value_portfolios(quantities, invested, total_invested, prices)
+    monthly = np.broadcast_to(np.asarray(monthly_investment, dtype=float), (len(client_ids),))
+    purchases = next_allocations(allocation, symbols, monthly)
+
+    columns = {
+        'client_id': client_ids,
+        'total_invested': total_invested,
+        'current_value': valuation['current_values'],
+        'total_roi_percent': valuation['total_roi'],
+        'monthly_investment': monthly
+    }
+    for j, symbol in enumerate(symbols):
+        columns[f'value_{symbol}'] = valuation['asset_values'][:, j]
+        columns[f'roi_{symbol}'] = valuation['asset_roi'][:, j]
+        columns[f'next_{symbol}'] = purchases[:, j]
+    return pd.DataFrame(columns)
+
+
+def parse_args(argv=None):
+    """
+    Analyse les arguments de la ligne de commande
+
+    Args:
+        argv (list, optional): Arguments (sys.argv par défaut)
+
+    Returns:
+        argparse.Namespace: Arguments
+    """
+    parser = argparse.ArgumentParser(description="Valorisation groupée des portefeuilles clients")
+    parser.add_argument('--clients-dir', default=CLIENTS_DIR, help="Répertoire des portefeuilles clients")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Répertoire des données de marché et de corrélation")
+    parser.add_argument('--monthly-investment', type=float, default=50,
+                        help="Montant investi par client (EUR)")
+    parser.add_argument('--output', default=BATCH_VALUATION_FILE, help="Fichier CSV des résultats")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Fonction principale
+
+    Args:
+        argv (list, optional): Arguments de la ligne de commande
+    """
+    try:
+        args = parse_args(argv)
+        portfolios = load_portfolios(args.clients_dir)
+        if not portfolios:
+            logger.warning(f"Aucun portefeuille client dans {args.clients_dir}")
+            return
+
+        # Snapshot de marché et allocation chargés une seule fois pour tous les clients
+        tracker = InvestmentTracker(args.monthly_investment, data_dir=args.data_dir)
+        results = run_batch_valuation(portfolios, tracker, args.monthly_investment)
+
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        tmp_file = args.output + '.tmp'
+        results.to_csv(tmp_file, index=False)
+        os.replace(tmp_file, args.output)
+
+        total_invested = results['total_invested'].sum()
+        total_value = results['current_value'].sum()
+        total_roi = (total_value - total_invested) / total_invested * 100 if total_invested > 0 else 0
+        logger.info(
+            f"{len(results)} portefeuilles valorisés le {datetime.now().isoformat()}: "
+            f"{total_invested:.2f} EUR investis, {total_value:.2f} EUR, ROI = {total_roi:.2f}%"
+        )
+    except Exception as e:
+        logger.error(f"Erreur lors de la valorisation groupée: {str(e)}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    main()
@@ -0,0 +1,204 @@
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+from data_collection.market_store import MarketStore, to_utc
+
+logger = logging.getLogger('monte_carlo')
+
+MARKET_DATA_FILE = '/home/crypto_bot/data/market_data.json'
+
+# Les cryptomonnaies cotent tous les jours: un mois moyen compte 30,44 jours
+DAYS_PER_MONTH = 365.25 / 12
+
+DEFAULT_HORIZON_MONTHS = 12
+# 10 000 trajectoires: erreur relative ~0,5 % sur les percentiles 5 et 95
+DEFAULT_PATHS = 10000
+# Fenêtre d'estimation des rendements (jours de prix lus dans le stockage)
+DEFAULT_ESTIMATION_DAYS = 365
+DEFAULT_CHUNK_SIZE = 10000
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def load_daily_prices(store=None, market_data_file=MARKET_DATA_FILE, start=None):
+    """
+    Charge l'historique des prix de clôture journaliers
+
+    Args:
+        store (MarketStore, optional): Stockage de marché
+        market_data_file (str): Repli JSON
+        start (datetime, optional): Début de l'historique
+
+    Returns:
+        pd.DataFrame: Dernier prix de chaque jour (jours, symboles)
+    """
+    store = store or MarketStore()
+    if store.has_data():
+        df = store.read(start=start, columns=['timestamp', 'symbol', 'price'])
+    else:
+        with open(market_data_file, 'r') as f:
+            df = pd.DataFrame(json.load(f))[['timestamp', 'symbol', 'price']]
+
+    df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True)
+    if start is not None:
+        df = df[df['timestamp'] >= to_utc(start)]
+    prices = df.pivot_table(index='timestamp', columns='symbol', values='price', aggfunc='last')
+    return prices.resample('1D').last().ffill().astype(float)
+
+
+def estimate_parameters(prices, symbols):
+    """
+    Estime la moyenne et la covariance des rendements logarithmiques journaliers
+
+    Un symbole sans historique est traité comme du numéraire (rendement et
+    variance nuls).
+
+    Args:
+        prices (pd.DataFrame): Prix journaliers (jours, symboles)
+        symbols (list): Symboles simulés
+
+    Returns:
+        tuple: (moyennes (symboles), covariance (symboles, symboles), nombre de rendements)
+    """
+    returns = np.log(prices.reindex(columns=symbols)).diff().iloc[1:]
+    mean = returns.mean().fillna(0).to_numpy()
+    cov = returns.cov().fillna(0).to_numpy()
+    return mean, cov, len(returns)
+
+
+def covariance_factor(cov):
+    """
+    Calcule un facteur F tel que F @ F.T = cov
+
+    La décomposition spectrale tolère une covariance singulière ou
+    légèrement non positive (covariances estimées par paires).
+
+    Args:
+        cov (np.ndarray): Matrice de covariance
+
+    Returns:
+        np.ndarray: Facteur de la covariance
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(cov)
+    return eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+
+def simulate_dca(mean, cov, weights, holdings, monthly_investment, horizon_months=DEFAULT_HORIZON_MONTHS,
+                 n_paths=DEFAULT_PATHS, chunk_size=DEFAULT_CHUNK_SIZE, seed=None):
+    """
+    Simule la valeur finale d'un investissement programmé sur des trajectoires de prix corrélées
+
+    Les rendements mensuels suivent une loi normale multivariée (paramètres
+    journaliers mis à l'échelle du mois). Le montant mensuel est réparti
+    selon les poids au début de chaque mois, les avoirs actuels évoluent
+    avec les prix. Les trajectoires sont générées par blocs de chunk_size
+    pour borner la mémoire (bloc x mois x symboles).
+
+    Args:
+        mean (np.ndarray): Rendements logarithmiques journaliers moyens (symboles)
+        cov (np.ndarray): Covariance journalière (symboles, symboles)
+        weights (np.ndarray): Allocation du montant mensuel (symboles)
+        holdings (np.ndarray): Valeur actuelle des avoirs (symboles)
+        monthly_investment (float): Montant investi chaque mois
+        horizon_months (int): Nombre de mois simulés
+        n_paths (int): Nombre de trajectoires
+        chunk_size (int): Nombre de trajectoires par bloc
+        seed (int, optional): Graine du générateur aléatoire
+
+    Returns:
+        np.ndarray: Valeur finale du portefeuille par trajectoire
+    """
+    rng = np.random.default_rng(seed)
+    step_mean = mean * DAYS_PER_MONTH
+    step_factor = covariance_factor(cov * DAYS_PER_MONTH)
+    contributions = monthly_investment * np.asarray(weights, dtype=float)
+    holdings = np.asarray(holdings, dtype=float)
+
+    final_values = np.empty(n_paths)
+    for start in range(0, n_paths, chunk_size):
+        size = min(chunk_size, n_paths - start)
+        shocks = rng.standard_normal((size, horizon_months, len(step_mean)))
+        log_paths = np.cumsum(shocks @ step_factor.T + step_mean, axis=1)
+
+        # Croissance entre chaque date d'achat (début de mois) et la fin de l'horizon
+        final_log = log_paths[:, -1, :]
+        purchase_log = np.concatenate([np.zeros((size, 1, len(step_mean))), log_paths[:, :-1, :]], axis=1)
+        growth = np.exp(final_log[:, None, :] - purchase_log)
+
+        final_values[start:start + size] = (
+            np.exp(final_log) @ holdings + np.einsum('pts,s->p', growth, contributions)
+        )
+
+    return final_values
+
+
+def summarize_outcomes(final_values, total_invested, percentiles=PERCENTILES):
+    """
+    Résume la distribution des valeurs finales
+
+    Args:
+        final_values (np.ndarray): Valeur finale par trajectoire
+        total_invested (float): Total investi à la fin de l'horizon
+        percentiles (tuple): Percentiles calculés
+
+    Returns:
+        dict: Percentiles, moyenne et probabilité de perte
+    """
+    values = np.percentile(final_values, percentiles)
+    return {
+        'total_invested': float(total_invested),
+        'mean_final_value': float(final_values.mean()),
+        'percentiles': {f'p{p}': float(v) for p, v in zip(percentiles, values)},
+        'probability_of_loss': float((final_values < total_invested).mean())
+    }
+
+
+def project_portfolio(portfolio, allocation, market_data, prices, monthly_investment,
+                      horizon_months=DEFAULT_HORIZON_MONTHS, n_paths=DEFAULT_PATHS,
+                      chunk_size=DEFAULT_CHUNK_SIZE, seed=None):
+    """
+    Projette le portefeuille en poursuivant l'investissement programmé avec l'allocation actuelle
+
+    Args:
+        portfolio (dict): Portefeuille du tracker
+        allocation (dict): Allocation du tracker (generate_allocation)
+        market_data (dict): Dernier tick par symbole
+        prices (pd.DataFrame): Prix journaliers (jours, symboles)
+        monthly_investment (float): Montant investi chaque mois
+        horizon_months (int): Nombre de mois simulés
+        n_paths (int): Nombre de trajectoires
+        chunk_size (int): Nombre de trajectoires par bloc
+        seed (int, optional): Graine du générateur aléatoire
+
+    Returns:
+        dict: Projection (paramètres, percentiles de la valeur finale, probabilité de perte)
+    """
+    weights = allocation['normalized_allocation']
+    symbols = sorted(set(weights) | set(portfolio['assets']))
+
+    mean, cov, n_returns = estimate_parameters(prices, symbols)
+    if n_returns < 2:
+        raise ValueError("Historique de prix insuffisant pour la projection")
+
+    holdings = np.array([
+        portfolio['assets'].get(symbol, {}).get('quantity', 0) * market_data.get(symbol, {}).get('price', 0)
+        for symbol in symbols
+    ])
+    final_values = simulate_dca(
+        mean, cov, [weights.get(symbol, 0) for symbol in symbols], holdings, monthly_investment,
+        horizon_months, n_paths, chunk_size, seed
+    )
+
+    projection = {
+        'horizon_months': horizon_months,
+        'paths': n_paths,
+        'history_days': n_returns,
+        'monthly_investment': monthly_investment,
+        'current_value': float(holdings.sum())
+    }
+    projection.update(summarize_outcomes(
+        final_values, portfolio['total_invested'] + monthly_investment * horizon_months
+    ))
+    return projection
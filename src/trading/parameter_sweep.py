@@ -0,0 +1,210 @@
+import os
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from trading.backtest import (
+    SIGNALS, BacktestData, load_price_matrix, weight_vectors, simulate, performance_metrics
+)
+from trading.allocation_rules import CORRELATION_BONUS
+
+logger = logging.getLogger('parameter_sweep')
+
+SWEEP_RESULTS_FILE = '/home/crypto_bot/data/parameter_sweep.csv'
+
+# Amplitudes testées pour les ajustements par signal (le signe reste celui du tracker)
+ADJUSTMENT_GRID = [0.0, 0.01, 0.02, 0.05, 0.10]
+CORRELATION_BONUS_GRID = [0.0, 0.01, 0.02, 0.05]
+
+# Colonnes de performance du tableau de résultats
+METRICS = ['roi_percent', 'max_drawdown_percent', 'volatility_percent', 'annualized_return_percent']
+
+# Ordre de tri par critère (True: croissant)
+SORT_ASCENDING = {
+    'roi_percent': False,
+    'annualized_return_percent': False,
+    'max_drawdown_percent': False,  # drawdown négatif: le plus proche de 0 d'abord
+    'volatility_percent': True
+}
+
+# Données partagées par les processus de travail (transmises une fois par processus)
+_data = None
+
+
+def generate_candidates(symbols, n_samples=2000, seed=None, concentration=20.0):
+    """
+    Génère des jeux de paramètres autour de la configuration actuelle du tracker
+
+    Le premier candidat est la configuration actuelle. Les allocations de
+    base suivent une loi de Dirichlet centrée sur l'allocation actuelle, les
+    ajustements sont tirés dans les grilles d'amplitudes.
+
+    Args:
+        symbols (list): Symboles de la grille de prix
+        n_samples (int): Nombre de candidats
+        seed (int, optional): Graine du générateur aléatoire
+        concentration (float): Concentration de la loi de Dirichlet (plus élevée: plus proche de l'actuel)
+
+    Returns:
+        tuple: (allocations (candidats, symboles), ajustements (candidats, signaux), bonus (candidats))
+    """
+    rng = np.random.default_rng(seed)
+    base, adjustments = weight_vectors(symbols)
+    in_allocation = np.isfinite(base)
+
+    bases = np.full((n_samples, len(symbols)), np.nan)
+    current = base[in_allocation] / base[in_allocation].sum()
+    bases[:, in_allocation] = rng.dirichlet(concentration * np.maximum(current, 1e-3), size=n_samples)
+    bases[0] = base
+
+    signs = np.sign(adjustments)
+    all_adjustments = signs * rng.choice(ADJUSTMENT_GRID, size=(n_samples, len(SIGNALS)))
+    all_adjustments[0] = adjustments
+
+    bonuses = rng.choice(CORRELATION_BONUS_GRID, size=n_samples)
+    bonuses[0] = CORRELATION_BONUS
+    return bases, all_adjustments, bonuses
+
+
+def _init_worker(data):
+    """
+    Initialise un processus de travail avec les données préparées
+
+    Args:
+        data (BacktestData): Données du backtest
+    """
+    global _data
+    _data = data
+
+
+def _evaluate_chunk(args):
+    """
+    Évalue un bloc de candidats (exécuté dans un processus de travail)
+
+    Args:
+        args (tuple): (allocations, ajustements, bonus, montant investi)
+
+    Returns:
+        np.ndarray: Indicateurs de performance (candidats, METRICS)
+    """
+    bases, adjustments, bonuses, monthly_investment = args
+    metrics = np.empty((len(bases), len(METRICS)))
+    for k in range(len(bases)):
+        result = simulate(_data, bases[k], adjustments[k], bonuses[k], monthly_investment)
+        performance = performance_metrics(_data, result)
+        metrics[k] = [performance[name] for name in METRICS]
+    return metrics
+
+
+def run_sweep(data, bases, adjustments, bonuses, monthly_investment=50, workers=1, chunk_size=100, sort_by='roi_percent'):
+    """
+    Évalue tous les candidats sur un pool de processus et classe les résultats
+
+    Args:
+        data (BacktestData): Données préparées, partagées par tous les candidats
+        bases (np.ndarray): Allocations de base (candidats, symboles)
+        adjustments (np.ndarray): Ajustements par signal (candidats, signaux)
+        bonuses (np.ndarray): Bonus de corrélation (candidats)
+        monthly_investment (float): Montant investi à chaque date
+        workers (int): Nombre de processus
+        chunk_size (int): Nombre de candidats par tâche
+        sort_by (str): Critère de classement (colonne de METRICS)
+
+    Returns:
+        pd.DataFrame: Résultats classés (un candidat par ligne)
+    """
+    tasks = [
+        (bases[i:i + chunk_size], adjustments[i:i + chunk_size], bonuses[i:i + chunk_size], monthly_investment)
+        for i in range(0, len(bases), chunk_size)
+    ]
+
+    if workers <= 1:
+        _init_worker(data)
+        parts = [_evaluate_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,)) as executor:
+            parts = list(executor.map(_evaluate_chunk, tasks))
+
+    results = pd.DataFrame(np.concatenate(parts), columns=METRICS)
+    for j, symbol in enumerate(data.symbols):
+        results[f'base_{symbol}'] = bases[:, j]
+    for j, name in enumerate(SIGNALS):
+        if name != 'NEUTRAL':
+            results[f'adj_{name}'] = adjustments[:, j]
+    results['correlation_bonus'] = bonuses
+    results['is_current'] = np.arange(len(results)) == 0
+
+    results = results.sort_values(sort_by, ascending=SORT_ASCENDING[sort_by], kind='stable')
+    results.insert(0, 'rank', np.arange(1, len(results) + 1))
+    return results.reset_index(drop=True)
+
+
+def parse_args(argv=None):
+    """
+    Analyse les arguments de la ligne de commande
+
+    Args:
+        argv (list, optional): Arguments (sys.argv par défaut)
+
+    Returns:
+        argparse.Namespace: Arguments
+    """
+    parser = argparse.ArgumentParser(description="Recherche des paramètres d'allocation par backtest")
+    parser.add_argument('--samples', type=int, default=2000, help="Nombre de jeux de paramètres évalués")
+    parser.add_argument('--seed', type=int, default=None, help="Graine du générateur aléatoire")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Nombre de processus (0: tous les cœurs)")
+    parser.add_argument('--sort', default='roi_percent', choices=METRICS, help="Critère de classement")
+    parser.add_argument('--start', help="Date de début (ex. 2024-01-01)")
+    parser.add_argument('--end', help="Date de fin")
+    parser.add_argument('--cadence', default='MS', help="Périodicité des investissements (alias pandas)")
+    parser.add_argument('--monthly-investment', type=float, default=50,
+                        help="Montant investi à chaque date (EUR)")
+    parser.add_argument('--freq', default='30min', help="Pas de la grille de prix")
+    parser.add_argument('--no-correlation', action='store_true',
+                        help="Ignorer les ajustements de corrélation")
+    parser.add_argument('--output', default=SWEEP_RESULTS_FILE, help="Fichier CSV des résultats")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Fonction principale
+
+    Args:
+        argv (list, optional): Arguments de la ligne de commande
+    """
+    try:
+        args = parse_args(argv)
+        workers = args.workers or os.cpu_count()
+
+        prices = load_price_matrix(args.freq, args.start, args.end)
+        if prices.empty:
+            logger.error("Données insuffisantes pour la recherche de paramètres")
+            return
+
+        # Grille de prix et signaux préparés une seule fois pour tous les candidats
+        data = BacktestData(prices, args.cadence, not args.no_correlation)
+        bases, adjustments, bonuses = generate_candidates(data.symbols, args.samples, args.seed)
+        results = run_sweep(data, bases, adjustments, bonuses, args.monthly_investment, workers, sort_by=args.sort)
+
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        results.to_csv(args.output, index=False)
+
+        current = results[results['is_current']].iloc[0]
+        logger.info(f"{len(results)} jeux de paramètres évalués sur {workers} processus, résultats dans {args.output}")
+        logger.info(f"Configuration actuelle: rang {int(current['rank'])}, ROI = {current['roi_percent']:.2f}%")
+        logger.info("Meilleurs résultats:\n" + results.head(10)[['rank'] + METRICS].to_string(index=False))
+    except Exception as e:
+        logger.error(f"Erreur lors de la recherche de paramètres: {str(e)}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    main()
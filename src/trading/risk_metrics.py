@@ -0,0 +1,248 @@
+import os
+import json
+import math
+from datetime import datetime
+from statistics import NormalDist
+
+import numpy as np
+
+# Série de l'ensemble du portefeuille (les autres séries sont les actifs)
+PORTFOLIO_KEY = 'PORTFOLIO'
+
+# Rendements conservés pour la volatilité, les ratios et la VaR (36 mois)
+RISK_WINDOW = 36
+
+# Le journal du portefeuille reçoit une entrée par investissement mensuel:
+# nombre de périodes par an retenu tant que l'écart entre les dates des
+# entrées ne peut pas être mesuré (sinon l'annualisation en est déduite)
+PERIODS_PER_YEAR = 12
+DAYS_PER_YEAR = 365.25
+
+VAR_CONFIDENCE = 0.95
+RISK_FREE_RATE = 0.0
+
+
+def period_days(start, end):
+    """
+    Calcule l'écart en jours entre deux dates ISO
+
+    Args:
+        start (str): Date ISO de début (None pour la première valeur)
+        end (str): Date ISO de fin
+
+    Returns:
+        float: Écart en jours, ou None si une date est absente ou illisible
+    """
+    if not start or not end:
+        return None
+    try:
+        delta = datetime.fromisoformat(end.replace('Z', '+00:00')) - datetime.fromisoformat(start.replace('Z', '+00:00'))
+    except (ValueError, TypeError):
+        return None
+    return delta.total_seconds() / 86400
+
+
+def periods_per_year(periods):
+    """
+    Déduit le nombre de périodes par an de la durée moyenne des périodes
+
+    Args:
+        periods (list): Durées des périodes en jours
+
+    Returns:
+        float: Périodes par an (PERIODS_PER_YEAR si les durées sont inconnues)
+    """
+    total = sum(periods or [])
+    if total <= 0:
+        return PERIODS_PER_YEAR
+    return DAYS_PER_YEAR * len(periods) / total
+
+
+class RiskState:
+    """
+    État incrémental des indicateurs de risque par série (actifs et portefeuille)
+
+    Chaque série conserve un indice de valeur (rendements hors apports), son
+    plus haut, le drawdown maximal et une fenêtre glissante de rendements avec
+    leurs sommes courantes: une nouvelle valeur met tout à jour en temps constant.
+    La durée de chaque période (écart entre deux dates) est conservée dans la
+    même fenêtre pour annualiser les indicateurs.
+    """
+
+    def __init__(self, series=None, journal_offset=0):
+        """
+        Initialise un état
+
+        Args:
+            series (dict, optional): État par série
+            journal_offset (int): Position dans le journal des entrées déjà intégrées
+        """
+        self.series = series or {}
+        self.journal_offset = journal_offset
+
+    def update(self, key, timestamp, value, contribution=0):
+        """
+        Intègre une nouvelle valeur d'une série
+
+        Le rendement de la période exclut les apports: r = (valeur - apport) / valeur précédente - 1.
+
+        Args:
+            key (str): Série (symbole ou PORTFOLIO_KEY)
+            timestamp (str): Date ISO de la valeur
+            value (float): Valeur après apport
+            contribution (float): Montant investi pendant la période
+
+        Returns:
+            float: Rendement de la période, ou None (première valeur ou valeur déjà connue)
+        """
+        state = self.series.get(key)
+        if state is None:
+            state = self.series[key] = {
+                'last_timestamp': None,
+                'last_value': 0.0,
+                'index': 1.0,
+                'peak': 1.0,
+                'max_drawdown': 0.0,
+                'count': 0,
+                'returns': [],
+                'sum': 0.0,
+                'sum_sq': 0.0,
+                'downside_sq': 0.0,
+                'periods': []
+            }
+        elif state['last_timestamp'] is not None and timestamp <= state['last_timestamp']:
+            return None
+
+        previous = state['last_value']
+        previous_timestamp = state['last_timestamp']
+        state['last_timestamp'] = timestamp
+        state['last_value'] = value
+        if previous <= 0:
+            return None
+
+        r = (value - contribution) / previous - 1
+        state['index'] *= 1 + r
+        state['peak'] = max(state['peak'], state['index'])
+        state['max_drawdown'] = min(state['max_drawdown'], state['index'] / state['peak'] - 1)
+
+        # Fenêtre glissante et sommes courantes
+        window = state['returns']
+        window.append(r)
+        state['sum'] += r
+        state['sum_sq'] += r * r
+        state['downside_sq'] += min(r, 0.0) ** 2
+        if len(window) > RISK_WINDOW:
+            old = window.pop(0)
+            state['sum'] -= old
+            state['sum_sq'] -= old * old
+            state['downside_sq'] -= min(old, 0.0) ** 2
+
+        # Durée de la période en jours
+        periods = state['periods']
+        days = period_days(previous_timestamp, timestamp)
+        if days is not None:
+            periods.append(days)
+            if len(periods) > RISK_WINDOW:
+                periods.pop(0)
+        state['count'] += 1
+        return r
+
+    def update_entry(self, entry):
+        """
+        Intègre une entrée du journal du portefeuille (chaque actif puis le portefeuille)
+
+        Args:
+            entry (dict): Entrée du journal (date, investment, purchases, asset_values, current_value)
+        """
+        purchases = entry.get('purchases', {})
+        for symbol, value in entry.get('asset_values', {}).items():
+            self.update(symbol, entry['date'], value, purchases.get(symbol, {}).get('amount', 0))
+        self.update(PORTFOLIO_KEY, entry['date'], entry['current_value'], entry.get('investment', 0))
+
+    def metrics(self, key):
+        """
+        Calcule les indicateurs de risque d'une série
+
+        Args:
+            key (str): Série
+
+        Returns:
+            dict: Drawdowns, volatilité annualisée, ratios de Sharpe et Sortino, VaR sur une période (%)
+        """
+        state = self.series.get(key)
+        if state is None:
+            return {}
+
+        n = len(state['returns'])
+        result = {
+            'observations': state['count'],
+            'drawdown_percent': (state['index'] / state['peak'] - 1) * 100,
+            'max_drawdown_percent': state['max_drawdown'] * 100,
+            'volatility_percent': None,
+            'sharpe_ratio': None,
+            'sortino_ratio': None,
+            'var_historical_percent': None,
+            'var_parametric_percent': None,
+            'periods_per_year': periods_per_year(state['periods'])
+        }
+        if n < 2:
+            return result
+
+        per_year = result['periods_per_year']
+        mean = state['sum'] / n
+        std = math.sqrt(max(state['sum_sq'] - n * mean * mean, 0.0) / (n - 1))
+        downside = math.sqrt(max(state['downside_sq'], 0.0) / n)
+        excess = mean - RISK_FREE_RATE / per_year
+        z = NormalDist().inv_cdf(1 - VAR_CONFIDENCE)
+
+        result['volatility_percent'] = std * math.sqrt(per_year) * 100
+        result['sharpe_ratio'] = excess / std * math.sqrt(per_year) if std > 0 else None
+        result['sortino_ratio'] = excess / downside * math.sqrt(per_year) if downside > 0 else None
+        # Perte sur une période dépassée avec une probabilité 1 - VAR_CONFIDENCE
+        result['var_historical_percent'] = -float(np.percentile(state['returns'], (1 - VAR_CONFIDENCE) * 100)) * 100
+        result['var_parametric_percent'] = -(mean + z * std) * 100
+        return result
+
+    def report(self):
+        """
+        Regroupe les indicateurs du portefeuille et de chaque actif
+
+        Returns:
+            dict: Indicateurs ({'portfolio', 'assets', 'window', 'confidence'})
+        """
+        return {
+            'portfolio': self.metrics(PORTFOLIO_KEY),
+            'assets': {key: self.metrics(key) for key in sorted(self.series) if key != PORTFOLIO_KEY},
+            'window': RISK_WINDOW,
+            'confidence': VAR_CONFIDENCE
+        }
+
+    def save(self, path):
+        """
+        Sauvegarde l'état de façon atomique
+
+        Args:
+            path (str): Chemin du fichier d'état
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'journal_offset': self.journal_offset, 'series': self.series}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Charge l'état s'il existe
+
+        Args:
+            path (str): Chemin du fichier d'état
+
+        Returns:
+            RiskState: État chargé, ou None
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return cls(data['series'], data.get('journal_offset', 0))
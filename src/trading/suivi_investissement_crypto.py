@@ -2,32 +2,63 @@ import pandas as pd
 import numpy as np
 import json
 import os
-from datetime import datetime
+import sys
+import copy
+import hashlib
+import argparse
+from datetime import datetime, timedelta
 import logging
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('/home/crypto_bot/logs/investment.log'),
-        logging.StreamHandler()
-    ]
+from data_collection.market_store import MarketStore
+from trading.risk_metrics import RiskState
+from trading.allocation_optimizer import (
+    load_covariance_state, optimize_allocation, DEFAULT_MAX_WEIGHT, DEFAULT_SHRINKAGE, OPTIMIZATION_METHODS
 )
+from trading.monte_carlo import (
+    load_daily_prices, project_portfolio, DEFAULT_HORIZON_MONTHS, DEFAULT_PATHS, DEFAULT_ESTIMATION_DAYS
+)
+from trading.allocation_rules import (
+    BASE_ALLOCATION, SIGNAL_ADJUSTMENTS, CORRELATION_BONUS, CORRELATION_THRESHOLD
+)
+from utils.file_cache import file_cache
+
 logger = logging.getLogger('investment_tracker')
 
+# Nombre d'entrées du journal entre deux instantanés du portefeuille
+SNAPSHOT_INTERVAL = 10
+
+def latest_by_symbol(f):
+    """
+    Analyse market_data.json et garde le tick le plus récent de chaque symbole
+    
+    Args:
+        f (file): Fichier market_data.json ouvert
+        
+    Returns:
+        dict: Dernier tick par symbole
+    """
+    result = {}
+    for item in json.load(f):
+        symbol = item.get('symbol')
+        if symbol not in result or item.get('timestamp', '') > result[symbol].get('timestamp', ''):
+            result[symbol] = item
+    return result
+
 class InvestmentTracker:
     """Classe pour suivre et optimiser les investissements crypto"""
     
-    def __init__(self, monthly_investment=50, data_dir='/home/crypto_bot/data'):
+    def __init__(self, monthly_investment=50, data_dir='/home/crypto_bot/data', allocation_method='static',
+                 max_weight=DEFAULT_MAX_WEIGHT):
         """
         Initialise le tracker d'investissement
         
         Args:
             monthly_investment (float): Montant mensuel à investir en euros
             data_dir (str): Répertoire des données
+            allocation_method (str): Allocation de base ('static' ou OPTIMIZATION_METHODS)
+            max_weight (float): Poids maximal d'un actif pour une allocation optimisée
         """
         self.monthly_investment = monthly_investment
         self.data_dir = data_dir
@@ -35,65 +66,220 @@ class InvestmentTracker:
         self.sentiment_data_file = os.path.join(data_dir, 'emotional_data.json')
         self.correlation_file = os.path.join(data_dir, 'correlation_report.json')
         self.portfolio_file = os.path.join(data_dir, 'portfolio.json')
+        self.journal_file = os.path.join(data_dir, 'portfolio_journal.jsonl')
         self.report_file = os.path.join(data_dir, 'investment_report.json')
+        self.risk_state_file = os.path.join(data_dir, 'risk_state.json')
+        self.covariance_state_file = os.path.join(data_dir, 'covariance_state.json')
+        self.projection_cache_file = os.path.join(data_dir, 'projection_cache.json')
+        self.market_store = MarketStore(os.path.join(data_dir, 'market_store'))
         
-        # Allocation de base (par défaut)
-        self.base_allocation = {
-            'BTC': 0.40,
-            'ETH': 0.30,
-            'SOL': 0.10,
-            'ADA': 0.05,
-            'BNB': 0.05,
-            'DOT': 0.05,
-            'XRP': 0.05
-        }
+        # Fichiers analysés une seule fois tant qu'ils ne changent pas
+        self.file_cache = file_cache
+        
+        # Allocation de base et ajustements
+        self.base_allocation = BASE_ALLOCATION.copy()
+        self.signal_adjustments = SIGNAL_ADJUSTMENTS.copy()
+        self.correlation_bonus = CORRELATION_BONUS
+        self.correlation_threshold = CORRELATION_THRESHOLD
+        
+        # Allocation de base: 'static' (base_allocation) ou optimisée
+        # ('risk_parity', 'min_variance', 'max_sharpe')
+        self.allocation_method = allocation_method
+        self.max_weight = max_weight
+        self.covariance_shrinkage = DEFAULT_SHRINKAGE
+        
+        # Projection Monte Carlo du rapport
+        self.projection_months = DEFAULT_HORIZON_MONTHS
+        self.projection_paths = DEFAULT_PATHS
+        self.projection_estimation_days = DEFAULT_ESTIMATION_DAYS
         
         # Portefeuille actuel
         self.portfolio = self.load_portfolio()
+        
+        # Indicateurs de risque, mis à jour à chaque entrée du journal
+        self.risk_state = self.load_risk_state()
     
     def load_portfolio(self):
         """
-        Charge le portefeuille depuis le fichier JSON
+        Charge le portefeuille: dernier instantané puis entrées suivantes du journal
         
         Returns:
             dict: Portefeuille actuel
         """
         try:
+            portfolio = self._empty_portfolio()
             if os.path.exists(self.portfolio_file):
-                with open(self.portfolio_file, 'r') as f:
-                    return json.load(f)
-            else:
-                # Créer un portefeuille vide
-                portfolio = {
-                    "total_invested": 0,
-                    "current_value": 0,
-                    "last_update": datetime.now().isoformat(),
-                    "assets": {},
-                    "history": []
-                }
-                return portfolio
+                # Copie: le portefeuille est modifié en place
+                portfolio = copy.deepcopy(self.file_cache.get(self.portfolio_file))
+                
+                # Ancien format: historique complet dans portfolio.json
+                if 'history' in portfolio:
+                    portfolio = self._migrate_history(portfolio)
+            
+            return self.replay_journal(portfolio, self.journal_file)
         except Exception as e:
             logger.error(f"Erreur lors du chargement du portefeuille: {str(e)}")
-            return {
-                "total_invested": 0,
-                "current_value": 0,
-                "last_update": datetime.now().isoformat(),
-                "assets": {},
-                "history": []
-            }
+            return self._empty_portfolio()
+    
+    @classmethod
+    def replay_journal(cls, portfolio, journal_file):
+        """
+        Rejoue les entrées du journal postérieures à l'instantané (sans rien écrire)
+        
+        Args:
+            portfolio (dict): Instantané du portefeuille (modifié en place)
+            journal_file (str): Chemin du journal
+            
+        Returns:
+            dict: Portefeuille actuel
+        """
+        portfolio['journal_entries'] = 0
+        if os.path.exists(journal_file):
+            with open(journal_file, 'r') as f:
+                f.seek(portfolio.get('journal_offset', 0))
+                for line in f:
+                    if line.strip():
+                        cls._apply_entry(portfolio, json.loads(line))
+                        portfolio['journal_entries'] += 1
+        return portfolio
+    
+    @staticmethod
+    def _empty_portfolio():
+        """
+        Crée un portefeuille vide
+        
+        Returns:
+            dict: Portefeuille vide
+        """
+        return {
+            "total_invested": 0,
+            "current_value": 0,
+            "last_update": datetime.now().isoformat(),
+            "assets": {},
+            "journal_offset": 0,
+            "journal_entries": 0
+        }
+    
+    @staticmethod
+    def _apply_entry(portfolio, entry):
+        """
+        Applique une entrée du journal au portefeuille
+        
+        Args:
+            portfolio (dict): Portefeuille (modifié en place)
+            entry (dict): Entrée du journal
+        """
+        for symbol, purchase in entry.get('purchases', {}).items():
+            asset = portfolio['assets'].setdefault(symbol, {"total_invested": 0, "quantity": 0})
+            asset['total_invested'] += purchase['amount']
+            asset['quantity'] += purchase['quantity']
+        for symbol, value in entry.get('asset_values', {}).items():
+            if symbol in portfolio['assets']:
+                portfolio['assets'][symbol]['current_value'] = value
+        portfolio['total_invested'] = entry['total_invested']
+        portfolio['current_value'] = entry['current_value']
+        portfolio['last_update'] = entry['date']
+    
+    def _migrate_history(self, portfolio):
+        """
+        Déplace l'historique d'un ancien portfolio.json dans le journal
+        
+        Args:
+            portfolio (dict): Portefeuille au format historique complet
+            
+        Returns:
+            dict: Portefeuille sans historique, instantané écrit
+        """
+        history = portfolio.pop('history')
+        with open(self.journal_file, 'a') as f:
+            for entry in history:
+                f.write(json.dumps(entry) + '\n')
+        
+        # Les avoirs de l'ancien fichier incluent déjà ces entrées
+        self.portfolio = portfolio
+        self.save_portfolio()
+        logger.info(f"Historique du portefeuille migré vers le journal: {len(history)} entrées")
+        return self.portfolio
     
     def save_portfolio(self):
         """
-        Sauvegarde le portefeuille dans un fichier JSON
+        Écrit un instantané compact du portefeuille (avoirs et position dans le journal)
         """
         try:
             os.makedirs(os.path.dirname(self.portfolio_file), exist_ok=True)
-            with open(self.portfolio_file, 'w') as f:
-                json.dump(self.portfolio, f, indent=2)
+            snapshot = {k: v for k, v in self.portfolio.items() if k != 'journal_entries'}
+            snapshot['journal_offset'] = os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+            
+            tmp_file = self.portfolio_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_file, self.portfolio_file)
+            
+            self.portfolio['journal_offset'] = snapshot['journal_offset']
+            self.portfolio['journal_entries'] = 0
             logger.info("Portefeuille sauvegardé")
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde du portefeuille: {str(e)}")
     
+    def append_journal(self, entry):
+        """
+        Ajoute une entrée au journal et écrit un instantané toutes les SNAPSHOT_INTERVAL entrées
+        
+        Args:
+            entry (dict): Entrée du journal
+        """
+        os.makedirs(os.path.dirname(self.journal_file), exist_ok=True)
+        with open(self.journal_file, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+        
+        self.portfolio['journal_entries'] = self.portfolio.get('journal_entries', 0) + 1
+        if self.portfolio['journal_entries'] >= SNAPSHOT_INTERVAL:
+            self.save_portfolio()
+    
+    def load_risk_state(self):
+        """
+        Charge l'état des indicateurs de risque et intègre les entrées du journal postérieures
+        
+        Returns:
+            RiskState: État à jour
+        """
+        try:
+            state = RiskState.load(self.risk_state_file) or RiskState()
+            if os.path.exists(self.journal_file) and os.path.getsize(self.journal_file) > state.journal_offset:
+                offset = state.journal_offset
+                with open(self.journal_file, 'rb') as f:
+                    f.seek(offset)
+                    while True:
+                        line = f.readline()
+                        # Fin du journal, ou dernière ligne en cours d'écriture:
+                        # elle sera intégrée au prochain chargement
+                        if not line.endswith(b'\n'):
+                            break
+                        if line.strip():
+                            state.update_entry(json.loads(line))
+                        offset = f.tell()
+                if offset > state.journal_offset:
+                    state.journal_offset = offset
+                    state.save(self.risk_state_file)
+            return state
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement des indicateurs de risque: {str(e)}")
+            return RiskState()
+    
+    def iter_history(self):
+        """
+        Parcourt l'historique du portefeuille en lisant le journal ligne par ligne
+        
+        Yields:
+            dict: Entrée du journal (date, investissement, allocation, totaux)
+        """
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    
     def load_market_data(self):
         """
         Charge les données de marché
@@ -102,23 +288,12 @@ class InvestmentTracker:
             dict: Données de marché par symbole
         """
         try:
-            with open(self.market_data_file, 'r') as f:
-                market_data = json.load(f)
-            
-            # Organiser par symbole
-            result = {}
-            for item in market_data:
-                symbol = item.get('symbol')
-                if symbol not in result:
-                    result[symbol] = []
-                result[symbol].append(item)
-            
-            # Trier par timestamp et prendre le plus récent
-            for symbol in result:
-                result[symbol].sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-                result[symbol] = result[symbol][0]  # Garder seulement le plus récent
-            
-            return result
+            # Lecture directe de l'index du dernier tick par symbole
+            if self.market_store.has_data():
+                return self.market_store.latest()
+            
+            # Dernier tick par symbole, recalculé uniquement si le fichier a changé
+            return self.file_cache.get(self.market_data_file, latest_by_symbol)
         except Exception as e:
             logger.error(f"Erreur lors du chargement des données de marché: {str(e)}")
             return {}
@@ -132,13 +307,35 @@ class InvestmentTracker:
         """
         try:
             if os.path.exists(self.correlation_file):
-                with open(self.correlation_file, 'r') as f:
-                    return json.load(f)
+                return self.file_cache.get(self.correlation_file)
             return {}
         except Exception as e:
             logger.error(f"Erreur lors du chargement des données de corrélation: {str(e)}")
             return {}
     
+    def optimized_base_allocation(self):
+        """
+        Calcule l'allocation de base selon la méthode configurée
+        
+        La covariance est mise à jour avec les seuls ticks arrivés depuis la
+        dernière exécution; en cas d'échec, l'allocation statique est utilisée.
+        
+        Returns:
+            dict: Poids de base par symbole
+        """
+        if self.allocation_method == 'static':
+            return self.base_allocation
+        
+        try:
+            state = load_covariance_state(
+                self.covariance_state_file, list(self.base_allocation),
+                self.market_store, self.market_data_file
+            )
+            return optimize_allocation(state, self.allocation_method, self.max_weight, self.covariance_shrinkage)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'optimisation de l'allocation: {str(e)}")
+            return self.base_allocation
+    
     def generate_allocation(self):
         """
         Génère une allocation optimisée pour le portefeuille
@@ -151,8 +348,9 @@ class InvestmentTracker:
             market_data = self.load_market_data()
             correlation_data = self.load_correlation_data()
             
-            # Partir de l'allocation de base
-            allocation = self.base_allocation.copy()
+            # Partir de l'allocation de base (statique ou optimisée)
+            base_allocation = self.optimized_base_allocation()
+            allocation = base_allocation.copy()
             
             # Ajustements basés sur les signaux techniques
             adjustments = {}
@@ -163,17 +361,7 @@ class InvestmentTracker:
                     technical_signal = market_data[symbol].get('technical_signal', 'NEUTRAL')
                     
                     # Ajuster en fonction du signal
-                    adjustment = 0
-                    if technical_signal == 'BULLISH':
-                        adjustment = 0.05
-                    elif technical_signal == 'BULLISH_CAUTION':
-                        adjustment = 0.02
-                    elif technical_signal == 'BEARISH':
-                        adjustment = -0.05
-                    elif technical_signal == 'BEARISH_OPPORTUNITY':
-                        adjustment = -0.02
-                    
-                    adjustments[symbol] = adjustment
+                    adjustments[symbol] = self.signal_adjustments.get(technical_signal, 0)
             
             # Ajustements basés sur les corrélations
             if correlation_data and 'details' in correlation_data:
@@ -184,10 +372,10 @@ class InvestmentTracker:
                         corr_type = best_corr.get('type', '')
                         
                         # Si forte corrélation positive avec décalage (sentiment précède prix)
-                        if 'lag' in corr_type and corr_value > 0.5:
+                        if 'lag' in corr_type and corr_value > self.correlation_threshold:
                             # Vérifier le sentiment récent
                             # Pour simplifier, on ajoute un petit bonus
-                            adjustments[symbol] = adjustments.get(symbol, 0) + 0.02
+                            adjustments[symbol] = adjustments.get(symbol, 0) + self.correlation_bonus
             
             # Appliquer les ajustements
             for symbol, adjustment in adjustments.items():
@@ -201,7 +389,8 @@ class InvestmentTracker:
             euro_allocation = {k: round(v * self.monthly_investment, 2) for k, v in normalized_allocation.items()}
             
             return {
-                "base_allocation": self.base_allocation,
+                "base_allocation": base_allocation,
+                "allocation_method": self.allocation_method,
                 "adjustments": adjustments,
                 "normalized_allocation": normalized_allocation,
                 "euro_allocation": euro_allocation,
@@ -241,6 +430,7 @@ class InvestmentTracker:
             market_data = self.load_market_data()
             
             # Mettre à jour le portefeuille
+            purchases = {}
             for symbol, amount in allocation['euro_allocation'].items():
                 if symbol not in self.portfolio['assets']:
                     self.portfolio['assets'][symbol] = {
@@ -258,6 +448,7 @@ class InvestmentTracker:
                 # Mettre à jour l'actif
                 self.portfolio['assets'][symbol]['total_invested'] += amount
                 self.portfolio['assets'][symbol]['quantity'] += quantity
+                purchases[symbol] = {"amount": amount, "quantity": quantity}
             
             # Mettre à jour le total investi
             self.portfolio['total_invested'] += self.monthly_investment
@@ -272,26 +463,119 @@ class InvestmentTracker:
             
             self.portfolio['current_value'] = current_value
             
-            # Ajouter à l'historique
-            self.portfolio['history'].append({
-                "date": datetime.now().isoformat(),
+            # Mettre à jour la date de dernière mise à jour
+            self.portfolio['last_update'] = datetime.now().isoformat()
+            
+            # Ajouter l'entrée au journal (instantané périodique)
+            entry = {
+                "date": self.portfolio['last_update'],
                 "investment": self.monthly_investment,
                 "allocation": allocation['normalized_allocation'],
+                "purchases": purchases,
+                "asset_values": {symbol: asset['current_value'] for symbol, asset in self.portfolio['assets'].items()},
                 "total_invested": self.portfolio['total_invested'],
                 "current_value": current_value
-            })
-            
-            # Mettre à jour la date de dernière mise à jour
-            self.portfolio['last_update'] = datetime.now().isoformat()
+            }
+            self.append_journal(entry)
             
-            # Sauvegarder le portefeuille
-            self.save_portfolio()
+            # Indicateurs de risque mis à jour avec la seule nouvelle entrée
+            try:
+                self.risk_state.update_entry(entry)
+                self.risk_state.journal_offset = os.path.getsize(self.journal_file)
+                self.risk_state.save(self.risk_state_file)
+            except Exception as e:
+                logger.error(f"Erreur lors de la mise à jour des indicateurs de risque: {str(e)}")
             
             return self.portfolio
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour du portefeuille: {str(e)}")
             return self.portfolio
     
+    def project_outcomes(self, allocation=None, n_paths=None, horizon_months=None):
+        """
+        Projette la valeur du portefeuille si l'investissement mensuel se poursuit
+        
+        Les rendements sont estimés sur les projection_estimation_days derniers
+        jours: seules les partitions correspondantes sont lues. La projection est
+        mise en cache pour la journée: elle n'est recalculée que si l'allocation,
+        les avoirs ou les paramètres de la simulation changent.
+        
+        Args:
+            allocation (dict, optional): Allocation appliquée à chaque mois. Si None, génère une nouvelle allocation.
+            n_paths (int, optional): Nombre de trajectoires (projection_paths par défaut)
+            horizon_months (int, optional): Nombre de mois simulés (projection_months par défaut)
+            
+        Returns:
+            dict: Percentiles de la valeur finale et probabilité de perte
+        """
+        try:
+            if allocation is None:
+                allocation = self.generate_allocation()
+            horizon_months = horizon_months or self.projection_months
+            n_paths = n_paths or self.projection_paths
+            
+            day = datetime.now().date().isoformat()
+            key = hashlib.sha1(json.dumps({
+                'allocation': allocation['normalized_allocation'],
+                'quantities': {symbol: asset['quantity'] for symbol, asset in self.portfolio['assets'].items()},
+                'total_invested': self.portfolio['total_invested'],
+                'monthly_investment': self.monthly_investment,
+                'horizon_months': horizon_months,
+                'paths': n_paths,
+                'estimation_days': self.projection_estimation_days
+            }, sort_keys=True).encode('utf-8')).hexdigest()
+            cache = self.load_projection_cache()
+            if cache['date'] == day and key in cache['projections']:
+                return cache['projections'][key]
+            
+            start = datetime.now() - timedelta(days=self.projection_estimation_days)
+            prices = load_daily_prices(self.market_store, self.market_data_file, start=start)
+            projection = project_portfolio(
+                self.portfolio, allocation, self.load_market_data(), prices, self.monthly_investment,
+                horizon_months, n_paths
+            )
+            
+            # Les projections des jours précédents sont abandonnées
+            if cache['date'] != day:
+                cache = {'date': day, 'projections': {}}
+            cache['projections'][key] = projection
+            self.save_projection_cache(cache)
+            return projection
+        except Exception as e:
+            logger.error(f"Erreur lors de la projection Monte Carlo: {str(e)}")
+            return {"error": str(e)}
+    
+    def load_projection_cache(self):
+        """
+        Charge les projections Monte Carlo déjà calculées dans la journée
+        
+        Returns:
+            dict: Date du cache et projections par clé d'allocation
+        """
+        try:
+            if os.path.exists(self.projection_cache_file):
+                with open(self.projection_cache_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement du cache de projection: {str(e)}")
+        return {'date': None, 'projections': {}}
+    
+    def save_projection_cache(self, cache):
+        """
+        Sauvegarde le cache des projections Monte Carlo
+        
+        Args:
+            cache (dict): Date du cache et projections par clé d'allocation
+        """
+        try:
+            os.makedirs(os.path.dirname(self.projection_cache_file), exist_ok=True)
+            tmp_file = self.projection_cache_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp_file, self.projection_cache_file)
+        except Exception as e:
+            logger.error(f"Erreur lors de la sauvegarde du cache de projection: {str(e)}")
+    
     def generate_report(self):
         """
         Génère un rapport sur le portefeuille
@@ -321,6 +605,9 @@ class InvestmentTracker:
             if self.portfolio['total_invested'] > 0:
                 total_roi = (self.portfolio['current_value'] - self.portfolio['total_invested']) / self.portfolio['total_invested'] * 100
             
+            # Prochaine allocation, reprise par la projection
+            next_allocation = self.generate_allocation()
+            
             # Générer le rapport
             report = {
                 "date": datetime.now().isoformat(),
@@ -329,7 +616,9 @@ class InvestmentTracker:
                 "total_roi_percent": total_roi,
                 "assets": performance,
                 "monthly_investment": self.monthly_investment,
-                "next_allocation": self.generate_allocation()
+                "risk": self.risk_state.report(),
+                "next_allocation": next_allocation,
+                "projection": self.project_outcomes(next_allocation)
             }
             
             # Sauvegarder le rapport
@@ -353,23 +642,24 @@ class InvestmentTracker:
         """
         Génère un graphique de performance du portefeuille
         """
+        fig = None
         try:
-            if not self.portfolio['history']:
-                logger.warning("Historique vide, impossible de générer le graphique")
-                return
-            
-            # Préparer les données
+            # Préparer les données en parcourant le journal
             dates = []
             invested = []
             values = []
             
-            for entry in self.portfolio['history']:
+            for entry in self.iter_history():
                 dates.append(datetime.fromisoformat(entry['date']))
                 invested.append(entry['total_invested'])
                 values.append(entry['current_value'])
             
+            if not dates:
+                logger.warning("Historique vide, impossible de générer le graphique")
+                return
+            
             # Créer le graphique
-            plt.figure(figsize=(12, 6))
+            fig = plt.figure(figsize=(12, 6))
             
             plt.plot(dates, invested, 'b-', label='Total investi')
             plt.plot(dates, values, 'g-', label='Valeur actuelle')
@@ -386,17 +676,24 @@ class InvestmentTracker:
             # Sauvegarder l'image
             plt.tight_layout()
             plt.savefig(os.path.join(self.data_dir, 'portfolio_performance.png'))
+            plt.close(fig)
+            fig = None
             logger.info("Graphique de performance sauvegardé")
             
             # Créer un graphique en camembert de la répartition actuelle
             self.plot_portfolio_allocation()
         except Exception as e:
             logger.error(f"Erreur lors de la génération du graphique: {str(e)}")
+        finally:
+            # Le worker d'analyse est persistant: chaque figure doit être libérée
+            if fig is not None:
+                plt.close(fig)
     
     def plot_portfolio_allocation(self):
         """
         Génère un graphique en camembert de la répartition du portefeuille
         """
+        fig = None
         try:
             # Préparer les données
             labels = []
@@ -412,7 +709,7 @@ class InvestmentTracker:
                 return
             
             # Créer le graphique
-            plt.figure(figsize=(10, 8))
+            fig = plt.figure(figsize=(10, 8))
             
             plt.pie(values, labels=labels, autopct='%1.1f%%', startangle=90, shadow=True)
             plt.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
@@ -425,16 +722,44 @@ class InvestmentTracker:
             logger.info("Graphique de répartition sauvegardé")
         except Exception as e:
             logger.error(f"Erreur lors de la génération du graphique de répartition: {str(e)}")
+        finally:
+            if fig is not None:
+                plt.close(fig)
 
-def main():
+def parse_args(argv=None):
     """
-    Fonction principale
+    Analyse les arguments de la ligne de commande
+    
+    Args:
+        argv (list, optional): Arguments (sys.argv par défaut)
+        
+    Returns:
+        argparse.Namespace: Arguments
     """
+    parser = argparse.ArgumentParser(description="Suivi de l'investissement programmé")
+    parser.add_argument('--allocation-method', default='static', choices=('static',) + OPTIMIZATION_METHODS,
+                        help="Allocation de base: statique ou optimisée sur la covariance des rendements")
+    parser.add_argument('--max-weight', type=float, default=DEFAULT_MAX_WEIGHT,
+                        help="Poids maximal d'un actif pour une allocation optimisée")
+    return parser.parse_args(argv)
+
+def run(argv=None, stdin=None):
+    """
+    Génère l'allocation du mois, met à jour le portefeuille et le rapport
+    
+    Args:
+        argv (list, optional): Arguments de la ligne de commande
+        stdin (file, optional): Entrée standard (inutilisée)
+        
+    Returns:
+        tuple: (code de sortie, sortie du script)
+    """
+    args = parse_args(argv)
     try:
         logger.info("Démarrage du suivi d'investissement")
         
         # Initialiser le tracker
-        tracker = InvestmentTracker()
+        tracker = InvestmentTracker(allocation_method=args.allocation_method, max_weight=args.max_weight)
         
         # Générer une allocation
         allocation = tracker.generate_allocation()
@@ -454,6 +779,27 @@ def main():
         logger.info("Suivi d'investissement terminé avec succès")
     except Exception as e:
         logger.error(f"Erreur lors du suivi d'investissement: {str(e)}")
+    return 0, ''
+
+def main(argv=None):
+    """
+    Point d'entrée en ligne de commande
+
+    Args:
+        argv (list, optional): Arguments de la ligne de commande
+    """
+    exit_code, output = run(argv, sys.stdin)
+    sys.stdout.write(output)
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
+    # Configuration du logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('/home/crypto_bot/logs/investment.log'),
+            logging.StreamHandler()
+        ]
+    )
     main()
@@ -0,0 +1,203 @@
+import sys
+import os
+import io
+import json
+import time
+import argparse
+import importlib
+import signal
+import logging
+import threading
+import socketserver
+
+from utils.worker_client import SOCKET_PATH, JOB_SCRIPTS, DEDICATED_SOCKETS
+
+logger = logging.getLogger('analysis_worker')
+
+# Pas d'affichage graphique dans un service
+import matplotlib
+matplotlib.use('Agg')
+
+
+def load_job_modules(jobs, preload_model=False):
+    """
+    Importe une fois pour toutes les modules des travaux
+
+    Args:
+        jobs (list): Travaux servis par ce worker
+        preload_model (bool): Charger le modèle Whisper dès le démarrage
+
+    Returns:
+        dict: Module par nom de travail (les travaux indisponibles sont absents)
+    """
+    modules = {}
+    for job in jobs:
+        script = JOB_SCRIPTS[job]
+        module_name = os.path.splitext(script)[0].replace('/', '.')
+        try:
+            modules[job] = importlib.import_module(module_name)
+        except ImportError as e:
+            logger.warning(f"Travail '{job}' indisponible: {str(e)}")
+
+    if preload_model and 'transcription' in modules:
+        modules['transcription'].get_model()
+        logger.info("Modèle Whisper chargé")
+
+    return modules
+
+
+def run_job(module, args, stdin_text=None):
+    """
+    Exécute la fonction run() d'un module comme le ferait la ligne de commande
+
+    Les arguments et l'entrée standard sont passés explicitement, la sortie
+    est renvoyée par run(): sys.argv, sys.stdin et sys.stdout du worker ne
+    sont jamais modifiés.
+
+    Args:
+        module (module): Module du travail
+        args (list): Arguments de la ligne de commande
+        stdin_text (str, optional): Entrée standard du travail
+
+    Returns:
+        dict: Résultat ({'success', 'exit_code', 'output', 'duration'})
+    """
+    output = ''
+    error = None
+    start = time.perf_counter()
+
+    try:
+        exit_code, output = module.run(list(args), io.StringIO(stdin_text or ''))
+    except SystemExit as e:
+        # Arguments invalides (argparse)
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'exécution du travail: {str(e)}")
+        exit_code = 1
+        error = str(e)
+
+    return {
+        'success': exit_code == 0,
+        'exit_code': exit_code,
+        'output': output,
+        'error': error,
+        'duration': time.perf_counter() - start
+    }
+
+
+class JobHandler(socketserver.StreamRequestHandler):
+    """Traite une requête JSON (une ligne) et répond par une ligne JSON"""
+
+    def handle(self):
+        """
+        Lit la requête, exécute le travail et renvoie le résultat
+        """
+        try:
+            request = json.loads(self.rfile.readline())
+            job = request.get('job')
+
+            if job == 'status':
+                result = {
+                    'success': True,
+                    'exit_code': 0,
+                    'jobs': sorted(self.server.modules),
+                    'jobs_run': self.server.jobs_run,
+                    'busy': self.server.job_lock.locked(),
+                    'uptime': time.time() - self.server.started_at
+                }
+            elif job not in self.server.modules:
+                result = {'success': False, 'exit_code': 1, 'output': '', 'error': f"Travail inconnu ou indisponible: {job}"}
+            else:
+                # Les travaux partagent leurs fichiers de données et d'état:
+                # ceux d'un même worker s'exécutent l'un après l'autre
+                with self.server.job_lock:
+                    logger.info(f"Travail '{job}' démarré: {request.get('args', [])}")
+                    result = run_job(self.server.modules[job], request.get('args', []), request.get('stdin'))
+                    self.server.jobs_run += 1
+                logger.info(f"Travail '{job}' terminé en {result['duration']:.2f}s (code {result['exit_code']})")
+        except Exception as e:
+            logger.error(f"Erreur lors du traitement de la requête: {str(e)}")
+            result = {'success': False, 'exit_code': 1, 'output': '', 'error': str(e)}
+
+        try:
+            self.wfile.write((json.dumps(result) + '\n').encode('utf-8'))
+        except OSError as e:
+            # Client parti (délai dépassé): le travail n'est pas relancé
+            logger.warning(f"Résultat non transmis, client déconnecté: {str(e)}")
+
+
+class AnalysisWorker(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Service d'analyse persistant
+
+    Les modules (pandas, matplotlib, analyses) et le modèle Whisper restent
+    chargés entre deux travaux. Chaque connexion a son thread (l'état reste
+    consultable pendant un travail), mais les travaux sont exécutés un par un:
+    ils partagent leurs fichiers de données. Les travaux longs
+    (transcription) sont servis par un worker distinct (DEDICATED_SOCKETS).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path=SOCKET_PATH, jobs=None, preload_model=False):
+        """
+        Initialise le service et charge les modules
+
+        Args:
+            socket_path (str): Chemin du socket Unix
+            jobs (list, optional): Travaux servis (par défaut ceux sans worker dédié)
+            preload_model (bool): Charger le modèle Whisper dès le démarrage
+        """
+        if jobs is None:
+            jobs = [job for job in JOB_SCRIPTS if job not in DEDICATED_SOCKETS]
+        self.modules = load_job_modules(jobs, preload_model)
+        self.job_lock = threading.Lock()
+        self.jobs_run = 0
+        self.started_at = time.time()
+
+        os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, JobHandler)
+        os.chmod(socket_path, 0o660)
+
+
+def main():
+    """
+    Fonction principale: démarre le worker d'analyse
+    """
+    parser = argparse.ArgumentParser(description="Worker d'analyse persistant")
+    parser.add_argument('--socket', default=SOCKET_PATH, help="Chemin du socket Unix")
+    parser.add_argument('--jobs', nargs='+', choices=sorted(JOB_SCRIPTS),
+                        help="Travaux servis (par défaut tous sauf ceux qui ont un worker dédié)")
+    parser.add_argument('--preload-whisper', action='store_true',
+                        help="Charger le modèle Whisper dès le démarrage")
+    args = parser.parse_args()
+
+    # Configuration du logging, avant l'import des modules de travail dont
+    # les logs sont regroupés dans le journal du worker
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('/home/crypto_bot/logs/analysis_worker.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+    worker = AnalysisWorker(args.socket, args.jobs, args.preload_whisper)
+    # Arrêt propre par systemd (suppression du socket)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    logger.info(f"Worker d'analyse prêt sur {args.socket}: {', '.join(sorted(worker.modules))}")
+    try:
+        worker.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        logger.info("Arrêt du worker d'analyse")
+    finally:
+        worker.server_close()
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+
+class FileCache:
+    """
+    Cache des fichiers analysés, invalidé par la date de modification et la taille
+
+    Un fichier n'est relu que s'il a changé depuis la dernière lecture: les
+    lectures répétées au cours d'une exécution, ou d'une exécution à l'autre
+    dans un processus persistant, ne coûtent qu'un appel à os.stat().
+    Les valeurs retournées sont partagées et ne doivent pas être modifiées.
+    """
+
+    def __init__(self, max_entries=None, ttl=None):
+        """
+        Initialise un cache vide
+
+        Args:
+            max_entries (int, optional): Nombre maximal de fichiers conservés (les moins récemment lus sont évincés)
+            ttl (float, optional): Durée (s) pendant laquelle une entrée est servie sans vérifier le fichier
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, parse=json.load):
+        """
+        Retourne le contenu analysé d'un fichier, relu uniquement s'il a changé
+
+        Args:
+            path (str): Chemin du fichier
+            parse (callable): Fonction d'analyse appliquée au fichier ouvert (json.load par défaut)
+
+        Returns:
+            object: Résultat de parse
+
+        Raises:
+            FileNotFoundError: Si le fichier n'existe pas
+        """
+        key = (os.path.abspath(path), parse)
+        now = time.monotonic()
+
+        # Entrée récente: servie sans même interroger le système de fichiers
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and now - entry[2] < self.ttl:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries[key] = (signature, entry[1], now)
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        with open(path, 'r') as f:
+            value = parse(f)
+
+        with self._lock:
+            self._entries[key] = (signature, value, now)
+            self._entries.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, path=None):
+        """
+        Oublie un fichier (ou tout le cache)
+
+        Args:
+            path (str, optional): Chemin du fichier (tous les fichiers par défaut)
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                path = os.path.abspath(path)
+                for key in [key for key in self._entries if key[0] == path]:
+                    del self._entries[key]
+
+
+# Cache partagé par tous les consommateurs d'un même processus
+file_cache = FileCache()
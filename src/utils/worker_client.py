@@ -0,0 +1,163 @@
+import sys
+import os
+import json
+import socket
+import subprocess
+
+# Socket Unix du worker d'analyse
+SOCKET_PATH = '/home/crypto_bot/run/analysis_worker.sock'
+
+# Travaux servis par leur propre worker: une transcription (plusieurs minutes)
+# ne bloque pas les analyses des workflows toutes les 30 minutes
+DEDICATED_SOCKETS = {
+    'transcription': '/home/crypto_bot/run/transcription_worker.sock'
+}
+
+# Durée maximale d'attente du résultat (s): au-delà, le client abandonne
+# (le travail se poursuit dans le worker, il n'est jamais relancé)
+DEFAULT_JOB_TIMEOUT = 600
+JOB_TIMEOUTS = {
+    'transcription': 3600
+}
+
+# Répertoire des scripts (src/ dans le dépôt, /home/crypto_bot/scripts une fois installé)
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Travaux acceptés par le worker et script exécuté par chacun
+JOB_SCRIPTS = {
+    'correlation': 'analysis/script_analyse_correlation_crypto.py',
+    'indicators': 'analysis/technical_indicators.py',
+    'market_store': 'data_collection/market_store.py',
+    'allocation': 'trading/suivi_investissement_crypto.py',
+    'transcription': 'data_collection/youtube_transcriber.py'
+}
+
+# Travaux qui lisent leurs données sur l'entrée standard
+STDIN_JOBS = {'indicators'}
+
+
+class WorkerUnavailableError(ConnectionError):
+    """Le worker n'écoute pas (socket absent ou connexion refusée): aucun travail n'a été transmis"""
+
+
+def job_socket_path(job):
+    """
+    Retourne le socket du worker qui exécute un travail
+
+    Les variables d'environnement CRYPTO_BOT_WORKER_SOCKET et
+    CRYPTO_BOT_<TRAVAIL>_SOCKET remplacent les chemins par défaut.
+
+    Args:
+        job (str): Nom du travail
+
+    Returns:
+        str: Chemin du socket Unix
+    """
+    if job in DEDICATED_SOCKETS:
+        return os.environ.get(f'CRYPTO_BOT_{job.upper()}_SOCKET', DEDICATED_SOCKETS[job])
+    return os.environ.get('CRYPTO_BOT_WORKER_SOCKET', SOCKET_PATH)
+
+
+def send_job(job, args, stdin_text=None, socket_path=SOCKET_PATH, timeout=None):
+    """
+    Soumet un travail au worker et attend son résultat
+
+    Args:
+        job (str): Nom du travail (clé de JOB_SCRIPTS)
+        args (list): Arguments de la ligne de commande du script
+        stdin_text (str, optional): Entrée standard transmise au script
+        socket_path (str): Chemin du socket du worker
+        timeout (float, optional): Attente maximale (s), JOB_TIMEOUTS par défaut
+
+    Returns:
+        dict: Résultat ({'success', 'exit_code', 'output', 'duration'})
+
+    Raises:
+        WorkerUnavailableError: Si la connexion au worker échoue (travail non transmis)
+        socket.timeout: Si le résultat n'arrive pas à temps
+        OSError: Si la connexion est perdue pendant le travail
+    """
+    request = json.dumps({'job': job, 'args': args, 'stdin': stdin_text}) + '\n'
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout or JOB_TIMEOUTS.get(job, DEFAULT_JOB_TIMEOUT))
+        try:
+            sock.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise WorkerUnavailableError(str(e)) from e
+        sock.sendall(request.encode('utf-8'))
+        with sock.makefile('r', encoding='utf-8') as f:
+            response = f.readline()
+    if not response:
+        raise ConnectionError("Le worker a fermé la connexion sans réponse")
+    return json.loads(response)
+
+
+def run_direct(job, args, stdin_text=None):
+    """
+    Exécute le script d'un travail dans un nouveau processus (repli sans worker)
+
+    Args:
+        job (str): Nom du travail
+        args (list): Arguments de la ligne de commande
+        stdin_text (str, optional): Entrée standard transmise au script
+
+    Returns:
+        int: Code de retour du script
+    """
+    script = os.path.join(SCRIPTS_DIR, JOB_SCRIPTS[job])
+    # Les scripts importent leurs modules depuis le répertoire des scripts
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SCRIPTS_DIR, os.environ.get('PYTHONPATH')])))
+    return subprocess.run([sys.executable, script] + args, input=stdin_text, text=True, env=env).returncode
+
+
+def main():
+    """
+    Fonction principale: remplace `python3 <script> [args]` par `worker_client.py <travail> [args]`
+    """
+    if len(sys.argv) < 2 or (sys.argv[1] not in JOB_SCRIPTS and sys.argv[1] != 'status'):
+        print(f"Usage: python worker_client.py <{'|'.join(JOB_SCRIPTS)}|status> [arguments]")
+        sys.exit(1)
+
+    job = sys.argv[1]
+    args = sys.argv[2:]
+
+    if job == 'status':
+        # État de chaque worker (principal et dédiés)
+        statuses = {}
+        for name in ['analysis'] + sorted(DEDICATED_SOCKETS):
+            try:
+                statuses[name] = send_job(job, [], socket_path=job_socket_path(name), timeout=5)
+            except OSError as e:
+                statuses[name] = {'success': False, 'error': f"Worker indisponible: {str(e)}"}
+        print(json.dumps(statuses, indent=2))
+        sys.exit(0 if all(status.get('success') for status in statuses.values()) else 1)
+
+    # L'entrée standard n'est lue que pour les travaux qui l'attendent
+    stdin_text = None
+    if job in STDIN_JOBS and (not args or '-' in args):
+        stdin_text = sys.stdin.read()
+
+    # Exécution directe uniquement si le worker n'a pas reçu le travail: une fois
+    # transmis, il peut toujours être en cours et aucun travail ne supporte
+    # d'être exécuté deux fois (achat mensuel, réécriture des fichiers d'état)
+    try:
+        result = send_job(job, args, stdin_text, job_socket_path(job))
+    except WorkerUnavailableError as e:
+        print(f"Worker indisponible ({str(e)}), exécution directe", file=sys.stderr)
+        sys.exit(run_direct(job, args, stdin_text))
+    except socket.timeout:
+        print(f"Pas de réponse du worker après {JOB_TIMEOUTS.get(job, DEFAULT_JOB_TIMEOUT)}s, "
+              f"le travail '{job}' peut être encore en cours dans le worker", file=sys.stderr)
+        sys.exit(1)
+    except OSError as e:
+        print(f"Connexion au worker perdue pendant le travail '{job}' ({str(e)})", file=sys.stderr)
+        sys.exit(1)
+
+    sys.stdout.write(result.get('output', ''))
+    if result.get('error'):
+        print(result['error'], file=sys.stderr)
+    sys.exit(result.get('exit_code', 1))
+
+
+if __name__ == "__main__":
+    main()
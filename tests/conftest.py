@@ -0,0 +1,18 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Les modules importent leurs voisins depuis src/ (ex. data_collection.market_store)
+# et le dashboard depuis flask_app/
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT_DIR, 'src'), os.path.join(ROOT_DIR, 'flask_app')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture
+def rng():
+    """Générateur aléatoire à graine fixe"""
+    return np.random.default_rng(42)
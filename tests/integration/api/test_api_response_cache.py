@@ -0,0 +1,93 @@
+import gzip
+import json
+
+import pytest
+
+dashboard = pytest.importorskip('app')
+
+
+@pytest.fixture
+def payloads(monkeypatch):
+    """Réponses successives de /api/market-data, avec un horodatage différent à chaque calcul"""
+    calls = []
+    content = {'BTC': {'price': 50000.0, 'history': list(range(300))}}
+
+    def get_market_data(symbols=None):
+        calls.append(symbols)
+        return {'data': dict(content), 'timestamp': f'2024-01-01T00:00:{len(calls):02d}'}
+
+    monkeypatch.setattr(dashboard.dashboard_manager, 'get_market_data', get_market_data)
+    monkeypatch.setattr(dashboard, 'api_cache', dashboard.ApiResponseCache(ttl=60))
+    monkeypatch.setattr(dashboard.cache_refresher, 'version', 0)
+    return calls, content
+
+
+@pytest.fixture
+def client():
+    """Client de test du dashboard"""
+    dashboard.app.config['TESTING'] = True
+    with dashboard.app.test_client() as client:
+        yield client
+
+
+def test_etag_and_not_modified(client, payloads):
+    calls, _ = payloads
+    first = client.get('/api/market-data')
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'no-cache'
+    etag = first.headers['ETag']
+
+    second = client.get('/api/market-data', headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['ETag'] == etag
+    # Réponse servie depuis le cache: la vue n'est calculée qu'une fois
+    assert len(calls) == 1
+
+
+def test_gzip_body_matches_identity(client, payloads):
+    identity = client.get('/api/market-data', headers={'Accept-Encoding': 'identity'})
+    compressed = client.get('/api/market-data', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in identity.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(compressed.data) == identity.data
+    assert json.loads(identity.data)['timestamp'] == '2024-01-01T00:00:01'
+
+    # Corps différents octet par octet: ETag faible, partagé par les encodages
+    etag = identity.headers['ETag']
+    assert etag.startswith('W/"') and compressed.headers['ETag'] == etag
+    revalidated = client.get('/api/market-data', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert revalidated.status_code == 304
+
+
+def test_etag_ignores_timestamp_and_follows_content(client, payloads):
+    calls, content = payloads
+    dashboard.api_cache.ttl = 0
+    etag = client.get('/api/market-data').headers['ETag']
+
+    # Recalculée à l'identique (horodatage seul modifié): même ETag, encore 304
+    again = client.get('/api/market-data', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert len(calls) == 2
+
+    content['ETH'] = {'price': 3000.0}
+    changed = client.get('/api/market-data', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_new_data_version_invalidates_entry(client, payloads, monkeypatch):
+    calls, _ = payloads
+    client.get('/api/market-data')
+    client.get('/api/market-data')
+    assert len(calls) == 1
+
+    monkeypatch.setattr(dashboard.cache_refresher, 'version', 1)
+    client.get('/api/market-data')
+    assert len(calls) == 2
+
+    # Chaque URL a sa propre entrée
+    client.get('/api/market-data?symbols=BTC')
+    assert calls[-1] == ['BTC']
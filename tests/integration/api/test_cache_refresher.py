@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+dashboard = pytest.importorskip('app')
+fakeredis = pytest.importorskip('fakeredis')
+
+from data_collection.market_store import MarketStore
+from utils.file_cache import FileCache
+
+ALL_SOURCES = ['market_data', 'sentiment_data', 'portfolio_recommendations']
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    """Fichiers sources temporaires, Redis simulé et cache des fichiers avec TTL comme en production"""
+    paths = {
+        'market': tmp_path / 'market_data.json',
+        'sentiment': tmp_path / 'emotional_data.json',
+        'reports': tmp_path / 'market_reports.json'
+    }
+    paths['market'].write_text(json.dumps([{'symbol': 'BTC', 'timestamp': '2024-01-01T00:00:00Z', 'price': 1.0}]))
+    paths['sentiment'].write_text(json.dumps([]))
+    paths['reports'].write_text(json.dumps([{'date': '2024-01-01'}]))
+    monkeypatch.setattr(dashboard, 'MARKET_DATA_FILE', str(paths['market']))
+    monkeypatch.setattr(dashboard, 'SENTIMENT_DATA_FILE', str(paths['sentiment']))
+    monkeypatch.setattr(dashboard, 'MARKET_REPORTS_FILE', str(paths['reports']))
+    monkeypatch.setattr(dashboard, 'market_store', MarketStore(str(tmp_path / 'market_store')))
+    monkeypatch.setattr(dashboard, 'dashboard_cache', FileCache(max_entries=64, ttl=5))
+    monkeypatch.setattr(dashboard, 'redis_client', fakeredis.FakeRedis(decode_responses=True))
+    return paths
+
+
+def test_only_changed_sources_are_republished(sources):
+    refresher = dashboard.RedisCacheRefresher()
+    assert refresher.refresh() == ALL_SOURCES
+    assert refresher.refresh() == []
+    version = refresher.version
+
+    # Nouveau rapport: relu malgré le TTL du cache des fichiers
+    sources['reports'].write_text(json.dumps([{'date': '2024-01-02'}, {'date': '2024-01-01'}]))
+    assert refresher.refresh() == ['portfolio_recommendations']
+    assert json.loads(dashboard.redis_client.get('portfolio_recommendations'))['date'] == '2024-01-02'
+    assert refresher.version == version + 1
+
+    assert refresher.refresh(force=True) == ALL_SOURCES
+    metrics = refresher.get_metrics()['sources']
+    assert metrics['portfolio_recommendations']['refresh_count'] == 3
+    assert metrics['market_data']['refresh_count'] == 2
+    assert metrics['market_data']['keys'] == 1 and metrics['market_data']['error'] is None
+
+
+def test_unchanged_sources_are_republished_before_expiry(sources):
+    refresher = dashboard.RedisCacheRefresher(republish_interval=0)
+    refresher.refresh()
+    dashboard.redis_client.delete('market_data:BTC')
+    assert refresher.refresh() == ALL_SOURCES
+    assert dashboard.redis_client.exists('market_data:BTC')
+
+
+def test_a_failing_source_does_not_block_the_others(sources):
+    sources['reports'].unlink()
+    refresher = dashboard.RedisCacheRefresher()
+    assert refresher.refresh() == ['market_data', 'sentiment_data']
+    metrics = refresher.get_metrics()['sources']
+    assert metrics['portfolio_recommendations']['error'] and metrics['portfolio_recommendations']['refresh_count'] == 0
+
+    sources['reports'].write_text(json.dumps([{'date': '2024-01-03'}]))
+    assert refresher.refresh() == ['portfolio_recommendations']
+    assert refresher.get_metrics()['sources']['portfolio_recommendations']['error'] is None
@@ -0,0 +1,106 @@
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+dashboard = pytest.importorskip('app')
+
+from data_collection.market_store import MarketStore
+from utils.file_cache import FileCache
+
+
+class StubRedis:
+    """Redis réduit aux lectures du dashboard, qui enregistre ses allers-retours"""
+
+    def __init__(self, values=None):
+        self.values = values or {}
+        self.calls = []
+
+    def mget(self, keys):
+        self.calls.append(('mget', list(keys)))
+        return [self.values.get(key) for key in keys]
+
+    def get(self, key):
+        self.calls.append(('get', key))
+        return self.values.get(key)
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    """Fichiers de repli temporaires, cache des fichiers vide et stockage de marché vide"""
+    paths = {
+        'market': tmp_path / 'market_data.json',
+        'sentiment': tmp_path / 'emotional_data.json',
+        'reports': tmp_path / 'market_reports.json'
+    }
+    monkeypatch.setattr(dashboard, 'MARKET_DATA_FILE', str(paths['market']))
+    monkeypatch.setattr(dashboard, 'SENTIMENT_DATA_FILE', str(paths['sentiment']))
+    monkeypatch.setattr(dashboard, 'MARKET_REPORTS_FILE', str(paths['reports']))
+    monkeypatch.setattr(dashboard, 'dashboard_cache', FileCache(max_entries=64, ttl=5))
+    monkeypatch.setattr(dashboard, 'market_store', MarketStore(str(tmp_path / 'market_store')))
+    return paths
+
+
+def test_market_fallback_reads_the_file_once_for_all_missing_symbols(files, monkeypatch):
+    ticks = [
+        {'symbol': symbol, 'timestamp': f'2024-01-01T{hour:02d}:00:00.000Z', 'price': price * hour}
+        for symbol, price in (('ETH', 2000.0), ('SOL', 100.0)) for hour in (3, 9, 5)
+    ]
+    files['market'].write_text(json.dumps(ticks))
+    parses = []
+
+    def index_market_records(f):
+        parses.append(1)
+        return original(f)
+
+    original = dashboard.index_market_records
+    monkeypatch.setattr(dashboard, 'index_market_records', index_market_records)
+    stub = StubRedis({'market_data:BTC': json.dumps({'symbol': 'BTC', 'price': 50000.0})})
+    monkeypatch.setattr(dashboard, 'redis_client', stub)
+
+    for _ in range(2):
+        data = dashboard.dashboard_manager.get_market_data(['BTC', 'ETH', 'SOL', 'DOGE'])['data']
+        assert data['BTC']['price'] == 50000.0
+        assert (data['ETH']['price'], data['SOL']['price']) == (18000.0, 900.0)
+        assert 'DOGE' not in data
+    # Un aller-retour Redis par requête, une seule analyse du fichier
+    assert [call[0] for call in stub.calls] == ['mget', 'mget']
+    assert len(parses) == 1
+
+
+def test_sentiment_windows_match_brute_force(files):
+    now = datetime.now()
+    entries = [
+        {
+            'timestamp': (now - timedelta(minutes=7 * k + 1)).isoformat(),
+            'sentiment': ('positive', 'neutral', 'negative')[k % 3 if k % 5 else 0],
+            'related_crypto': ['BTC'] if k % 2 else ['ETH', 'SOL']
+        }
+        for k in range(400)
+    ]
+    random.Random(1).shuffle(entries)
+    files['sentiment'].write_text(json.dumps(entries))
+
+    for hours_back in (1, 6, 24, 72):
+        for symbol in (None, 'BTC', 'SOL'):
+            cutoff = (now - timedelta(hours=hours_back)).isoformat()
+            window = [item for item in entries if item['timestamp'] > cutoff
+                      and (symbol is None or symbol in item['related_crypto'])]
+            counts, total = dashboard.dashboard_manager.count_sentiments_file(hours_back, symbol)
+            assert total == len(window)
+            assert counts == {name: sum(item['sentiment'] == name for item in window)
+                              for name in ('positive', 'neutral', 'negative')}
+
+
+def test_recommendations_fall_back_to_the_latest_report(files, monkeypatch):
+    monkeypatch.setattr(dashboard, 'redis_client', StubRedis())
+    reports = [
+        {'date': '2024-01-02', 'market_summary': {'trend': 'up'}, 'crypto_data': {'BTC': {}}, 'market_trends': {}},
+        {'date': '2024-01-01', 'market_summary': {'trend': 'down'}, 'crypto_data': {}, 'market_trends': {}}
+    ]
+    files['reports'].write_text(json.dumps(reports))
+
+    result = dashboard.dashboard_manager.get_portfolio_recommendations()
+    assert result['report_date'] == '2024-01-02'
+    assert result['market_summary'] == {'trend': 'up'} and result['recommendations'] == {'BTC': {}}
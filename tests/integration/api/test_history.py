@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+dashboard = pytest.importorskip('app')
+
+from data_collection.bar_store import DAY_MS, aggregate_bars
+
+# 2024-01-02T00:00:00Z (jour epoch pair)
+START_MS = 1704153600000
+
+
+@pytest.fixture
+def daily_bars(rng, monkeypatch):
+    """Dix jours de barres journalières servies à la place du stockage"""
+    times = START_MS + np.arange(10 * 24) * 60 * 60 * 1000
+    prices = 100 + np.cumsum(rng.normal(0, 1, len(times)))
+    bars = aggregate_bars(times, prices, np.full(len(times), 1e6), DAY_MS)
+
+    def load_history_bars(symbol, resolution, start_ms, end_ms):
+        assert resolution == '1d'
+        return bars
+
+    monkeypatch.setattr(dashboard, 'load_history_bars', load_history_bars)
+    return prices
+
+
+def test_long_ranges_are_merged_into_wider_bars(daily_bars):
+    prices = daily_bars
+    result = dashboard.dashboard_manager.get_history('btc', START_MS, START_MS + 10 * DAY_MS - 1, '1d', points=5)
+
+    assert result['resolution'] == '2d'
+    bars = result['bars']
+    assert bars['t'] == [START_MS + k * 2 * DAY_MS for k in range(5)]
+    # Plus haut et plus bas de toute la période, y compris entre deux barres journalières
+    assert max(bars['high']) == prices.max() and min(bars['low']) == prices.min()
+    assert bars['open'][0] == prices[0] and bars['close'][-1] == prices[-1]
+    assert bars['volume'] == [2e6] * 5 and sum(bars['ticks']) == len(prices)
+
+    result = dashboard.dashboard_manager.get_history('btc', START_MS, START_MS + 10 * DAY_MS - 1, '1d', points=4)
+    assert result['resolution'] == '3d' and len(result['bars']['t']) <= 4
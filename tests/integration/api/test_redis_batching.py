@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+dashboard = pytest.importorskip('app')
+fakeredis = pytest.importorskip('fakeredis')
+
+from data_collection.market_store import MarketStore
+from utils.file_cache import FileCache
+
+
+class CountingRedis(fakeredis.FakeRedis):
+    """Redis simulé qui enregistre les lectures et les exécutions de pipeline"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = []
+
+    def get(self, *args, **kwargs):
+        self.calls.append('get')
+        return super().get(*args, **kwargs)
+
+    def mget(self, *args, **kwargs):
+        self.calls.append('mget')
+        return super().mget(*args, **kwargs)
+
+    def pipeline(self, *args, **kwargs):
+        pipe = super().pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        def counted_execute(*execute_args, **execute_kwargs):
+            self.calls.append(('execute', [command[0][0] for command in pipe.command_stack]))
+            return execute(*execute_args, **execute_kwargs)
+
+        pipe.execute = counted_execute
+        return pipe
+
+
+@pytest.fixture
+def redis_client(tmp_path, monkeypatch):
+    """Redis simulé, market_data.json temporaire et stockage de marché vide"""
+    client = CountingRedis(decode_responses=True)
+    monkeypatch.setattr(dashboard, 'redis_client', client)
+    monkeypatch.setattr(dashboard, 'dashboard_cache', FileCache())
+    monkeypatch.setattr(dashboard, 'market_store', MarketStore(str(tmp_path / 'market_store')))
+    monkeypatch.setattr(dashboard, 'MARKET_DATA_FILE', str(tmp_path / 'market_data.json'))
+    return client
+
+
+def test_trading_summary_is_read_with_one_mget(redis_client):
+    redis_client.set('daily_report', json.dumps({'pnl': 12.5}))
+    redis_client.set('open_positions', json.dumps([{'symbol': 'BTC'}]))
+
+    summary = dashboard.dashboard_manager.get_trading_summary()
+    assert summary['report'] == {'pnl': 12.5} and summary['positions'] == [{'symbol': 'BTC'}]
+    assert summary['scan'] == {} and summary['signals'] == []
+    assert redis_client.calls == ['mget']
+
+
+def test_market_data_is_read_with_one_mget(redis_client, tmp_path):
+    for symbol in ('BTC', 'ETH', 'SOL'):
+        redis_client.set(f'market_data:{symbol}', json.dumps({'symbol': symbol, 'price': 1.0}))
+    (tmp_path / 'market_data.json').write_text(json.dumps([
+        {'symbol': 'ADA', 'timestamp': '2024-01-01T00:00:00.000Z', 'price': 0.5}
+    ]))
+
+    data = dashboard.dashboard_manager.get_market_data()['data']
+    assert sorted(data) == ['ADA', 'BTC', 'ETH', 'SOL']
+    assert redis_client.calls == ['mget']
+
+
+def test_refresh_sends_every_setex_in_one_pipeline(redis_client, tmp_path):
+    symbols = [f'S{k}' for k in range(50)]
+    (tmp_path / 'market_data.json').write_text(json.dumps([
+        {'symbol': symbol, 'timestamp': '2024-01-01T00:00:00.000Z', 'price': float(k)}
+        for k, symbol in enumerate(symbols)
+    ]))
+    refresher = dashboard.RedisCacheRefresher()
+    refresher.sources = [source for source in refresher.sources if source[0] == 'market_data']
+
+    assert refresher.refresh() == ['market_data']
+    executes = [call for call in redis_client.calls if call != 'mget']
+    assert len(executes) == 1
+    assert executes[0][1].count('SETEX') == len(symbols)
+    assert json.loads(redis_client.get('market_data:S7'))['price'] == 7.0
+    assert 3500 < redis_client.ttl('market_data:S7') <= 3600
@@ -0,0 +1,89 @@
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+dashboard = pytest.importorskip('app')
+fakeredis = pytest.importorskip('fakeredis')
+
+from utils.file_cache import FileCache
+
+
+@pytest.fixture
+def sentiment_file(tmp_path, monkeypatch):
+    """emotional_data.json temporaire, indexé dans un Redis simulé par le seul flux des sentiments"""
+    path = tmp_path / 'emotional_data.json'
+    monkeypatch.setattr(dashboard, 'SENTIMENT_DATA_FILE', str(path))
+    monkeypatch.setattr(dashboard, 'dashboard_cache', FileCache())
+    monkeypatch.setattr(dashboard, 'redis_client', fakeredis.FakeRedis(decode_responses=True))
+
+    refresher = dashboard.RedisCacheRefresher()
+    refresher.sources = [source for source in refresher.sources if source[0] == 'sentiment_data']
+    entries = []
+
+    def publish(new_entries):
+        # Comme le workflow n8n: nouvelles entrées en tête du fichier
+        entries[:0] = new_entries
+        path.write_text(json.dumps(entries))
+        refresher.refresh()
+
+    return refresher, publish
+
+
+def entry(hours_ago, sentiment, symbols=('BTC',)):
+    """Entrée sentimentale horodatée il y a hours_ago heures"""
+    timestamp = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+    return {'timestamp': timestamp.isoformat(), 'sentiment': sentiment, 'related_crypto': list(symbols)}
+
+
+def test_late_entries_reach_the_hourly_counters(sentiment_file):
+    refresher, publish = sentiment_file
+    publish([entry(1, 'positive'), entry(2, 'negative', ('ETH',))])
+
+    # Entrée arrivée après coup, plus ancienne que les entrées déjà indexées
+    publish([entry(5, 'neutral')])
+    counts, total = dashboard.dashboard_manager.count_sentiments_redis(24)
+    assert total == 3
+    assert counts == {'positive': 1, 'neutral': 1, 'negative': 1}
+    assert dashboard.dashboard_manager.count_sentiments_redis(24, 'BTC') == (
+        {'positive': 1, 'neutral': 1, 'negative': 0}, 2
+    )
+
+    # Une republication complète ne compte pas deux fois les mêmes entrées
+    refresher.refresh(force=True)
+    assert dashboard.dashboard_manager.count_sentiments_redis(24)[1] == 3
+
+
+def test_window_counts_match_the_entries_including_the_partial_first_hour(sentiment_file, rng, monkeypatch):
+    refresher, publish = sentiment_file
+    assert dashboard.dashboard_manager.count_sentiments_redis(24) is None
+
+    # Heure figée à la demi-heure: chaque fenêtre commence au milieu d'une heure
+    now = (time.time() // 3600) * 3600 + 1800
+    monkeypatch.setattr(dashboard.time, 'time', lambda: now)
+    windows = (1, 3, 24, 30)
+    minutes_ago = rng.uniform(0, 48 * 60, 400)
+    entries = [
+        {
+            'timestamp': datetime.fromtimestamp(now - 60 * m, timezone.utc).isoformat(),
+            'sentiment': str(rng.choice(['positive', 'neutral', 'negative'])),
+            'related_crypto': ['BTC'] if k % 3 else ['ETH', 'BTC']
+        }
+        for k, m in enumerate(minutes_ago)
+    ]
+    publish(entries[:150])
+    publish(entries[150:])
+
+    for hours_back in windows:
+        window = minutes_ago < 60 * hours_back
+        # Entrées de l'heure entamée au début de la fenêtre, lues dans l'index des événements
+        assert np.any(window & (minutes_ago > 60 * hours_back - 30))
+        for symbol in (None, 'ETH'):
+            expected = [item for item, inside in zip(entries, window)
+                        if inside and (symbol is None or symbol in item['related_crypto'])]
+            counts, total = dashboard.dashboard_manager.count_sentiments_redis(hours_back, symbol)
+            assert total == len(expected)
+            assert counts == {name: sum(item['sentiment'] == name for item in expected)
+                              for name in ('positive', 'neutral', 'negative')}
@@ -0,0 +1,98 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+dashboard = pytest.importorskip('app')
+
+from data_collection.market_store import MarketStore
+from utils.file_cache import FileCache
+
+
+@pytest.fixture
+def broadcaster(monkeypatch):
+    """Diffuseur sans écoute Redis (les messages sont injectés par broadcast)"""
+    broadcaster = dashboard.UpdateBroadcaster(max_queue=3)
+    broadcaster.thread = object()
+    monkeypatch.setattr(dashboard, 'update_broadcaster', broadcaster)
+    return broadcaster
+
+
+@pytest.fixture
+def refresher(tmp_path, monkeypatch):
+    """Refresher sur des fichiers temporaires, abonné au canal des mises à jour d'un Redis simulé"""
+    fakeredis = pytest.importorskip('fakeredis')
+    client = fakeredis.FakeRedis(decode_responses=True)
+    paths = {'market': tmp_path / 'market_data.json', 'sentiment': tmp_path / 'emotional_data.json'}
+    monkeypatch.setattr(dashboard, 'redis_client', client)
+    monkeypatch.setattr(dashboard, 'MARKET_DATA_FILE', str(paths['market']))
+    monkeypatch.setattr(dashboard, 'SENTIMENT_DATA_FILE', str(paths['sentiment']))
+    monkeypatch.setattr(dashboard, 'market_store', MarketStore(str(tmp_path / 'market_store')))
+    monkeypatch.setattr(dashboard, 'dashboard_cache', FileCache())
+
+    refresher = dashboard.RedisCacheRefresher()
+    refresher.sources = [source for source in refresher.sources if source[0] != 'portfolio_recommendations']
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(dashboard.UPDATES_CHANNEL)
+    # Confirmation d'abonnement (lue comme None)
+    pubsub.get_message()
+
+    def cycle(prices, sentiments):
+        """Écrit les fichiers, rafraîchit et retourne les messages publiés"""
+        paths['market'].write_text(json.dumps([
+            {'symbol': symbol, 'timestamp': '2024-01-01T00:00:00Z', 'price': price} for symbol, price in prices.items()
+        ]))
+        paths['sentiment'].write_text(json.dumps(sentiments))
+        refresher.refresh()
+        messages = []
+        while (message := pubsub.get_message()) is not None:
+            messages.append(json.loads(message['data']))
+        return messages
+
+    return client, cycle
+
+
+def sentiment(k):
+    """Entrée sentimentale récente"""
+    return {'timestamp': datetime.now(timezone.utc).isoformat(), 'sentiment': 'positive', 'id': k,
+            'related_crypto': ['BTC']}
+
+
+def test_only_changes_are_published(refresher):
+    client, cycle = refresher
+    entries = [sentiment(2), sentiment(1)]
+    first = cycle({'BTC': 1.0, 'ETH': 2.0}, entries[1:])
+    assert {message['source'] for message in first} == {'market_data', 'sentiment_data'}
+
+    # Seul ETH change, une entrée sentimentale de plus, résumé de trading écrit par un workflow
+    client.set('daily_report', json.dumps({'pnl': 1}))
+    messages = {message['source']: message for message in cycle({'BTC': 1.0, 'ETH': 2.5}, entries)}
+    assert list(messages['market_data']['changes']) == ['market_data:ETH']
+    assert messages['market_data']['changes']['market_data:ETH']['price'] == 2.5
+    assert [item['id'] for item in messages['sentiment_data']['items']] == [2]
+    assert messages['trading_summary']['changes'] == {'daily_report': {'pnl': 1}}
+
+    # Fichiers réécrits à l'identique: relus, mais rien à diffuser
+    assert cycle({'BTC': 1.0, 'ETH': 2.5}, entries) == []
+
+
+def test_stream_filters_sources_and_drops_slow_clients(broadcaster):
+    dashboard.app.config['TESTING'] = True
+    with dashboard.app.test_client() as client:
+        response = client.get('/api/stream?sources=market_data', buffered=False)
+        assert response.mimetype == 'text/event-stream'
+        frames = iter(response.response)
+        assert next(frames) == b'retry: 5000\n\n'
+
+        broadcaster.broadcast(json.dumps({'source': 'sentiment_data', 'items': []}))
+        broadcaster.broadcast(json.dumps({'source': 'market_data', 'changes': {'market_data:BTC': {'price': 1}}}))
+        frame = next(frames).decode()
+        assert frame.startswith('event: market_data\ndata: ')
+        assert json.loads(frame.split('data: ', 1)[1])['changes']['market_data:BTC'] == {'price': 1}
+
+        # File pleine: le client est déconnecté et le flux se termine
+        for _ in range(broadcaster.max_queue + 1):
+            broadcaster.broadcast(json.dumps({'source': 'market_data', 'changes': {}}))
+        assert list(frames) == []
+        response.close()
+    assert not broadcaster.subscribers
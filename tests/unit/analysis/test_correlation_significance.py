@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from analysis.correlation_significance import (
+    block_bootstrap_indices, block_permutations, correlation_significance, significance_shard
+)
+
+MAX_LAG = 12
+N_HOURS = 168
+
+
+@pytest.fixture
+def correlated(rng):
+    """Sentiment horaire autocorrélé et variations de prix qui le suivent avec 3 h de retard"""
+    y = np.convolve(rng.normal(0, 1, N_HOURS + 5), np.ones(6) / 6, mode='valid')[:N_HOURS]
+    x = np.roll(y, 3) + rng.normal(0, 0.1, N_HOURS)
+    return x, y
+
+
+def test_correlated_series_are_significant(correlated):
+    x, y = correlated
+    result = correlation_significance(x, y, MAX_LAG, [0, 3], n_resamples=300, seed=1)
+    index = {int(lag): j for j, lag in enumerate(result['lags'])}
+
+    assert result['p_values'][index[3]] < 0.01
+    assert result['p_values_adjusted'][index[3]] < 0.01
+    # La p-value ajustée (maximum sur les décalages) n'est jamais plus petite que la p-value brute
+    assert np.all(result['p_values_adjusted'] >= result['p_values'] - 1e-12)
+
+    low, high = result['confidence_intervals'][3]
+    observed = np.corrcoef(x[3:], y[:-3])[0, 1]
+    assert low < observed < high and low > 0.5
+
+
+def test_independent_series_p_values_are_roughly_uniform(rng):
+    p_values, adjusted = [], []
+    for k in range(40):
+        x, y = rng.normal(0, 1, N_HOURS), rng.normal(0, 1, N_HOURS)
+        result = correlation_significance(x, y, MAX_LAG, [0], n_resamples=99, seed=k)
+        p_values.append(result['p_values'][MAX_LAG])
+        adjusted.append(np.nanmin(result['p_values_adjusted']))
+
+    p_values = np.array(p_values)
+    assert 0.3 < p_values.mean() < 0.7
+    assert (p_values < 0.05).mean() <= 0.15
+    # Meilleur décalage choisi parmi 25: rarement significatif une fois ajusté
+    assert (np.array(adjusted) < 0.05).mean() <= 0.15
+
+
+def test_seeded_results_are_reproducible(correlated):
+    x, y = correlated
+    args = (x, y, MAX_LAG, [3], 50, 24, 7)
+    first, second = significance_shard(args), significance_shard(args)
+    np.testing.assert_array_equal(first['p_values'], second['p_values'])
+    assert first['confidence_intervals'] == second['confidence_intervals']
+
+
+def test_resampling_keeps_blocks(rng):
+    y = np.arange(50.0)
+    permuted = block_permutations(y, 20, 10, rng)
+    assert permuted.shape == (20, 50)
+    for row in permuted:
+        blocks = row.reshape(5, 10)
+        np.testing.assert_array_equal(np.diff(blocks, axis=1), 1.0)
+        assert sorted(row) == y.tolist()
+
+    indices = block_bootstrap_indices(50, 20, 10, rng)
+    assert indices.shape == (20, 50) and indices.min() >= 0 and indices.max() < 50
+    np.testing.assert_array_equal(np.diff(indices.reshape(20, 5, 10), axis=2), 1)
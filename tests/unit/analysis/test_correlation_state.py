@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.correlation_state import CorrelationState
+
+SYMBOLS = ['BTC', 'ETH', 'SOL']
+WINDOW_HOURS = 48
+MAX_LAG = 6
+
+
+@pytest.fixture
+def hourly(rng):
+    """Prix et sentiments horaires (symboles, heures) avec des valeurs manquantes"""
+    n_hours = 200
+    hours = pd.date_range('2024-01-01', periods=n_hours, freq='h', tz='UTC')
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(SYMBOLS), n_hours)), axis=1))
+    sentiments = rng.normal(0, 1, (len(SYMBOLS), n_hours))
+    prices[rng.random(prices.shape) < 0.05] = np.nan
+    sentiments[rng.random(sentiments.shape) < 0.1] = np.nan
+    return hours, prices, sentiments
+
+
+def brute_force(prices, sentiments, window_hours, max_lag, min_periods=3):
+    """Corrélations de la dernière fenêtre par pandas, symbole par symbole"""
+    result = np.full((prices.shape[0], 2 * max_lag + 1), np.nan)
+    for i in range(prices.shape[0]):
+        changes = pd.Series(prices[i]) / pd.Series(prices[i]).shift(1) - 1
+        x = changes.iloc[-window_hours:].reset_index(drop=True)
+        y = pd.Series(sentiments[i]).iloc[-window_hours:].reset_index(drop=True)
+        for j, lag in enumerate(range(-max_lag, max_lag + 1)):
+            result[i, j] = x.corr(y.shift(lag), min_periods=min_periods)
+    return result
+
+
+def test_fold_matches_pandas_over_last_window(hourly):
+    hours, prices, sentiments = hourly
+    state = CorrelationState(WINDOW_HOURS, MAX_LAG)
+    state.fold(SYMBOLS, hours, prices, sentiments)
+
+    lags, corr, _ = state.correlations()
+    np.testing.assert_array_equal(lags, np.arange(-MAX_LAG, MAX_LAG + 1))
+    np.testing.assert_allclose(corr, brute_force(prices, sentiments, WINDOW_HOURS, MAX_LAG), atol=1e-9)
+
+
+def test_incremental_folds_match_single_fold(hourly):
+    hours, prices, sentiments = hourly
+    batch = CorrelationState(WINDOW_HOURS, MAX_LAG)
+    batch.fold(SYMBOLS, hours, prices, sentiments)
+
+    # Exécutions successives, avec sauvegarde et rechargement de l'état entre chacune
+    incremental = CorrelationState(WINDOW_HOURS, MAX_LAG)
+    for chunk in np.array_split(np.arange(len(hours)), 7):
+        incremental.fold(SYMBOLS, hours[chunk], prices[:, chunk], sentiments[:, chunk])
+        incremental = CorrelationState.from_dict(incremental.to_dict())
+
+    _, expected, expected_n = batch.correlations()
+    _, corr, n = incremental.correlations()
+    np.testing.assert_allclose(corr, expected, atol=1e-9)
+    np.testing.assert_array_equal(n, expected_n)
+
+
+def test_gap_between_runs_counts_as_missing_hours(hourly):
+    hours, prices, sentiments = hourly
+    gap = slice(170, 180)
+
+    with_gap = CorrelationState(WINDOW_HOURS, MAX_LAG)
+    with_gap.fold(SYMBOLS, hours[:170], prices[:, :170], sentiments[:, :170])
+    with_gap.fold(SYMBOLS, hours[180:], prices[:, 180:], sentiments[:, 180:])
+
+    missing_prices = prices.copy()
+    missing_sentiments = sentiments.copy()
+    missing_prices[:, gap] = np.nan
+    missing_sentiments[:, gap] = np.nan
+    _, corr, _ = with_gap.correlations()
+    np.testing.assert_allclose(corr, brute_force(missing_prices, missing_sentiments, WINDOW_HOURS, MAX_LAG), atol=1e-9)
+
+
+@pytest.fixture
+def feed(rng, monkeypatch):
+    """Données horaires servies au script comme si elles étaient lues dans les fichiers"""
+    script = pytest.importorskip('analysis.script_analyse_correlation_crypto')
+    start = pd.Timestamp('2024-01-01', tz='UTC')
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 200)))
+    data = {'market': [], 'sentiment': []}
+
+    def stamp(hour, minute):
+        return script.format_timestamp(start + pd.Timedelta(hours=hour, minutes=minute))
+
+    def add_market(hours):
+        data['market'].extend({'symbol': 'BTC', 'timestamp': stamp(h, 30), 'price': prices[h]} for h in hours)
+
+    def add_sentiment(hours):
+        data['sentiment'].extend(
+            {'timestamp': stamp(h, 10 * k), 'sentiment': rng.choice(['positive', 'neutral', 'negative']),
+             'related_crypto': ['BTC']}
+            for h in hours for k in range(3)
+        )
+
+    def since(records, since_str):
+        return [record for record in records if record['timestamp'] >= since_str]
+
+    monkeypatch.setattr(script, 'load_data', lambda window_days=7: (list(data['market']), list(data['sentiment'])))
+    monkeypatch.setattr(script, 'load_data_since', lambda start: (
+        since(data['market'], script.format_timestamp(start)), since(data['sentiment'], script.format_timestamp(start))
+    ))
+    return script, start, data, add_market, add_sentiment
+
+
+def test_late_sentiment_within_grace_is_folded(feed, tmp_path):
+    script, start, data, add_market, add_sentiment = feed
+    grace = script.SENTIMENT_GRACE_HOURS
+    state_file = str(tmp_path / 'correlation_state.json')
+
+    def update(path):
+        script.update_correlation_state(2, MAX_LAG, state_file=path, n_resamples=0)
+
+    add_market(range(100))
+    add_sentiment(h for h in range(100) if h not in (80, 95))
+    update(state_file)
+    state = CorrelationState.load(state_file, 48, MAX_LAG)
+    # Ni l'heure en cours ni celles du délai de grâce ne sont intégrées
+    assert state.last_hour == start + pd.Timedelta(hours=99 - grace - 1)
+
+    # Entrées en retard: l'heure 95 est encore ouverte, l'heure 80 déjà intégrée
+    add_sentiment([80, 95])
+    add_market(range(100, 120))
+    update(state_file)
+
+    # Même état qu'un démarrage à froid sur les données sans l'entrée trop tardive
+    expected_file = str(tmp_path / 'expected_state.json')
+    data['sentiment'] = [entry for entry in data['sentiment'] if not entry['timestamp'].startswith('2024-01-04T08')]
+    update(expected_file)
+
+    state = CorrelationState.load(state_file, 48, MAX_LAG)
+    expected = CorrelationState.load(expected_file, 48, MAX_LAG)
+    assert state.last_hour == expected.last_hour == start + pd.Timedelta(hours=119 - grace - 1)
+    np.testing.assert_allclose(state.correlations()[1], expected.correlations()[1], atol=1e-10)
+    np.testing.assert_allclose(state.window_arrays()[1], expected.window_arrays()[1])
@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import cross_correlation as cc
+
+MAX_LAG = 12
+
+
+@pytest.fixture
+def series(rng):
+    """Séries (séries, observations) avec valeurs manquantes et un sentiment en avance sur le prix"""
+    n_series, n_obs = 6, 120
+    y = rng.normal(0, 1, (n_series, n_obs))
+    x = np.roll(y, 3, axis=1) + rng.normal(0, 0.5, (n_series, n_obs))
+    x[rng.random(x.shape) < 0.1] = np.nan
+    y[rng.random(y.shape) < 0.15] = np.nan
+    return x, y
+
+
+def pandas_cross_correlation(x, y, max_lag, min_periods=3):
+    """Corrélations et nombres de paires par Series.corr(shift(k)), série par série"""
+    lags = range(-max_lag, max_lag + 1)
+    corr = np.full((x.shape[0], len(lags)), np.nan)
+    counts = np.zeros((x.shape[0], len(lags)), dtype=int)
+    for i in range(x.shape[0]):
+        xs, ys = pd.Series(x[i]), pd.Series(y[i])
+        for j, lag in enumerate(lags):
+            shifted = ys.shift(lag)
+            corr[i, j] = xs.corr(shifted, min_periods=min_periods)
+            counts[i, j] = (xs.notna() & shifted.notna()).sum()
+    return corr, counts
+
+
+def test_matches_pandas_shifted_corr(series):
+    x, y = series
+    lags, corr, counts = cc.cross_correlation(x, y, MAX_LAG)
+
+    expected_corr, expected_counts = pandas_cross_correlation(x, y, MAX_LAG)
+    np.testing.assert_array_equal(lags, np.arange(-MAX_LAG, MAX_LAG + 1))
+    np.testing.assert_allclose(corr, expected_corr, atol=1e-9)
+    np.testing.assert_array_equal(counts, expected_counts)
+
+
+def test_best_lag_finds_the_lead(series):
+    x, y = series
+    lags, corr, _ = cc.cross_correlation(x, y, MAX_LAG)
+    best, values = cc.best_lag(lags, corr)
+    np.testing.assert_array_equal(best, np.full(x.shape[0], 3))
+    assert np.all(values > 0)
+
+
+def test_constant_and_short_series_are_nan():
+    x = np.array([[1.0, 1.0, 1.0, 1.0, 1.0], [1.0, 2.0, np.nan, np.nan, np.nan]])
+    y = np.array([[1.0, 2.0, 3.0, 4.0, 5.0], [2.0, 1.0, 3.0, 5.0, 4.0]])
+    _, corr, _ = cc.cross_correlation(x, y, 2)
+    assert np.isnan(corr).all()
+
+
+def test_parallel_matches_serial(series, monkeypatch):
+    x, y = series
+    monkeypatch.setattr(cc, 'MIN_SERIES_PER_WORKER', 1)
+    expected = cc.cross_correlation(x, y, MAX_LAG)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        result = cc.parallel_cross_correlation(x, y, MAX_LAG, workers=3, executor=executor)
+
+    for got, want in zip(result, expected):
+        np.testing.assert_array_equal(got, want)
+
+
+def test_pool_thresholds(rng, monkeypatch):
+    n = 2 * cc.MIN_SERIES_PER_WORKER
+    x, y = rng.normal(size=(n, 48)), rng.normal(size=(n, 48))
+
+    def no_new_pool(*args, **kwargs):
+        raise AssertionError('pool démarré sous MIN_SERIES_PER_NEW_WORKER')
+
+    monkeypatch.setattr(cc, 'ProcessPoolExecutor', no_new_pool)
+    expected = cc.cross_correlation(x, y, 6)
+    for got, want in zip(cc.parallel_cross_correlation(x, y, 6, workers=2), expected):
+        np.testing.assert_array_equal(got, want)
+
+    # Un pool déjà démarré est utilisé dès MIN_SERIES_PER_WORKER séries par processus
+    class RecordingExecutor(ThreadPoolExecutor):
+        def map(self, fn, tasks):
+            self.shards = list(tasks)
+            return super().map(fn, self.shards)
+
+    with RecordingExecutor(max_workers=2) as executor:
+        result = cc.parallel_cross_correlation(x, y, 6, workers=2, executor=executor)
+    assert [len(shard[0]) for shard in executor.shards] == [cc.MIN_SERIES_PER_WORKER] * 2
+    for got, want in zip(result, expected):
+        np.testing.assert_array_equal(got, want)
@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.rolling_correlation import RollingCorrelationStore, rolling_correlation, read_chunk
+
+SYMBOLS = ['BTC', 'ETH']
+WINDOW = 24
+LAGS = (0, 2, -3)
+
+
+@pytest.fixture
+def hourly(rng):
+    """Variations de prix et sentiments horaires (symboles, heures) avec des valeurs manquantes"""
+    n_hours = 24 * 5
+    hours = pd.date_range('2024-03-01', periods=n_hours, freq='h', tz='UTC')
+    x = rng.normal(0, 0.01, (len(SYMBOLS), n_hours))
+    y = rng.normal(0, 1, (len(SYMBOLS), n_hours))
+    x[rng.random(x.shape) < 0.05] = np.nan
+    y[rng.random(y.shape) < 0.1] = np.nan
+    return hours, x, y
+
+
+def as_array(series, labels):
+    """Colonnes d'une série chargée en matrice (décalages, fenêtres), None converti en NaN"""
+    return np.array([[np.nan if v is None else v for v in series['values'][label]] for label in labels])
+
+
+def test_matches_pandas_per_window(hourly):
+    _, x, y = hourly
+    ends = np.arange(x.shape[1])
+    result = rolling_correlation(x, y, LAGS, WINDOW, ends)
+
+    for i in range(x.shape[0]):
+        for j, lag in enumerate(LAGS):
+            for end in ends[::7]:
+                start = max(end - WINDOW + 1, 0)
+                xs = pd.Series(x[i, start:end + 1])
+                ys = pd.Series(y[i, start:end + 1])
+                expected = xs.corr(ys.shift(lag), min_periods=3)
+                np.testing.assert_allclose(result[i, j, end], expected, atol=1e-9)
+
+
+def test_incremental_updates_match_single_update(hourly, tmp_path):
+    hours, x, y = hourly
+    batch = RollingCorrelationStore(str(tmp_path / 'batch'), WINDOW, lags=LAGS)
+    assert batch.update(SYMBOLS, hours, x, y) == len(hours)
+
+    # Passages successifs, chacun ne recevant que les heures nécessaires (required_start)
+    incremental = RollingCorrelationStore(str(tmp_path / 'incremental'), WINDOW, lags=LAGS)
+    for stop in (30, 31, 55, 80, len(hours)):
+        last_end = incremental.last_end()
+        first = 0 if last_end is None else hours.searchsorted(incremental.required_start(last_end))
+        incremental.update(SYMBOLS, hours[first:stop], x[:, first:stop], y[:, first:stop])
+
+    labels = ['direct', 'lag_2h', 'lead_3h']
+    for symbol in SYMBOLS:
+        expected = batch.load(symbol)
+        series = incremental.load(symbol)
+        assert series['timestamps'] == expected['timestamps']
+        np.testing.assert_allclose(as_array(series, labels), as_array(expected, labels), atol=1e-9)
+        # Un fichier par jour
+        assert len(os.listdir(incremental.symbol_dir(symbol))) == 5
+
+
+def test_load_recent_days_and_truncated_line(hourly, tmp_path):
+    hours, x, y = hourly
+    store = RollingCorrelationStore(str(tmp_path), WINDOW, lags=LAGS)
+    store.update(SYMBOLS, hours, x, y)
+
+    recent = store.load('BTC', hours_back=30)
+    assert recent['timestamps'] == store.load('BTC')['timestamps'][-48:]
+
+    # Écriture interrompue: la ligne incomplète est ignorée
+    path = os.path.join(store.symbol_dir('BTC'), '2024-03-05.jsonl')
+    with open(path, 'a') as f:
+        f.write('{"timestamp": "2024-03-06T00:00:00+00:00", "val')
+    assert len(read_chunk(path)['timestamps']) == 24
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from analysis.script_analyse_correlation_crypto import preprocess_sentiment_data
+
+SENTIMENT_VALUES = {'positive': 1, 'neutral': 0, 'negative': -1}
+
+
+@pytest.fixture
+def sentiment_data(rng):
+    """Entrées sentimentales sur 12 heures, avec symboles multiples, doublons et related_crypto absent"""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    entries = []
+    for k in range(300):
+        symbols = list(rng.choice(['BTC', 'ETH', 'SOL', 'ADA'], size=rng.integers(1, 4)))
+        entries.append({
+            'timestamp': (start + timedelta(minutes=int(rng.integers(0, 12 * 60)))).isoformat(),
+            'sentiment': str(rng.choice(list(SENTIMENT_VALUES))),
+            'related_crypto': symbols
+        })
+    entries.append({'timestamp': start.isoformat(), 'sentiment': 'positive', 'related_crypto': None})
+    return entries
+
+
+def per_symbol(sentiment_data, symbol):
+    """Sentiment horaire d'un symbole par un filtre puis un groupby (une entrée compte une fois)"""
+    df = pd.DataFrame([item for item in sentiment_data
+                       if isinstance(item['related_crypto'], list) and symbol in item['related_crypto']])
+    df['hour'] = pd.to_datetime(df['timestamp'], utc=True).dt.floor('h')
+    df['value'] = df['sentiment'].map(SENTIMENT_VALUES)
+    return df.groupby('hour')['value'].agg(['mean', 'count', 'std'])
+
+
+def test_preprocess_sentiment_matches_per_symbol_aggregation(sentiment_data):
+    result = preprocess_sentiment_data(sentiment_data)
+    assert sorted(result) == ['ADA', 'BTC', 'ETH', 'SOL']
+
+    for symbol, hourly in result.items():
+        expected = per_symbol(sentiment_data, symbol)
+        assert hourly['timestamp'].tolist() == expected.index.tolist()
+        assert hourly['sentiment_value'].tolist() == pytest.approx(expected['mean'].tolist())
+        assert hourly['sentiment_count'].tolist() == expected['count'].tolist()
+        assert hourly['sentiment_std'].tolist() == pytest.approx(expected['std'].fillna(0.0).tolist())
+
+    restricted = preprocess_sentiment_data(sentiment_data, symbols=['BTC', 'DOGE'])
+    assert list(restricted) == ['BTC']
+    pd.testing.assert_frame_equal(restricted['BTC'], result['BTC'])
@@ -0,0 +1,121 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import technical_indicators as ti
+from data_collection.market_store import MarketStore, format_timestamp
+
+SYMBOLS = ['BTC', 'ETH', 'SOL']
+NUMERIC = ('sma20', 'sma50', 'rsi14', 'ema12', 'ema26', 'macd', 'macd_signal', 'macd_histogram',
+           'bollinger_upper', 'bollinger_middle', 'bollinger_lower')
+
+
+@pytest.fixture
+def ticks(rng):
+    """Ticks de marché toutes les 15 minutes, au format de market_data.json"""
+    times = pd.date_range('2024-01-01', periods=600, freq='15min', tz='UTC')
+    records = []
+    for symbol in SYMBOLS:
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(times))))
+        records.extend(
+            {'symbol': symbol, 'timestamp': format_timestamp(t), 'price': float(p)}
+            for t, p in zip(times, prices)
+        )
+    return records
+
+
+def assert_indicators_close(got, expected, rtol=1e-9):
+    """Compare deux jeux d'indicateurs (None si non défini)"""
+    for name in NUMERIC:
+        if expected[name] is None:
+            assert got[name] is None, name
+        else:
+            assert got[name] == pytest.approx(expected[name], rel=rtol, abs=1e-9), name
+
+
+def test_tick_updates_match_vectorized_indicators(ticks):
+    prices, _ = ti.price_matrix(ticks)
+    vectorized = ti.compute_indicators(prices)
+
+    state = ti.IndicatorState()
+    for k, tick in enumerate(t for t in ticks if t['symbol'] == 'BTC'):
+        result = state.update('BTC', tick['timestamp'], tick['price'])
+        row = prices.index[k]
+        expected = {
+            name: None if pd.isna(vectorized[name].at[row, 'BTC']) else float(vectorized[name].at[row, 'BTC'])
+            for name in NUMERIC
+        }
+        assert_indicators_close(result, expected)
+
+
+def test_updates_after_from_history_match_updates_from_scratch(ticks):
+    head = ticks[:300] + ticks[600:900] + ticks[1200:1500]
+    tail = ticks[300:600] + ticks[900:1200] + ticks[1500:]
+
+    resumed = ti.IndicatorState.from_history(*ti.price_matrix(head))
+    scratch = ti.IndicatorState()
+    for tick in head:
+        scratch.update(tick['symbol'], tick['timestamp'], tick['price'])
+
+    for tick in sorted(tail, key=lambda t: t['timestamp']):
+        got = resumed.update(tick['symbol'], tick['timestamp'], tick['price'])
+        expected = scratch.update(tick['symbol'], tick['timestamp'], tick['price'])
+        assert_indicators_close(got, expected)
+
+    # Un tick déjà intégré est ignoré
+    assert resumed.update('BTC', ticks[0]['timestamp'], 1.0) is None
+
+
+def test_load_state_rebuilds_missing_symbols_from_recent_ticks(ticks, tmp_path, monkeypatch):
+    store = MarketStore(str(tmp_path / 'market_store'))
+    store.append(ticks)
+    monkeypatch.setattr(ti, 'MarketStore', lambda: store)
+
+    full = ti.IndicatorState.from_history(*ti.price_matrix(ticks))
+    state_file = str(tmp_path / 'indicator_state.json')
+    ti.IndicatorState({'BTC': full.symbols['BTC']}).save(state_file)
+
+    reads = []
+    read_tail = store.read_tail
+    monkeypatch.setattr(store, 'read_tail', lambda **kwargs: reads.append(kwargs['symbols']) or read_tail(**kwargs))
+
+    state = ti.load_state(state_file, symbols=SYMBOLS)
+    assert sorted(state.symbols) == SYMBOLS
+    assert state.symbols['BTC'] == full.symbols['BTC']
+    assert all(symbols != ['BTC'] for symbols in reads)
+    for symbol in ('ETH', 'SOL'):
+        assert state.symbols[symbol]['count'] == ti.REBUILD_TICKS
+        assert_indicators_close(state.indicators(symbol), full.indicators(symbol), rtol=1e-5)
+
+
+def test_save_market_data_prepends_entries_without_parsing_them(ticks, tmp_path, monkeypatch):
+    path = str(tmp_path / 'market_data.json')
+    # Ancien format, écrit d'un bloc: converti à la première écriture
+    with open(path, 'w') as f:
+        json.dump(ticks[2::-1], f)
+    monkeypatch.setattr(ti, 'MAX_MARKET_ENTRIES', 6)
+
+    assert ti.save_market_data(ticks[3:5], path) == 5
+    with monkeypatch.context() as m:
+        m.setattr(ti.json, 'loads', lambda *args, **kwargs: pytest.fail('entrée analysée'))
+        assert ti.save_market_data(ticks[5:7], path) == 6
+
+    with open(path) as f:
+        assert json.load(f) == ticks[6:0:-1]
+
+
+def test_run_appends_new_ticks_to_the_store(ticks, tmp_path, monkeypatch):
+    store = MarketStore(str(tmp_path / 'market_store'))
+    store.append(ticks[:300])
+    monkeypatch.setattr(ti, 'MarketStore', lambda: store)
+    monkeypatch.setattr(ti, 'save_market_data', lambda enriched: len(enriched))
+
+    stdin = io.StringIO(json.dumps(ticks[300:310]))
+    exit_code, output = ti.run(['-', '--state-file', str(tmp_path / 'indicator_state.json')], stdin)
+    assert exit_code == 0 and json.loads(output)['crypto_count'] == 10
+
+    stored = store.read(symbols=['BTC'])
+    assert len(stored) == 310 and stored['technical_signal'].notna().sum() == 10
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from data_collection.bar_store import BAR_COLUMNS, DAY_MS, BarStore, aggregate_bars, lttb, merge_bars
+
+HOUR_MS = 60 * 60 * 1000
+# 2024-01-01T00:00:00Z
+START_MS = 1704067200000
+
+
+@pytest.fixture
+def ticks(rng):
+    """Ticks toutes les 15 minutes sur deux jours, volumes sur 24 h avec quelques absences"""
+    times = START_MS + np.arange(2 * 96) * 15 * 60 * 1000
+    prices = 100 + np.cumsum(rng.normal(0, 1, len(times)))
+    volumes = rng.uniform(1e6, 2e6, len(times))
+    volumes[::7] = np.nan
+    return times, prices, volumes
+
+
+def test_aggregate_bars_matches_per_bucket_reduction(ticks):
+    times, prices, volumes = ticks
+    bars = aggregate_bars(times, prices, volumes, 4 * HOUR_MS)
+
+    assert len(bars['t']) == 12
+    for k, t in enumerate(bars['t']):
+        mask = (times >= t) & (times < t + 4 * HOUR_MS)
+        assert bars['open'][k] == prices[mask][0]
+        assert bars['high'][k] == prices[mask].max()
+        assert bars['low'][k] == prices[mask].min()
+        assert bars['close'][k] == prices[mask][-1]
+        assert bars['ticks'][k] == mask.sum()
+        last_volume = volumes[mask][-1]
+        assert bars['volume'][k] == (None if np.isnan(last_volume) else last_volume)
+
+    assert aggregate_bars(times[:0], prices[:0], volumes[:0], HOUR_MS) == {column: [] for column in BAR_COLUMNS}
+
+
+def test_merge_bars_keeps_extremes_and_sums_volumes(ticks):
+    times, prices, volumes = ticks
+    # Du 2 au 3 janvier: une seule tranche de deux jours alignée sur l'epoch
+    times = times + DAY_MS
+    daily = aggregate_bars(times, prices, volumes, DAY_MS)
+    daily['volume'][1] = None
+
+    merged = merge_bars(daily, 2 * DAY_MS)
+    assert merged['t'] == [START_MS + DAY_MS]
+    assert merged['open'] == [prices[0]]
+    assert merged['high'] == [prices.max()]
+    assert merged['low'] == [prices.min()]
+    assert merged['close'] == [prices[-1]]
+    assert merged['volume'] == [daily['volume'][0]]
+    assert merged['ticks'] == [len(times)]
+
+    daily['volume'][1] = 5.0
+    assert merge_bars(daily, 2 * DAY_MS)['volume'] == [daily['volume'][0] + 5.0]
+    assert merge_bars(daily, DAY_MS) == daily
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    times = np.arange(1000)
+    values = np.sin(times / 50.0)
+    values[500] = 10.0
+
+    selected = lttb(times, values, 50)
+    assert len(selected) == 50
+    assert selected[0] == 0 and selected[-1] == 999
+    assert np.all(np.diff(selected) > 0)
+    assert 500 in selected
+
+    np.testing.assert_array_equal(lttb(times[:10], values[:10], 50), np.arange(10))
+
+
+def test_update_day_replaces_only_that_day(ticks, tmp_path):
+    times, prices, volumes = ticks
+    store = BarStore(str(tmp_path / 'bars'))
+    first, second = slice(0, 96), slice(96, None)
+    store.update_day('BTC', times[first], prices[first], volumes[first])
+    store.update_day('BTC', times[second][:40], prices[second][:40], volumes[second][:40])
+
+    # Nouvelle ingestion du deuxième jour, avec tous ses ticks
+    store.update_day('BTC', times[second], prices[second], volumes[second])
+    assert store.has_data('BTC') and not store.has_data('ETH')
+
+    for resolution, resolution_ms in (('15min', 15 * 60 * 1000), ('1h', HOUR_MS), ('1d', DAY_MS)):
+        expected = aggregate_bars(times, prices, volumes, resolution_ms)
+        assert store.read('BTC', resolution, START_MS, START_MS + 2 * DAY_MS) == expected
+
+    # Plage bornée: barres dont le début est dans la plage
+    hourly = store.read('BTC', '1h', START_MS + 10 * HOUR_MS, START_MS + 12 * HOUR_MS)
+    assert hourly['t'] == [START_MS + k * HOUR_MS for k in (10, 11, 12)]
+    assert store.read('ETH', '1h', START_MS, START_MS + DAY_MS)['t'] == []
+
+
+def test_read_spans_period_files(tmp_path):
+    store = BarStore(str(tmp_path / 'bars'))
+    # 31 janvier et 1er février: deux fichiers mensuels
+    for day in (30, 31):
+        times = START_MS + day * DAY_MS + np.arange(4) * HOUR_MS
+        store.update_day('BTC', times, np.full(4, 100.0 + day), np.full(4, 1e6))
+
+    bars = store.read('BTC', '1h', START_MS, START_MS + 40 * DAY_MS)
+    assert len(bars['t']) == 8
+    assert bars['close'][:4] == [130.0] * 4 and bars['close'][4:] == [131.0] * 4
+    assert bars['t'] == sorted(bars['t'])
@@ -0,0 +1,100 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from analysis.technical_indicators import save_market_data
+from data_collection import market_store
+from data_collection.market_store import MarketStore
+
+pytest.importorskip('pyarrow')
+
+
+def tick(symbol, timestamp, price):
+    """Tick au format de market_data.json"""
+    return {'symbol': symbol, 'timestamp': timestamp, 'price': price, 'total_volume': 1000.0}
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Stockage de marché vide dans un répertoire temporaire"""
+    return MarketStore(str(tmp_path / 'market_store'))
+
+
+def test_append_drops_known_and_in_batch_duplicates(store):
+    assert store.append([
+        tick('BTC', '2024-01-01T10:00:00.000Z', 100.0),
+        tick('BTC', '2024-01-01T10:15:00.000Z', 101.0),
+        tick('BTC', '2024-01-01T10:15:00.000Z', 102.0)
+    ]) == 2
+
+    # Ticks déjà stockés ignorés, seul le nouveau est ajouté
+    assert store.append([
+        tick('BTC', '2024-01-01T10:00:00.000Z', 100.0),
+        tick('BTC', '2024-01-01T10:30:00.000Z', 103.0)
+    ]) == 1
+    assert store.append([tick('BTC', '2024-01-01T10:30:00.000Z', 103.0)]) == 0
+
+    df = store.read(columns=['timestamp', 'symbol', 'price'])
+    assert df['price'].tolist() == [100.0, 102.0, 103.0]
+    assert df['timestamp'].is_monotonic_increasing
+    assert store.latest()['BTC']['price'] == 103.0
+
+
+def test_append_rewrites_only_touched_partitions(store, monkeypatch):
+    store.append([
+        tick(symbol, f'2024-01-0{day}T12:00:00.000Z', 100.0 + day)
+        for symbol in ('BTC', 'ETH') for day in (1, 2, 3)
+    ])
+
+    written = []
+    write_table = market_store.pq.write_table
+    monkeypatch.setattr(
+        market_store.pq, 'write_table',
+        lambda table, path, **kwargs: written.append(path) or write_table(table, path, **kwargs)
+    )
+    assert store.append([tick('ETH', '2024-01-02T18:00:00.000Z', 110.0)]) == 1
+
+    assert len(written) == 1
+    assert 'symbol=ETH' in written[0] and 'date=2024-01-02' in written[0]
+    eth = store.read(symbols=['ETH'], start=pd.Timestamp('2024-01-02'), end=pd.Timestamp('2024-01-02T23:59:59'))
+    assert eth['price'].tolist() == [102.0, 110.0]
+    assert len(store.read()) == 7
+
+
+def test_latest_index_keeps_newest_tick_and_can_be_rebuilt(store):
+    store.append([tick('BTC', '2024-01-02T10:00:00.000Z', 200.0), tick('ETH', '2024-01-01T10:00:00.000Z', 10.0)])
+    # Un tick plus ancien ajouté ensuite ne remplace pas le dernier connu
+    store.append([tick('BTC', '2024-01-01T23:00:00.000Z', 150.0), tick('ETH', '2024-01-01T11:00:00.000Z', 11.0)])
+
+    latest = store.latest()
+    assert {symbol: record['price'] for symbol, record in latest.items()} == {'BTC': 200.0, 'ETH': 11.0}
+    assert store.latest(['ETH'])['ETH']['timestamp'] == '2024-01-01T11:00:00.000Z'
+
+    os.remove(store.latest_index_file)
+    assert store.latest() == latest
+
+
+def test_sync_from_json_reads_only_entries_added_since_the_last_sync(store, tmp_path):
+    path = str(tmp_path / 'market_data.json')
+    # Ancien format, écrit d'un bloc: lu en entier
+    with open(path, 'w') as f:
+        json.dump([tick('BTC', '2024-01-01T10:00:00.000Z', 100.0), tick('ETH', '2024-01-01T10:00:00.000Z', 10.0)], f)
+    assert store.sync_from_json(path) == 2
+
+    save_market_data([tick('BTC', '2024-01-01T10:15:00.000Z', 101.0)], path)
+    assert store.sync_from_json(path) == 1
+    assert store.sync_from_json(path) == 0
+
+    # Les entrées sous la dernière entrée synchronisée ne sont plus analysées
+    with open(path) as f:
+        lines = f.read().splitlines()
+    lines[-2] = '{illisible}'
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    save_market_data([tick('ETH', '2024-01-01T10:15:00.000Z', 11.0), tick('BTC', '2024-01-01T10:30:00.000Z', 102.0)], path)
+    assert store.sync_from_json(path) == 2
+
+    df = store.read(columns=['timestamp', 'symbol', 'price'])
+    assert sorted(df['price'].tolist()) == [10.0, 11.0, 100.0, 101.0, 102.0]
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from trading.allocation_optimizer import (
+    project_capped_simplex, min_variance_weights, max_sharpe_weights, risk_parity_weights
+)
+from trading import suivi_investissement_crypto as suivi
+
+
+@pytest.fixture
+def cov():
+    """Covariance annuelle de quatre actifs modérément corrélés"""
+    vol = np.array([0.6, 0.7, 0.8, 0.9])
+    corr = np.full((4, 4), 0.3) + 0.7 * np.eye(4)
+    return corr * np.outer(vol, vol)
+
+
+def test_min_variance_matches_closed_form(cov):
+    inverse = np.linalg.solve(cov, np.ones(len(cov)))
+    expected = inverse / inverse.sum()
+    assert np.all(expected > 0)
+    np.testing.assert_allclose(min_variance_weights(cov, cap=1.0), expected, atol=1e-6)
+
+
+def test_max_sharpe_matches_tangency_portfolio(cov):
+    mean = np.array([0.30, 0.35, 0.40, 0.42])
+    tangency = np.linalg.solve(cov, mean)
+    expected = tangency / tangency.sum()
+    assert np.all(expected > 0)
+    np.testing.assert_allclose(max_sharpe_weights(cov, mean, cap=1.0), expected, atol=1e-5)
+
+
+def test_max_sharpe_falls_back_to_min_variance(cov):
+    mean = np.full(len(cov), -0.1)
+    np.testing.assert_allclose(max_sharpe_weights(cov, mean, cap=1.0), min_variance_weights(cov, cap=1.0))
+
+
+def test_risk_parity_equalizes_risk_contributions(cov):
+    weights = risk_parity_weights(cov, cap=1.0)
+    contributions = weights * (cov @ weights)
+    np.testing.assert_allclose(contributions, contributions.mean(), rtol=1e-8)
+    assert weights.sum() == pytest.approx(1.0)
+
+    # Actifs indépendants: poids inversement proportionnels à la volatilité
+    vol = np.sqrt(np.diag(cov))
+    expected = (1 / vol) / (1 / vol).sum()
+    np.testing.assert_allclose(risk_parity_weights(np.diag(vol ** 2), cap=1.0), expected, rtol=1e-8)
+
+
+def test_capped_simplex_projection():
+    weights = project_capped_simplex(np.array([0.9, 0.5, 0.1, -0.2]), cap=0.4)
+    assert weights.sum() == pytest.approx(1.0)
+    assert weights.max() <= 0.4 + 1e-9 and weights.min() >= 0
+    # Projection euclidienne: w = clip(v - tau, 0, cap) pour un même tau
+    np.testing.assert_allclose(weights, [0.4, 0.4, 0.2, 0.0], atol=1e-9)
+
+    capped = min_variance_weights(np.diag([0.01, 1.0, 1.0, 1.0]), cap=0.4)
+    assert capped[0] == pytest.approx(0.4, abs=1e-6)
+    np.testing.assert_allclose(capped[1:], 0.2, atol=1e-6)
+
+
+def test_allocation_method_is_configurable(tmp_path, monkeypatch):
+    args = suivi.parse_args(['--allocation-method', 'risk_parity', '--max-weight', '0.5'])
+    assert (args.allocation_method, args.max_weight) == ('risk_parity', 0.5)
+    assert suivi.parse_args([]).allocation_method == 'static'
+    with pytest.raises(SystemExit):
+        suivi.parse_args(['--allocation-method', 'equal'])
+
+    calls = []
+
+    def optimize_allocation(state, method, max_weight, shrinkage):
+        calls.append((method, max_weight))
+        return {'BTC': 1.0}
+
+    monkeypatch.setattr(suivi, 'load_covariance_state', lambda *args: None)
+    monkeypatch.setattr(suivi, 'optimize_allocation', optimize_allocation)
+    static = suivi.InvestmentTracker(data_dir=str(tmp_path))
+    assert static.optimized_base_allocation() == static.base_allocation
+    tracker = suivi.InvestmentTracker(data_dir=str(tmp_path), allocation_method=args.allocation_method,
+                                      max_weight=args.max_weight)
+    assert tracker.optimized_base_allocation() == {'BTC': 1.0}
+    assert calls == [('risk_parity', 0.5)]
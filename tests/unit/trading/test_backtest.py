@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading.backtest import BacktestData, weight_vectors, simulate, performance_metrics
+
+SYMBOLS = ['BTC', 'ETH', 'SOL', 'DOGE']
+
+
+@pytest.fixture
+def data(rng):
+    """Données de backtest sur une grille de 6 heures; SOL coté plus tard, DOGE hors allocation"""
+    index = pd.date_range('2024-01-01', '2024-06-30', freq='6h', tz='UTC')
+    prices = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(index), len(SYMBOLS))), axis=0)),
+        index=index, columns=SYMBOLS
+    )
+    prices.loc[:'2024-02-10', 'SOL'] = np.nan
+    data = BacktestData(prices, use_correlation=False)
+    data.correlation = rng.random(data.signal_codes.shape) < 0.3
+    return data
+
+
+def brute_force(data, base, adjustments, correlation_bonus, monthly_investment):
+    """Rejoue les investissements date par date et symbole par symbole"""
+    positions = dict.fromkeys(data.symbols, 0.0)
+    values = []
+    invest_positions = {int(i): p for p, i in enumerate(data.invest_idx)}
+    for t in range(len(data.index)):
+        p = invest_positions.get(t)
+        if p is not None:
+            raw = {
+                symbol: base[j] + adjustments[data.signal_codes[p, j]] + correlation_bonus * data.correlation[p, j]
+                for j, symbol in enumerate(data.symbols) if np.isfinite(base[j])
+            }
+            total = sum(raw.values())
+            for j, symbol in enumerate(data.symbols):
+                if symbol not in raw:
+                    continue
+                euros = round(raw[symbol] / total * monthly_investment, 2)
+                price = data.prices[t, j]
+                if price > 0:
+                    positions[symbol] += euros / price
+        values.append(sum(
+            positions[symbol] * data.prices[t, j]
+            for j, symbol in enumerate(data.symbols) if np.isfinite(data.prices[t, j])
+        ))
+    return positions, np.array(values)
+
+
+def test_simulate_matches_brute_force(data):
+    base, adjustments = weight_vectors(data.symbols)
+    result = simulate(data, base, adjustments, correlation_bonus=0.05, monthly_investment=50)
+
+    positions, values = brute_force(data, base, adjustments, 0.05, 50)
+    np.testing.assert_allclose(result['positions'][-1], [positions[s] for s in data.symbols], rtol=1e-12)
+    np.testing.assert_allclose(result['values'], values, rtol=1e-12)
+    np.testing.assert_allclose(result['weights'].sum(axis=1), 1.0)
+    assert result['invested'][-1] == 50 * len(data.invest_idx)
+    assert len(data.invest_idx) == 6
+
+
+def test_performance_metrics_match_brute_force(data):
+    base, adjustments = weight_vectors(data.symbols)
+    result = simulate(data, base, adjustments)
+    metrics = performance_metrics(data, result)
+
+    # Indice de valeur hors apports et drawdown, pas à pas
+    contributions = dict(zip(data.invest_idx.tolist(), result['euros'].sum(axis=1)))
+    index, peak, max_drawdown, previous = 1.0, 1.0, 0.0, 0.0
+    for t, value in enumerate(result['values']):
+        if previous > 0:
+            index *= (value - contributions.get(t, 0.0)) / previous
+        peak = max(peak, index)
+        max_drawdown = min(max_drawdown, index / peak - 1)
+        previous = value
+
+    invested = 50 * len(data.invest_idx)
+    assert metrics['total_invested'] == invested
+    assert metrics['roi_percent'] == pytest.approx((result['values'][-1] - invested) / invested * 100)
+    assert metrics['max_drawdown_percent'] == pytest.approx(max_drawdown * 100)
@@ -0,0 +1,89 @@
+import json
+import shutil
+
+import numpy as np
+import pytest
+
+from trading import batch_valuation
+from trading import suivi_investissement_crypto as suivi
+
+SNAPSHOT = {
+    'BTC': {'price': 52000.0, 'technical_signal': 'BUY'},
+    'ETH': {'price': 2600.0, 'technical_signal': 'SELL'},
+    'SOL': {'price': 110.0, 'technical_signal': 'NEUTRAL'},
+    'ADA': {'price': 0.45},
+    'BNB': {'price': 310.0},
+    'DOT': {'price': 7.0},
+    'XRP': {'price': 0.6}
+}
+
+
+@pytest.fixture
+def clients(tmp_path, monkeypatch, rng):
+    """Portefeuilles de trois clients constitués à des prix différents, valorisés ensuite au même snapshot"""
+    market = {'data': SNAPSHOT}
+
+    def load_market_data(self):
+        return market['data']
+
+    monkeypatch.setattr(suivi.InvestmentTracker, 'load_market_data', load_market_data)
+    clients_dir = tmp_path / 'clients'
+    monthly = {'alice': 50.0, 'bob': 120.0, 'carol': 20.0}
+    for client_id, amount in monthly.items():
+        tracker = suivi.InvestmentTracker(amount, data_dir=str(clients_dir / client_id))
+        for _ in range(int(rng.integers(3, 15))):
+            market['data'] = {
+                symbol: dict(tick, price=tick['price'] * float(rng.uniform(0.7, 1.3)))
+                for symbol, tick in SNAPSHOT.items()
+            }
+            tracker.update_portfolio()
+    market['data'] = SNAPSHOT
+    return clients_dir, monthly
+
+
+def test_batch_valuation_matches_per_tracker_valuation(clients, tmp_path):
+    clients_dir, monthly = clients
+    portfolios = batch_valuation.load_portfolios(str(clients_dir))
+    assert list(portfolios) == sorted(monthly)
+
+    shared = suivi.InvestmentTracker(data_dir=str(tmp_path / 'data'))
+    results = batch_valuation.run_batch_valuation(portfolios, shared, np.array([monthly[c] for c in portfolios]))
+
+    for _, row in results.iterrows():
+        # Valorisation par le tracker du client, sur une copie de ses données
+        client_dir = tmp_path / 'reference' / row['client_id']
+        shutil.copytree(clients_dir / row['client_id'], client_dir)
+        tracker = suivi.InvestmentTracker(monthly[row['client_id']], data_dir=str(client_dir))
+        next_purchase = tracker.generate_allocation()['euro_allocation']
+        # Mise à jour sans achat: revalorisation des avoirs au prix du snapshot
+        tracker.monthly_investment = 0
+        tracker.update_portfolio({'euro_allocation': {}, 'normalized_allocation': {}})
+        report = tracker.generate_report()
+
+        assert row['total_invested'] == pytest.approx(report['total_invested'])
+        assert row['current_value'] == pytest.approx(report['current_value'])
+        assert row['total_roi_percent'] == pytest.approx(report['total_roi_percent'])
+        for symbol, performance in report['assets'].items():
+            assert row[f'value_{symbol}'] == pytest.approx(performance['current_value'])
+            assert row[f'roi_{symbol}'] == pytest.approx(performance['roi_percent'])
+        for symbol, amount in next_purchase.items():
+            assert row[f'next_{symbol}'] == pytest.approx(amount)
+
+
+def test_client_portfolios_are_loaded_read_only(clients):
+    clients_dir, _ = clients
+    client_dir = clients_dir / 'alice'
+    portfolio_file = client_dir / 'portfolio.json'
+    before = {path.name: path.read_bytes() for path in client_dir.iterdir()}
+
+    # Ancien format: historique complet dans portfolio.json
+    legacy = suivi.InvestmentTracker._empty_portfolio()
+    if portfolio_file.exists():
+        legacy = json.loads(portfolio_file.read_text())
+    legacy['history'] = []
+    portfolio_file.write_text(json.dumps(legacy))
+    before['portfolio.json'] = portfolio_file.read_bytes()
+
+    portfolio = batch_valuation.load_client_portfolio(str(client_dir))
+    assert 'history' not in portfolio and portfolio['total_invested'] > 0
+    assert {path.name: path.read_bytes() for path in client_dir.iterdir()} == before
@@ -0,0 +1,104 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_collection.market_store import MarketStore
+from trading import suivi_investissement_crypto as suivi
+from trading.monte_carlo import DAYS_PER_MONTH, covariance_factor, load_daily_prices, simulate_dca, summarize_outcomes
+
+
+@pytest.fixture
+def parameters():
+    """Rendements journaliers moyens, covariance, poids et avoirs de trois actifs"""
+    mean = np.array([0.001, 0.0005, -0.0002])
+    vol = np.array([0.04, 0.05, 0.06])
+    corr = np.array([[1.0, 0.6, 0.3], [0.6, 1.0, 0.4], [0.3, 0.4, 1.0]])
+    cov = corr * np.outer(vol, vol)
+    return mean, cov, np.array([0.5, 0.3, 0.2]), np.array([100.0, 50.0, 0.0])
+
+
+def brute_force(mean, cov, weights, holdings, monthly_investment, horizon_months, n_paths, seed):
+    """Fait évoluer chaque trajectoire mois par mois: achat en début de mois, puis variation des prix"""
+    shocks = np.random.default_rng(seed).standard_normal((n_paths, horizon_months, len(mean)))
+    factor = covariance_factor(cov * DAYS_PER_MONTH)
+    final_values = np.empty(n_paths)
+    for p in range(n_paths):
+        values = holdings.copy()
+        for m in range(horizon_months):
+            values = (values + monthly_investment * weights) * np.exp(factor @ shocks[p, m] + mean * DAYS_PER_MONTH)
+        final_values[p] = values.sum()
+    return final_values
+
+
+def test_simulate_dca_matches_brute_force(parameters):
+    mean, cov, weights, holdings = parameters
+    final_values = simulate_dca(mean, cov, weights, holdings, 50, horizon_months=12, n_paths=200,
+                                chunk_size=200, seed=7)
+    expected = brute_force(mean, cov, weights, holdings, 50, 12, 200, seed=7)
+    np.testing.assert_allclose(final_values, expected, rtol=1e-10)
+
+
+def test_chunk_size_does_not_change_paths(parameters):
+    mean, cov, weights, holdings = parameters
+    single = simulate_dca(mean, cov, weights, holdings, 50, horizon_months=6, n_paths=1000, chunk_size=1000, seed=3)
+    chunked = simulate_dca(mean, cov, weights, holdings, 50, horizon_months=6, n_paths=1000, chunk_size=128, seed=3)
+    np.testing.assert_allclose(chunked, single, rtol=1e-12)
+
+
+def test_deterministic_growth_and_summary():
+    mean = np.array([0.001, 0.002])
+    final_values = simulate_dca(mean, np.zeros((2, 2)), np.array([0.5, 0.5]), np.array([10.0, 0.0]), 100,
+                                horizon_months=3, n_paths=4, seed=0)
+    growth = np.exp(mean * DAYS_PER_MONTH)
+    expected = 10.0 * growth[0] ** 3 + sum(50 * growth ** (3 - m) for m in range(3)).sum()
+    np.testing.assert_allclose(final_values, expected)
+
+    summary = summarize_outcomes(final_values, total_invested=310.0)
+    assert summary['percentiles']['p50'] == pytest.approx(expected)
+    assert summary['probability_of_loss'] == 0.0
+
+
+def test_load_daily_prices_reads_the_estimation_window(tmp_path):
+    pytest.importorskip('pyarrow')
+    store = MarketStore(str(tmp_path / 'market_store'))
+    store.append([
+        {'symbol': 'BTC', 'timestamp': f'2024-01-{day:02d}T{hour:02d}:00:00.000Z', 'price': day * 100.0 + hour}
+        for day in range(1, 11) for hour in (6, 18)
+    ])
+
+    prices = load_daily_prices(store, start=pd.Timestamp('2024-01-08'))
+    assert [str(day.date()) for day in prices.index] == ['2024-01-08', '2024-01-09', '2024-01-10']
+    assert prices['BTC'].tolist() == [818.0, 918.0, 1018.0]
+
+
+def test_projection_is_cached_per_day_and_allocation(tmp_path, monkeypatch):
+    runs = []
+
+    def project_portfolio(portfolio, allocation, market_data, prices, monthly_investment, horizon_months, n_paths):
+        runs.append(dict(allocation['normalized_allocation']))
+        return {'paths': n_paths, 'run': len(runs)}
+
+    monkeypatch.setattr(suivi, 'load_daily_prices', lambda *args, **kwargs: None)
+    monkeypatch.setattr(suivi, 'project_portfolio', project_portfolio)
+    tracker = suivi.InvestmentTracker(data_dir=str(tmp_path))
+    allocation = {'normalized_allocation': {'BTC': 0.6, 'ETH': 0.4}}
+
+    assert tracker.project_outcomes(allocation) == {'paths': tracker.projection_paths, 'run': 1}
+    # Nouveau tracker (nouvelle exécution du script): projection lue dans le cache
+    tracker = suivi.InvestmentTracker(data_dir=str(tmp_path))
+    assert tracker.project_outcomes(allocation)['run'] == 1
+
+    assert tracker.project_outcomes({'normalized_allocation': {'BTC': 1.0}})['run'] == 2
+    assert tracker.project_outcomes(allocation, n_paths=500)['run'] == 3
+
+    # Le lendemain, la projection est recalculée et le cache vidé
+    with open(tracker.projection_cache_file) as f:
+        cache = json.load(f)
+    cache['date'] = '2000-01-01'
+    with open(tracker.projection_cache_file, 'w') as f:
+        json.dump(cache, f)
+    assert tracker.project_outcomes(allocation)['run'] == 4
+    with open(tracker.projection_cache_file) as f:
+        assert len(json.load(f)['projections']) == 1
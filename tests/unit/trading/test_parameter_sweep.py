@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading.backtest import BacktestData, weight_vectors, simulate, performance_metrics
+from trading.parameter_sweep import METRICS, generate_candidates, run_sweep
+
+SYMBOLS = ['BTC', 'ETH', 'SOL', 'DOGE']
+
+
+@pytest.fixture
+def data(rng):
+    """Données de backtest sur une grille de 6 heures; DOGE hors allocation"""
+    index = pd.date_range('2024-01-01', '2024-06-30', freq='6h', tz='UTC')
+    prices = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(index), len(SYMBOLS))), axis=0)),
+        index=index, columns=SYMBOLS
+    )
+    data = BacktestData(prices, use_correlation=False)
+    data.correlation = rng.random(data.signal_codes.shape) < 0.3
+    return data
+
+
+def test_candidates_start_from_the_current_configuration(data):
+    bases, adjustments, bonuses = generate_candidates(data.symbols, n_samples=50, seed=3)
+    base, current_adjustments = weight_vectors(data.symbols)
+
+    np.testing.assert_array_equal(bases[0], base)
+    np.testing.assert_array_equal(adjustments[0], current_adjustments)
+    in_allocation = np.isfinite(base)
+    assert np.isnan(bases[:, ~in_allocation]).all()
+    np.testing.assert_allclose(bases[1:, in_allocation].sum(axis=1), 1.0)
+    # Les ajustements gardent le sens de la configuration actuelle
+    assert np.all(adjustments * np.sign(current_adjustments) >= 0)
+
+
+def test_sweep_matches_serial_backtests(data):
+    bases, adjustments, bonuses = generate_candidates(data.symbols, n_samples=12, seed=5)
+    serial = run_sweep(data, bases, adjustments, bonuses, chunk_size=5)
+    parallel = run_sweep(data, bases, adjustments, bonuses, workers=2, chunk_size=5)
+    pd.testing.assert_frame_equal(parallel, serial)
+
+    # Chaque ligne correspond au backtest du candidat seul
+    assert serial['rank'].tolist() == list(range(1, 13))
+    assert serial['roi_percent'].is_monotonic_decreasing
+    assert serial['is_current'].sum() == 1
+    for _, row in serial.iterrows():
+        # Allocations tirées d'une loi de Dirichlet: le poids de BTC identifie le candidat
+        k = int(np.flatnonzero(bases[:, 0] == row['base_BTC'])[0])
+        performance = performance_metrics(data, simulate(data, bases[k], adjustments[k], bonuses[k], 50))
+        assert [row[name] for name in METRICS] == pytest.approx([performance[name] for name in METRICS])
@@ -0,0 +1,87 @@
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from trading.risk_metrics import RISK_WINDOW, VAR_CONFIDENCE, DAYS_PER_YEAR, RiskState
+from trading.suivi_investissement_crypto import InvestmentTracker
+
+
+@pytest.fixture
+def series(rng):
+    """Valeurs hebdomadaires d'une série alimentée par des apports réguliers"""
+    n = RISK_WINDOW + 20
+    dates = [(datetime(2024, 1, 1) + timedelta(days=7 * k)).isoformat() for k in range(n)]
+    contributions = np.where(np.arange(n) % 4 == 0, 50.0, 0.0)
+    values = np.empty(n)
+    values[0] = 100.0
+    for k in range(1, n):
+        values[k] = values[k - 1] * np.exp(rng.normal(0.002, 0.05)) + contributions[k]
+    return dates, values, contributions
+
+
+def test_incremental_metrics_match_full_recomputation(series):
+    dates, values, contributions = series
+    state = RiskState()
+    for date, value, contribution in zip(dates, values, contributions):
+        state.update('BTC', date, value, contribution)
+    metrics = state.metrics('BTC')
+
+    returns = (values[1:] - contributions[1:]) / values[:-1] - 1
+    index = np.cumprod(1 + returns)
+    drawdowns = index / np.maximum.accumulate(np.maximum(index, 1.0)) - 1
+    window = returns[-RISK_WINDOW:]
+    per_year = DAYS_PER_YEAR / 7
+    std = window.std(ddof=1)
+
+    assert metrics['observations'] == len(returns)
+    assert metrics['periods_per_year'] == pytest.approx(per_year)
+    assert metrics['drawdown_percent'] == pytest.approx(drawdowns[-1] * 100)
+    assert metrics['max_drawdown_percent'] == pytest.approx(min(drawdowns.min(), 0.0) * 100)
+    assert metrics['volatility_percent'] == pytest.approx(std * np.sqrt(per_year) * 100)
+    assert metrics['sharpe_ratio'] == pytest.approx(window.mean() / std * np.sqrt(per_year))
+    assert metrics['var_historical_percent'] == pytest.approx(
+        -np.percentile(window, (1 - VAR_CONFIDENCE) * 100) * 100
+    )
+
+
+def test_state_round_trip_and_known_values(series, tmp_path):
+    dates, values, contributions = series
+    state = RiskState()
+    for date, value, contribution in zip(dates[:30], values[:30], contributions[:30]):
+        state.update('BTC', date, value, contribution)
+    path = str(tmp_path / 'risk_state.json')
+    state.save(path)
+
+    resumed = RiskState.load(path)
+    # Une valeur déjà intégrée est ignorée
+    assert resumed.update('BTC', dates[29], values[29]) is None
+    for date, value, contribution in zip(dates[30:], values[30:], contributions[30:]):
+        resumed.update('BTC', date, value, contribution)
+        state.update('BTC', date, value, contribution)
+    assert resumed.metrics('BTC') == pytest.approx(state.metrics('BTC'))
+
+
+def test_load_risk_state_stops_at_a_partial_last_line(tmp_path):
+    tracker = InvestmentTracker(data_dir=str(tmp_path))
+    entries = [
+        {'date': f'2024-0{month}-01T00:00:00', 'investment': 50, 'total_invested': 50 * month,
+         'current_value': 55.0 * month, 'purchases': {}, 'asset_values': {'BTC': 55.0 * month}}
+        for month in range(1, 5)
+    ]
+    complete = ''.join(json.dumps(entry) + '\n' for entry in entries[:3])
+    partial = json.dumps(entries[3])
+    with open(tracker.journal_file, 'w') as f:
+        f.write(complete + partial[:20])
+
+    state = tracker.load_risk_state()
+    assert state.series['PORTFOLIO']['count'] == 2
+    assert state.journal_offset == len(complete.encode('utf-8'))
+
+    # La ligne terminée est intégrée au chargement suivant
+    with open(tracker.journal_file, 'a') as f:
+        f.write(partial[20:] + '\n')
+    state = tracker.load_risk_state()
+    assert state.series['PORTFOLIO']['count'] == 3
+    assert state.journal_offset == len((complete + partial + '\n').encode('utf-8'))
@@ -0,0 +1,78 @@
+import json
+import os
+
+import pytest
+
+from trading import suivi_investissement_crypto as suivi
+
+ALLOCATION = {
+    'euro_allocation': {'BTC': 30.0, 'ETH': 20.0},
+    'normalized_allocation': {'BTC': 0.6, 'ETH': 0.4}
+}
+
+
+@pytest.fixture
+def tracker_factory(tmp_path, monkeypatch):
+    """Trackers sur un répertoire temporaire, avec des prix qui changent à chaque achat"""
+    prices = {'BTC': 40000.0, 'ETH': 2000.0}
+
+    def load_market_data(self):
+        prices['BTC'] *= 1.03
+        prices['ETH'] *= 0.98
+        return {symbol: {'price': price} for symbol, price in prices.items()}
+
+    monkeypatch.setattr(suivi.InvestmentTracker, 'load_market_data', load_market_data)
+    return lambda: suivi.InvestmentTracker(data_dir=str(tmp_path))
+
+
+def state(portfolio):
+    """Avoirs et totaux d'un portefeuille (sans les champs de position dans le journal)"""
+    return {key: portfolio[key] for key in ('total_invested', 'current_value', 'last_update', 'assets')}
+
+
+def test_snapshot_and_journal_replay_round_trip(tracker_factory):
+    tracker = tracker_factory()
+    for _ in range(2 * suivi.SNAPSHOT_INTERVAL + 3):
+        tracker.update_portfolio(ALLOCATION)
+    expected = state(tracker.portfolio)
+
+    # Instantané écrit toutes les SNAPSHOT_INTERVAL entrées, les suivantes rejouées depuis le journal
+    with open(tracker.portfolio_file) as f:
+        snapshot = json.load(f)
+    assert 0 < snapshot['journal_offset'] < os.path.getsize(tracker.journal_file)
+    assert 'journal_entries' not in snapshot
+
+    reloaded = tracker_factory()
+    assert state(reloaded.portfolio) == expected
+    assert reloaded.portfolio['journal_entries'] == 3
+
+    # Rejouer tout le journal depuis un portefeuille vide donne le même résultat
+    replayed = suivi.InvestmentTracker.replay_journal(suivi.InvestmentTracker._empty_portfolio(), tracker.journal_file)
+    assert state(replayed) == expected
+    assert len(list(reloaded.iter_history())) == 2 * suivi.SNAPSHOT_INTERVAL + 3
+
+    # Les achats suivants repartent de l'état rechargé
+    reloaded.update_portfolio(ALLOCATION)
+    assert reloaded.portfolio['total_invested'] == 50 * (2 * suivi.SNAPSHOT_INTERVAL + 4)
+
+
+def test_legacy_history_is_moved_to_the_journal(tracker_factory):
+    tracker = tracker_factory()
+    for _ in range(3):
+        tracker.update_portfolio(ALLOCATION)
+    expected = state(tracker.portfolio)
+    history = list(tracker.iter_history())
+
+    # Ancien format: historique complet dans portfolio.json, pas de journal
+    legacy = dict(expected, history=history)
+    with open(tracker.portfolio_file, 'w') as f:
+        json.dump(legacy, f)
+    with open(tracker.journal_file, 'w'):
+        pass
+
+    migrated = tracker_factory()
+    assert state(migrated.portfolio) == expected
+    assert list(migrated.iter_history()) == history
+    with open(tracker.portfolio_file) as f:
+        assert 'history' not in json.load(f)
+    assert state(tracker_factory().portfolio) == expected
@@ -0,0 +1,86 @@
+import sys
+import threading
+import types
+
+import pytest
+
+from utils import analysis_worker
+from utils.worker_client import send_job
+
+
+def job_module(run):
+    """Module de travail factice"""
+    return types.SimpleNamespace(run=run)
+
+
+@pytest.fixture
+def worker(tmp_path):
+    """Worker sans module réel, servi dans un thread sur un socket temporaire"""
+    socket_path = str(tmp_path / 'worker.sock')
+    server = analysis_worker.AnalysisWorker(socket_path, jobs=[])
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, socket_path
+    server.shutdown()
+    server.server_close()
+
+
+def test_run_job_passes_arguments_and_returns_output():
+    saved = sys.argv, sys.stdin, sys.stdout
+    module = job_module(lambda argv, stdin: (0, f"{argv}:{stdin.read()}"))
+
+    result = analysis_worker.run_job(module, ['--incremental'], '[1, 2]')
+    assert result['success'] and result['exit_code'] == 0
+    assert result['output'] == "['--incremental']:[1, 2]"
+    assert (sys.argv, sys.stdin, sys.stdout) == saved
+
+
+def test_run_job_reports_failures():
+    def invalid_arguments(argv, stdin):
+        raise SystemExit(2)
+
+    def crash(argv, stdin):
+        raise ValueError('boom')
+
+    assert analysis_worker.run_job(job_module(lambda argv, stdin: (1, 'erreur')), [])['exit_code'] == 1
+    assert analysis_worker.run_job(job_module(invalid_arguments), [])['exit_code'] == 2
+    result = analysis_worker.run_job(job_module(crash), [])
+    assert not result['success'] and result['error'] == 'boom'
+
+
+def test_worker_serves_jobs(worker):
+    server, socket_path = worker
+    server.modules['indicators'] = job_module(lambda argv, stdin: (0, stdin.read().upper()))
+
+    result = send_job('indicators', ['-'], 'ticks', socket_path=socket_path, timeout=5)
+    assert result['exit_code'] == 0 and result['output'] == 'TICKS'
+    assert server.jobs_run == 1
+
+    unknown = send_job('backtest', [], socket_path=socket_path, timeout=5)
+    assert not unknown['success'] and 'backtest' in unknown['error']
+
+
+def test_status_is_answered_during_a_job(worker):
+    server, socket_path = worker
+    started, released = threading.Event(), threading.Event()
+
+    def slow(argv, stdin):
+        started.set()
+        released.wait(5)
+        return 0, 'fini'
+
+    server.modules['correlation'] = job_module(slow)
+    results = []
+    client = threading.Thread(target=lambda: results.append(
+        send_job('correlation', [], socket_path=socket_path, timeout=5)
+    ))
+    client.start()
+    assert started.wait(5)
+
+    status = send_job('status', [], socket_path=socket_path, timeout=5)
+    assert status['busy'] and status['jobs'] == ['correlation'] and status['jobs_run'] == 0
+
+    released.set()
+    client.join(5)
+    assert results[0]['output'] == 'fini'
+    assert not send_job('status', [], socket_path=socket_path, timeout=5)['busy']
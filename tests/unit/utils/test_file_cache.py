@@ -0,0 +1,80 @@
+import json
+import os
+
+import pytest
+
+from utils.file_cache import FileCache
+
+
+@pytest.fixture
+def counted(tmp_path):
+    """Fichier JSON et fonction d'analyse qui compte ses appels"""
+    path = tmp_path / 'data.json'
+    path.write_text(json.dumps({'value': 1}))
+    calls = []
+
+    def parse(f):
+        calls.append(1)
+        return json.load(f)
+
+    return str(path), parse, calls
+
+
+def test_unchanged_file_is_parsed_once(counted):
+    path, parse, calls = counted
+    cache = FileCache()
+    assert cache.get(path, parse) == {'value': 1}
+    assert cache.get(path, parse) is cache.get(path, parse)
+    assert len(calls) == 1
+
+    # Une autre fonction d'analyse a sa propre entrée
+    assert cache.get(path, lambda f: f.read()) == json.dumps({'value': 1})
+    assert len(calls) == 1
+
+
+def test_modification_time_or_size_change_invalidates(counted):
+    path, parse, calls = counted
+    cache = FileCache()
+    cache.get(path, parse)
+    stat = os.stat(path)
+
+    # Même taille, date de modification différente
+    with open(path, 'w') as f:
+        json.dump({'value': 2}, f)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.get(path, parse) == {'value': 2}
+    assert len(calls) == 2
+
+    # Même date de modification, taille différente
+    stat = os.stat(path)
+    with open(path, 'w') as f:
+        json.dump({'value': 30}, f)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert cache.get(path, parse) == {'value': 30}
+    assert len(calls) == 3
+
+
+def test_ttl_eviction_and_invalidate(counted, tmp_path):
+    path, parse, calls = counted
+    cache = FileCache(ttl=60)
+    cache.get(path, parse)
+    # Entrée récente: servie sans os.stat, même si le fichier a disparu
+    os.remove(path)
+    assert cache.get(path, parse) == {'value': 1}
+    cache.invalidate(path)
+    with pytest.raises(FileNotFoundError):
+        cache.get(path, parse)
+
+    small = FileCache(max_entries=2)
+    paths = []
+    for k in range(3):
+        other = tmp_path / f'{k}.json'
+        other.write_text(str(k))
+        paths.append(str(other))
+        small.get(str(other), parse)
+    # Le moins récemment lu est évincé
+    small.get(paths[0], parse)
+    assert len(calls) == 5
+    small.invalidate()
+    small.get(paths[2], parse)
+    assert len(calls) == 6
@@ -0,0 +1,92 @@
+import socket
+import sys
+import threading
+
+import pytest
+
+from utils import worker_client
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    """Client pointé vers un socket temporaire, exécution directe simulée"""
+    socket_path = str(tmp_path / 'worker.sock')
+    monkeypatch.setenv('CRYPTO_BOT_WORKER_SOCKET', socket_path)
+    monkeypatch.setattr(worker_client, 'DEFAULT_JOB_TIMEOUT', 0.5)
+    direct_runs = []
+    monkeypatch.setattr(worker_client, 'run_direct', lambda job, args, stdin_text=None: direct_runs.append(job) or 0)
+
+    def run(*argv):
+        monkeypatch.setattr(sys, 'argv', ['worker_client.py'] + list(argv))
+        with pytest.raises(SystemExit) as exit_info:
+            worker_client.main()
+        return exit_info.value.code
+
+    return socket_path, direct_runs, run
+
+
+def serve_once(socket_path, reply):
+    """Accepte une connexion sur le socket et y répond par reply(connexion)"""
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(1)
+
+    def accept():
+        connection, _ = server.accept()
+        with connection:
+            connection.makefile('r').readline()
+            reply(connection)
+        server.close()
+
+    thread = threading.Thread(target=accept, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_missing_socket_runs_directly(client):
+    _, direct_runs, run = client
+    assert run('correlation', '--incremental') == 0
+    assert direct_runs == ['correlation']
+
+
+def test_refused_connection_runs_directly(client):
+    socket_path, direct_runs, run = client
+    # Socket laissé par un worker arrêté: plus personne n'écoute
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+
+    assert run('allocation') == 0
+    assert direct_runs == ['allocation']
+
+
+def test_timeout_after_connect_does_not_rerun_the_job(client):
+    socket_path, direct_runs, run = client
+    released = threading.Event()
+    thread = serve_once(socket_path, lambda connection: released.wait(5))
+
+    assert run('allocation') == 1
+    assert direct_runs == []
+    released.set()
+    thread.join(5)
+
+
+def test_connection_lost_during_job_does_not_rerun_the_job(client):
+    socket_path, direct_runs, run = client
+    serve_once(socket_path, lambda connection: None)
+
+    assert run('indicators', 'ticks.json') == 1
+    assert direct_runs == []
+
+
+def test_worker_result_is_forwarded(client, capsys):
+    socket_path, direct_runs, run = client
+    serve_once(socket_path, lambda connection: connection.sendall(
+        b'{"success": false, "exit_code": 3, "output": "{}\\n", "error": "boom"}\n'
+    ))
+
+    assert run('correlation') == 3
+    captured = capsys.readouterr()
+    assert captured.out == '{}\n'
+    assert 'boom' in captured.err
+    assert direct_runs == []